@@ -0,0 +1,117 @@
+"""JSON rendering and parsing microbenchmark
+
+Compares DRF's stdlib based JSONRenderer and JSONParser with the orjson backed
+ORJSONRenderer and ORJSONParser used by the API, on a page of tasks serialized with
+TaskSerializer.
+
+Run from the root of the repo with the functionary requirements installed:
+
+    python benchmarks/json_rendering.py --tasks 1000 --parameter-size 2000
+"""
+import argparse
+import io
+import os
+import sys
+import timeit
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+sys.path[:0] = [str(REPO_ROOT / "functionary")]
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "functionary.settings.test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from core.api.parsers import ORJSONParser  # noqa: E402
+from core.api.renderers import ORJSONRenderer  # noqa: E402
+from core.api.v1.serializers import TaskSerializer  # noqa: E402
+from core.models import Function, Package, Task, Team, User  # noqa: E402
+
+
+def create_tasks(count: int, parameter_size: int) -> None:
+    """Create count tasks whose parameters serialize to roughly parameter_size
+    bytes"""
+    environment = Team.objects.create(name="benchmark").environments.get()
+    package = Package.objects.create(name="benchmark", environment=environment)
+    function = Function.objects.create(name="echo", package=package, schema={})
+    user = User.objects.create(username="benchmark")
+    parameters = {
+        "text": "x" * (parameter_size // 2),
+        "values": list(range(parameter_size // 10)),
+        "enabled": True,
+    }
+
+    Task.objects.bulk_create(
+        Task(
+            function=function,
+            environment=environment,
+            parameters=parameters,
+            creator=user,
+        )
+        for _ in range(count)
+    )
+
+
+def _best_of(func, repeat: int) -> float:
+    """The fastest of repeat runs of func, in milliseconds"""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def run_benchmark(repeat: int) -> tuple[list[tuple[str, float, float]], int]:
+    data = TaskSerializer(Task.objects.all(), many=True).data
+    body = JSONRenderer().render(data)
+
+    assert ORJSONRenderer().render(data) == body
+
+    return [
+        (
+            "render",
+            _best_of(lambda: JSONRenderer().render(data), repeat),
+            _best_of(lambda: ORJSONRenderer().render(data), repeat),
+        ),
+        (
+            "parse",
+            _best_of(lambda: JSONParser().parse(io.BytesIO(body)), repeat),
+            _best_of(lambda: ORJSONParser().parse(io.BytesIO(body)), repeat),
+        ),
+    ], len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks to serialize")
+    parser.add_argument(
+        "--parameter-size",
+        type=int,
+        default=2000,
+        help="approximate size of each task's parameters in bytes",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="runs of each case")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+
+    try:
+        create_tasks(args.tasks, args.parameter_size)
+        results, size = run_benchmark(args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"tasks: {args.tasks}  body: {size / 1024:.0f} KiB\n")
+    print(f"{'':<10}{'stdlib ms':>14}{'orjson ms':>14}{'speedup':>12}")
+
+    for name, stdlib, fast in results:
+        print(f"{name:<10}{stdlib:>14.3f}{fast:>14.3f}{stdlib / fast:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+"""End-to-end tasking throughput benchmark
+
+Drives tasks through the full execution path:
+
+    TaskViewSet.create -> publish_task -> runner listener -> _run_task
+        -> publish_result -> core listener -> record_task_result
+
+Docker is replaced with a fake container backend that echoes the parameters back as
+the result, and RabbitMQ with an in-memory broker. Celery tasks run eagerly, so each
+stage runs in this process and the timings reflect the cost of the application code
+and database rather than of the infrastructure.
+
+Run from the root of the repo with both the functionary and runner requirements
+installed:
+
+    python benchmarks/throughput.py --tasks 500 --output results.json
+    python benchmarks/throughput.py --compare results.json
+"""
+import argparse
+import io
+import json
+import math
+import os
+import struct
+import subprocess
+import sys
+import tarfile
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+sys.path[:0] = [str(REPO_ROOT / "functionary"), str(REPO_ROOT / "runner")]
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "functionary.settings.test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+import core.utils.listener as core_listener  # noqa: E402
+import core.utils.messaging as core_messaging  # noqa: E402
+import runner.handlers as runner_handlers  # noqa: E402
+import runner.listener as runner_listener  # noqa: E402
+import runner.messaging as runner_messaging  # noqa: E402
+from core.celery import app as core_app  # noqa: E402
+from core.models import Function, Package, Team, User  # noqa: E402
+from core.utils import tasking  # noqa: E402
+from core.utils.runners import record_runner_load  # noqa: E402
+from runner.celery import app as runner_app  # noqa: E402
+
+# Stages that are timed, in the order a task passes through them. Timings are
+# inclusive: with eager celery tasks, each stage also contains the stages it hands
+# off to within the same process.
+STAGES = [
+    "api_create",
+    "publish_task",
+    "runner_delivery",
+    "run_container",
+    "publish_result",
+    "core_delivery",
+    "record_task_result",
+    "end_to_end",
+]
+
+
+class FakeBroker:
+    """In-memory stand-in for RabbitMQ. Exchanges route by routing key directly to
+    the queue of the same name, as the direct exchanges used by functionary do."""
+
+    def __init__(self):
+        self.queues = defaultdict(deque)
+
+    def build_connection(self, *args, open_callback=None, **kwargs):
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, broker):
+        self.broker = broker
+        self.ioloop = mock.Mock()
+
+    def channel(self, *args, **kwargs):
+        return FakeChannel(self)
+
+    def close(self):
+        pass
+
+
+class FakeChannel:
+    is_open = True
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.delivery_tags = {}
+
+    def basic_publish(self, exchange, routing_key, body, properties, mandatory=False):
+        self.connection.broker.queues[routing_key].append((body, properties))
+
+    def deliver(self, queue):
+        """Pop the next message from queue, returning handle_delivery arguments"""
+        body, properties = self.connection.broker.queues[queue].popleft()
+        deliver = mock.Mock(delivery_tag=len(self.delivery_tags))
+        self.delivery_tags[deliver.delivery_tag] = (queue, body, properties)
+
+        return self, deliver, properties, body
+
+    def basic_reject(self, delivery_tag, requeue=True):
+        queue, body, properties = self.delivery_tags[delivery_tag]
+        self.connection.broker.queues[queue].appendleft((body, properties))
+
+    def __getattr__(self, name):
+        # basic_ack, confirm_delivery, and the rest of the channel API are no-ops
+        return lambda *args, **kwargs: None
+
+
+class FakeDocker:
+    """Stand-in for the docker client, running containers from images built from the
+    current python template"""
+
+    def __init__(self, log_lines):
+        self.log_lines = log_lines
+        self.images = mock.Mock()
+        self.images.get.return_value = mock.Mock(
+            labels={runner_handlers.PROTOCOL_LABEL: "2"}
+        )
+        self.images.list.return_value = []
+        self.containers = mock.Mock()
+        self.containers.create.side_effect = self._create
+
+    def _create(self, image, command, environment, **kwargs):
+        return FakeContainer(self.log_lines)
+
+
+class FakeContainer:
+    def __init__(self, log_lines):
+        self.logs_output = b"log line\n" * log_lines
+        self.archive = {}
+
+    def put_archive(self, path, data):
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            for member in archive.getmembers():
+                self.archive[f"/{member.name}"] = archive.extractfile(member).read()
+
+    def start(self):
+        parameters = json.loads(self.archive[runner_handlers.PARAMETERS_FILE])
+        payload = json.dumps(parameters).encode()
+        self.archive[runner_handlers.RESULT_FILE] = (
+            runner_handlers.RESULT_MAGIC + struct.pack(">Q", len(payload)) + payload
+        )
+
+    def wait(self):
+        return {"StatusCode": 0}
+
+    def logs(self, stream=False):
+        return iter(self.logs_output.splitlines(True)) if stream else self.logs_output
+
+    def get_archive(self, path):
+        contents = self.archive[path]
+        archive = io.BytesIO()
+        member = tarfile.TarInfo(os.path.basename(path))
+        member.size = len(contents)
+
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            tar.addfile(member, io.BytesIO(contents))
+
+        return iter([archive.getvalue()]), {}
+
+    def remove(self):
+        pass
+
+
+class Recorder:
+    """Collects the duration and database query count of each call to a stage"""
+
+    def __init__(self):
+        self.durations = defaultdict(list)
+        self.queries = defaultdict(int)
+        self.query_count = 0
+
+    def count_query(self, execute, sql, params, many, context):
+        self.query_count += 1
+
+        return execute(sql, params, many, context)
+
+    def record(self, stage, start, queries_start):
+        self.durations[stage].append(time.perf_counter() - start)
+        self.queries[stage] += self.query_count - queries_start
+
+    def timed(self, stage, func):
+        def wrapper(*args, **kwargs):
+            start, queries_start = time.perf_counter(), self.query_count
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, start, queries_start)
+
+        return wrapper
+
+
+def _percentile(values, percent):
+    """Nearest rank percentile of values"""
+    ordered = sorted(values)
+
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _create_function():
+    user = User.objects.create_superuser("benchmark", password="benchmark")
+    environment = Team.objects.create(name="benchmark").environments.get()
+    package = Package.objects.create(
+        name="benchmark", environment=environment, image_name="benchmark:latest"
+    )
+    function = Function.objects.create(
+        name="echo",
+        package=package,
+        schema={
+            "type": "object",
+            "properties": {"index": {"type": "integer"}, "text": {"type": "string"}},
+        },
+    )
+
+    return user, function
+
+
+def run_benchmark(tasks, log_lines, encoding):
+    """Run tasks through the full execution path and summarize the results"""
+    broker = FakeBroker()
+    recorder = Recorder()
+
+    core_app.conf.task_always_eager = True
+    runner_app.conf.task_always_eager = True
+
+    user, function = _create_function()
+
+    client = APIClient()
+    client.force_authenticate(user)
+    headers = {"HTTP_X_ENVIRONMENT_ID": str(function.package.environment_id)}
+
+    if encoding == "msgpack":
+        # Advertise msgpack support so that core negotiates it for the pool
+        record_runner_load(
+            {
+                "runner": "benchmark",
+                "pool": function.package.environment.runner_pool,
+                "capacity": 1,
+                "active": 1,
+                "images": [],
+                "content_types": runner_messaging.SUPPORTED_CONTENT_TYPES,
+            }
+        )
+
+    with ExitStack() as stack:
+        patches = [
+            mock.patch.object(
+                core_messaging, "build_connection", broker.build_connection
+            ),
+            mock.patch.object(
+                runner_messaging, "build_connection", broker.build_connection
+            ),
+            mock.patch.object(runner_messaging, "MESSAGE_ENCODING", encoding),
+            mock.patch("docker.from_env", return_value=FakeDocker(log_lines)),
+            mock.patch.object(
+                tasking.publish_task,
+                "run",
+                recorder.timed("publish_task", tasking.publish_task.run),
+            ),
+            mock.patch.object(
+                runner_handlers,
+                "_run_task",
+                recorder.timed("run_container", runner_handlers._run_task),
+            ),
+            mock.patch.object(
+                runner_handlers.publish_result,
+                "run",
+                recorder.timed("publish_result", runner_handlers.publish_result.run),
+            ),
+            mock.patch.object(
+                tasking.record_task_result,
+                "run",
+                recorder.timed("record_task_result", tasking.record_task_result.run),
+            ),
+            connection.execute_wrapper(recorder.count_query),
+        ]
+
+        for patch in patches:
+            stack.enter_context(patch)
+
+        channel = broker.build_connection().channel()
+        create = recorder.timed("api_create", client.post)
+        runner_delivery = recorder.timed(
+            "runner_delivery", runner_listener._handle_delivery
+        )
+        core_delivery = recorder.timed("core_delivery", core_listener._handle_delivery)
+        url = reverse("task-list")
+        pool_queue = function.package.environment.runner_pool
+        started = {}
+
+        start = time.perf_counter()
+        queries_start = recorder.query_count
+
+        for index in range(tasks):
+            task_start, task_queries_start = time.perf_counter(), recorder.query_count
+            response = create(
+                url,
+                {
+                    "function": str(function.id),
+                    "parameters": {"index": index, "text": "benchmark"},
+                },
+                format="json",
+                **headers,
+            )
+            started[response.data["id"]] = task_start
+
+            while broker.queues[pool_queue]:
+                runner_delivery(*channel.deliver(pool_queue))
+
+            while broker.queues[core_messaging.TASK_RESULTS_QUEUE]:
+                core_delivery(*channel.deliver(core_messaging.TASK_RESULTS_QUEUE))
+
+            recorder.record("end_to_end", task_start, task_queries_start)
+
+        elapsed = time.perf_counter() - start
+        total_queries = recorder.query_count - queries_start
+
+    return {
+        "commit": _git_commit(),
+        "tasks": tasks,
+        "log_lines": log_lines,
+        "encoding": encoding,
+        "database": connection.vendor,
+        "elapsed_seconds": round(elapsed, 3),
+        "tasks_per_second": round(tasks / elapsed, 2),
+        "queries_per_task": round(total_queries / tasks, 2),
+        "stages": {
+            stage: {
+                "calls": len(recorder.durations[stage]),
+                "p50_ms": round(_percentile(recorder.durations[stage], 50) * 1000, 3),
+                "p99_ms": round(_percentile(recorder.durations[stage], 99) * 1000, 3),
+                "queries_per_call": round(
+                    recorder.queries[stage] / len(recorder.durations[stage]), 2
+                ),
+            }
+            for stage in STAGES
+            if recorder.durations[stage]
+        },
+    }
+
+
+def _format_change(current, baseline):
+    if baseline is None:
+        return ""
+    if baseline == 0:
+        return f"(was {baseline})" if current else ""
+
+    return f"({(current - baseline) / baseline:+.1%})"
+
+
+def print_results(results, baseline=None):
+    """Print a summary of the results, along with the change from a baseline if one
+    is given"""
+    baseline = baseline or {}
+    baseline_stages = baseline.get("stages", {})
+
+    print(f"commit: {results['commit']}  database: {results['database']}")
+
+    if baseline:
+        print(f"baseline commit: {baseline.get('commit')}")
+
+    for key in ["tasks_per_second", "queries_per_task"]:
+        change = _format_change(results[key], baseline.get(key))
+        print(f"{key}: {results[key]} {change}")
+
+    print(f"\n{'stage':<20}{'p50 ms':>18}{'p99 ms':>18}{'queries':>18}")
+
+    for stage, stats in results["stages"].items():
+        base = baseline_stages.get(stage, {})
+        columns = [
+            f"{stats[key]} {_format_change(stats[key], base.get(key))}".strip()
+            for key in ["p50_ms", "p99_ms", "queries_per_call"]
+        ]
+        print(f"{stage:<20}" + "".join(f"{column:>18}" for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200, help="tasks to execute")
+    parser.add_argument(
+        "--log-lines",
+        type=int,
+        default=100,
+        help="lines of log output produced by each task",
+    )
+    parser.add_argument(
+        "--encoding",
+        choices=["json", "msgpack"],
+        default="json",
+        help="encoding used for broker messages",
+    )
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    parser.add_argument("--compare", help="results file from a previous run")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+
+    try:
+        results = run_benchmark(args.tasks, args.log_lines, args.encoding)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    baseline = None
+
+    if args.compare:
+        with open(args.compare) as compare_file:
+            baseline = json.load(compare_file)
+
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from urllib.parse import urlsplit
+
 import click
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .config import get_config_value
 
+API_PREFIX = "/api/v1/"
+DEFAULT_PAGE_SIZE = 100
+
+# Maximum number of connections kept open to the host, which bounds the number of
+# requests that can usefully be made concurrently
+MAX_CONNECTIONS = 64
+
+# Seconds to wait for a connection to be established and for a response to be read
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 300
+
+# Failed connections are retried for any request, as nothing has reached the server.
+# Read failures and gateway errors are only retried for requests that are safe to
+# repeat.
+RETRY_POLICY = Retry(
+    total=5,
+    connect=3,
+    read=2,
+    status=3,
+    backoff_factor=0.5,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=["GET", "HEAD", "OPTIONS"],
+    raise_on_status=False,
+)
+
 
 def get(endpoint):
     """
     Gets any data associated with an endpoint from the api
 
+    For paginated list endpoints, only the first page of results is returned. Use
+    get_all to retrieve every result.
+
     Args:
         endpoint: the name of the endpoint to get data from
 
@@ -24,7 +58,92 @@ def get(endpoint):
         return response_data
 
 
-def post(endpoint, data=None, files=None):
+def get_all(endpoint, page_size=DEFAULT_PAGE_SIZE, prefetch=True):
+    """
+    Iterates over every result from a paginated list endpoint, following the
+    next links until all pages have been retrieved
+
+    Args:
+        endpoint: the name of the endpoint to get data from
+        page_size: the number of results to request per page
+        prefetch: request the next page in the background while the results of
+            the current page are being processed
+
+    Yields:
+        Each result from the endpoint as a Python dict
+
+    """
+    separator = "&" if "?" in endpoint else "?"
+    next_endpoint = f"{endpoint}{separator}limit={page_size}"
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        page = _get_page(next_endpoint)
+
+        while page is not None:
+            results, next_endpoint = page
+            pending = None
+
+            if next_endpoint is not None and prefetch:
+                pending = executor.submit(_get_page, next_endpoint)
+
+            try:
+                yield from results
+            except GeneratorExit:
+                if pending is not None:
+                    pending.cancel()
+                raise
+
+            if pending is not None:
+                page = pending.result()
+            elif next_endpoint is not None:
+                page = _get_page(next_endpoint)
+            else:
+                page = None
+
+
+def _get_page(endpoint):
+    """
+    Helper function for get_all that retrieves a single page of results
+
+    Args:
+        endpoint: the endpoint, including any query string, of the page to get
+
+    Returns:
+        Tuple of the results on the page and the endpoint of the next page, or
+        None if this is the last page
+
+    """
+    response_data = _send_request(endpoint, "get").json()
+
+    # Not a paginated endpoint, so everything came back at once
+    if "results" not in response_data:
+        return response_data, None
+
+    return response_data["results"], _next_endpoint(response_data.get("next"))
+
+
+def _next_endpoint(next_url):
+    """
+    Helper function for _get_page that converts the absolute next link returned
+    by the API into an endpoint relative to the configured host. The host the
+    server sees may differ from the configured one, such as when behind a proxy.
+
+    Args:
+        next_url: the next link from a paginated response, or None
+
+    Returns:
+        The endpoint and query string for the next page, or None
+    """
+    if not next_url:
+        return None
+
+    url = urlsplit(next_url)
+    path = url.path.split(API_PREFIX, 1)[-1]
+
+    return f"{path}?{url.query}" if url.query else path
+
+
+def post(endpoint, data=None, files=None, json=None):
     """
     Post provides data or files to endpoint
 
@@ -32,15 +151,58 @@ def post(endpoint, data=None, files=None):
         endpoint: the name of the endpoint to get data from
         data: Any data to put in the request's data field
         files: Any files to put in the request's files field
+        json: Any data to send JSON encoded as the request body
 
     Returns:
         Response from endpoint as Python list/dict
 
     """
-    response = _send_request(endpoint, "post", post_data=data, post_files=files)
+    response = _send_request(
+        endpoint, "post", post_data=data, post_files=files, post_json=json
+    )
     return response.json()
 
 
+@cache
+def _get_session():
+    """
+    Helper function for _send_request that creates the HTTP session shared by all
+    requests made by this process. The session pools and reuses connections to
+    the host, and carries the authentication and environment headers.
+
+    Returns:
+        A requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=MAX_CONNECTIONS, max_retries=RETRY_POLICY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def _get_headers():
+    """
+    Helper function for _send_request that builds the headers for a request
+
+    Returns:
+        Dict of the request headers
+    """
+    headers = {}
+
+    if (token := get_config_value("token", raise_exception=False)) is not None:
+        headers["Authorization"] = f"Token {token}"
+
+    if (
+        environment_id := get_config_value(
+            "current_environment_id", raise_exception=False
+        )
+    ) is not None:
+        headers["X-Environment-ID"] = f"{environment_id}"
+
+    return headers
+
+
 def _400_error_handling(response):
     """
     Helper function for _send_request that gives more user friendly
@@ -52,7 +214,13 @@ def _400_error_handling(response):
         ClickException with user friendly message based on response
     """
     message = None
-    code = response.json()["code"]
+    response_data = response.json()
+
+    # Validation errors may be a list of messages rather than a dict
+    if not isinstance(response_data, dict):
+        raise click.ClickException(" ".join(str(error) for error in response_data))
+
+    code = response_data.get("code")
 
     match code:
         case "missing_env_header":
@@ -66,13 +234,18 @@ def _400_error_handling(response):
                 + "using 'functionary package environment set'."
             )
         case "invalid_package":
-            message = f"{response.json()['detail']}"
+            message = f"{response_data['detail']}"
     if message is None:
-        message = f"{response.json()['detail']}"
-    raise click.ClickException(message)
+        # Validation errors are keyed by field rather than having a single detail
+        message = response_data.get(
+            "detail", {k: v for k, v in response_data.items() if k != "code"}
+        )
+    raise click.ClickException(f"{message}")
 
 
-def _send_request(endpoint, request_type, post_data=None, post_files=None):
+def _send_request(
+    endpoint, request_type, post_data=None, post_files=None, post_json=None
+):
     """
     Helper function for get and post that sends the request and handles any errors
     that arise
@@ -82,6 +255,7 @@ def _send_request(endpoint, request_type, post_data=None, post_files=None):
         request_type: Either post or get
         post_data: Any data to put in the post request's data field
         post_files: Any files to put in the post request's files field
+        post_json: Any data to send JSON encoded as the post request's body
 
     Returns:
         Response object generated from the request
@@ -92,25 +266,23 @@ def _send_request(endpoint, request_type, post_data=None, post_files=None):
 
     """
     host = get_config_value("host", raise_exception=True)
-    url = host + f"/api/v1/{endpoint}"
-    headers = {}
-    try:
-        if (token := get_config_value("token", raise_exception=False)) is not None:
-            headers["Authorization"] = f"Token {token}"
-
-        if (
-            environment_id := get_config_value(
-                "current_environment_id", raise_exception=False
-            )
-        ) is not None:
-            headers["X-Environment-ID"] = f"{environment_id}"
+    url = host + f"{API_PREFIX}{endpoint}"
+    session = _get_session()
+    headers = _get_headers()
+    timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
 
+    try:
         if request_type == "post":
-            response = requests.post(
-                url, headers=headers, data=post_data, files=post_files
+            response = session.post(
+                url,
+                headers=headers,
+                data=post_data,
+                files=post_files,
+                json=post_json,
+                timeout=timeout,
             )
         else:
-            response = requests.get(url, headers=headers)
+            response = session.get(url, headers=headers, timeout=timeout)
 
     except requests.ConnectionError:
         raise click.ClickException(f"Could not connect to {host}")
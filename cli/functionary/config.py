@@ -1,7 +1,7 @@
+from functools import cache
 from pathlib import Path
 
 import click
-from dotenv import get_key, set_key
 
 functionary_dir = Path.home() / ".functionary"
 config_file = functionary_dir / "config"
@@ -22,6 +22,8 @@ def save_config_value(key, value):
     Raises:
         ClickException: Received a PermissionError when opening config file
     """
+    from dotenv import set_key
+
     try:
         if not functionary_dir.exists():
             functionary_dir.mkdir()
@@ -34,6 +36,29 @@ def save_config_value(key, value):
     except PermissionError:
         raise click.ClickException(f"Failed to open {config_file}: Permission Denied")
 
+    load_config()[key] = value
+
+
+@cache
+def load_config():
+    """
+    Load the configuration file. The file is only read once per process, with
+    subsequent calls returning the same snapshot. Values saved with
+    save_config_value are reflected in the snapshot.
+
+    Returns:
+        Dict of configuration keys and values
+
+    Raises:
+        ClickException: Received a PermissionError when opening config file
+    """
+    from dotenv import dotenv_values
+
+    try:
+        return dotenv_values(config_file)
+    except PermissionError:
+        raise click.ClickException(f"Failed to open {config_file}: Permission Denied")
+
 
 def get_config_value(key, raise_exception=False):
     """
@@ -49,15 +74,11 @@ def get_config_value(key, raise_exception=False):
         ClickException: Received PermissionError when opening file or no configuration
         parameter matching the provided key exists
     """
-    try:
-        value = get_key(config_file, key)
-        if value is None:
-            if raise_exception is False:
-                return None
-            else:
-                raise click.ClickException(f"Could not find value for {key}")
+    value = load_config().get(key)
+    if value is None:
+        if raise_exception is False:
+            return None
         else:
-            return value
-    # if path not found or key not found, raise error
-    except PermissionError:
-        raise click.ClickException(f"Failed to open {config_file}: Permission Denied")
+            raise click.ClickException(f"Could not find value for {key}")
+    else:
+        return value
@@ -1,8 +1,5 @@
 import click
-from rich.console import Console
-from rich.text import Text
 
-from .client import get
 from .config import get_config_value, save_config_value
 
 
@@ -10,10 +7,10 @@ def _get_environment_list():
     """
     Helper function to get the environment list from host
     """
-    teams = get("teams")
+    from .client import get_all
 
     env_list = []
-    for team in teams:
+    for team in get_all("teams"):
         for env_set in team.get("environments"):
             env_set["team"] = team.get("name")
             env_list.append(env_set)
@@ -58,6 +55,9 @@ def list(ctx):
     """
     List all available environments
     """
+    from rich.console import Console
+    from rich.text import Text
+
     env_list = _get_environment_list()
     current_env_id = get_config_value("current_environment_id")
     for item in env_list:
@@ -1,15 +1,47 @@
+import importlib
+
 import click
 
-from .environment import environment_cmd
-from .login import login_cmd
-from .package import package_cmd
 
+class LazyGroup(click.Group):
+    """
+    Click group whose subcommands are only imported when they are invoked. This
+    keeps startup fast, since each command module and its dependencies are loaded
+    only for the subcommand that actually runs.
 
-@click.group()
-def cli():
-    pass
+    Args:
+        lazy_subcommands: mapping of command name to the import path of the
+            command, in the form "module.path:attribute"
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted([*super().list_commands(ctx), *self.lazy_subcommands])
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._load_command(cmd_name)
 
+        return super().get_command(ctx, cmd_name)
 
-cli.add_command(login_cmd)
-cli.add_command(package_cmd)
-cli.add_command(environment_cmd)
+    def _load_command(self, cmd_name):
+        module_name, attribute = self.lazy_subcommands[cmd_name].split(":")
+        module = importlib.import_module(module_name, package=__package__)
+
+        return getattr(module, attribute)
+
+
+@click.group(
+    cls=LazyGroup,
+    lazy_subcommands={
+        "environment": ".environment:environment_cmd",
+        "login": ".login:login_cmd",
+        "package": ".package:package_cmd",
+        "task": ".task:task_cmd",
+    },
+)
+def cli():
+    pass
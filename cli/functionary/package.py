@@ -1,17 +1,21 @@
+import contextlib
+import hashlib
+import json
 import os
 import pathlib
 import shutil
-import tarfile
 
 import click
-import yaml
-from rich.console import Console
-from rich.text import Text
 
-from .client import get, post
 from .config import get_config_value
-from .parser import parse
-from .utils import flatten, format_results
+
+# Files and directories that are never part of a published package
+EXCLUDED_NAMES = {".git", "__pycache__", ".venv", "venv", "node_modules", ".DS_Store"}
+EXCLUDED_SUFFIXES = (".pyc", ".pyo")
+
+# Limits on the number of files and total bytes sent in a single upload request
+UPLOAD_BATCH_FILES = 100
+UPLOAD_BATCH_BYTES = 32 * 1024 * 1024
 
 
 def create_languages() -> list[str]:
@@ -76,6 +80,9 @@ def create_cmd(ctx, language, name, output_directory):
     shutil.copytree(str(basepath), str(dir), dirs_exist_ok=True)
     generateYaml(output_directory, name, language)
 
+    from rich.console import Console
+    from rich.text import Text
+
     click.echo()
     click.echo(f"Package creation for {name} successful!\n")
     text = Text()
@@ -93,30 +100,166 @@ def create_cmd(ctx, language, name, output_directory):
     console.print(text)
 
 
+def _hash_file(path):
+    """
+    Helper function for _build_manifest that computes the sha256 digest of a file
+
+    Args:
+        path: the path of the file to hash
+
+    Returns:
+        The hex encoded digest
+    """
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as file_:
+        while chunk := file_.read(1024 * 1024):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _is_excluded(path, package_path):
+    """
+    Helper function for _build_manifest that determines if a file or directory
+    should be left out of the package
+
+    Args:
+        path: the path of the file or directory
+        package_path: the root directory of the package
+
+    Returns:
+        True if the path should be excluded
+    """
+    # Older versions of publish wrote the package archive into the package itself
+    if path.parent == package_path and path.name == f"{package_path.name}.tar.gz":
+        return True
+
+    return path.name in EXCLUDED_NAMES or path.name.endswith(EXCLUDED_SUFFIXES)
+
+
+def _build_manifest(package_path):
+    """
+    Build the manifest listing every file in the package along with the digest of
+    its contents
+
+    Args:
+        package_path: the root directory of the package
+
+    Returns:
+        Tuple of the manifest file entries and a dict mapping each digest to the
+        path of a file with those contents
+    """
+    files = []
+    paths_by_digest = {}
+
+    for root, dirs, filenames in os.walk(package_path):
+        root = pathlib.Path(root)
+        dirs[:] = sorted(d for d in dirs if not _is_excluded(root / d, package_path))
+
+        for filename in sorted(filenames):
+            path = root / filename
+
+            if _is_excluded(path, package_path) or not path.is_file():
+                continue
+
+            digest = _hash_file(path)
+            paths_by_digest.setdefault(digest, path)
+            files.append(
+                {
+                    "path": path.relative_to(package_path).as_posix(),
+                    "digest": digest,
+                    "size": path.stat().st_size,
+                    "mode": 0o755 if os.access(path, os.X_OK) else 0o644,
+                }
+            )
+
+    return files, paths_by_digest
+
+
+def _batch_blobs(digests, paths_by_digest):
+    """
+    Helper function for _upload_blobs that groups the files to upload into batches
+    bounded by both file count and total size
+
+    Yields:
+        Lists of digests to upload together
+    """
+    batch, batch_bytes = [], 0
+
+    for digest in digests:
+        size = paths_by_digest[digest].stat().st_size
+
+        if batch and (
+            len(batch) >= UPLOAD_BATCH_FILES or batch_bytes + size > UPLOAD_BATCH_BYTES
+        ):
+            yield batch
+            batch, batch_bytes = [], 0
+
+        batch.append(digest)
+        batch_bytes += size
+
+    if batch:
+        yield batch
+
+
+def _upload_blobs(digests, paths_by_digest):
+    """
+    Upload the contents of the files with the given digests
+
+    Args:
+        digests: the digests of the contents to upload
+        paths_by_digest: dict mapping each digest to the path of a file with those
+            contents
+    """
+    from .client import post
+
+    for batch in _batch_blobs(digests, paths_by_digest):
+        with contextlib.ExitStack() as stack:
+            files = {
+                digest: (
+                    paths_by_digest[digest].name,
+                    stack.enter_context(open(paths_by_digest[digest], "rb")),
+                )
+                for digest in batch
+            }
+            post("publish/blobs", files=files)
+
+
 @package_cmd.command()
 @click.argument("path", type=click.Path(exists=True))
 @click.pass_context
 def publish(ctx, path):
     """
-    Create an archive from the project and publish to the build server.
+    Publish the package at the given path to the build server.
 
-    This will create an archive of the files at the given path and
-    then publish them to the build server for image creation.
+    A manifest of the package files is sent to the build server first, so that
+    only files whose contents the server does not already have are uploaded.
     Use the -t option to specify a token or set the FUNCTIONARY_TOKEN
     environment variable after logging in to Functionary.
     """
+    from .client import post
+
     host = get_config_value("host", raise_exception=True)
 
     full_path = pathlib.Path(path).resolve()
-    tarfile_name = full_path.joinpath(f"{full_path.name}.tar.gz")
-    with tarfile.open(str(tarfile_name), "w:gz") as tar:
-        tar.add(str(full_path), arcname="")
+    files, paths_by_digest = _build_manifest(full_path)
+    manifest = json.dumps({"files": files})
+
+    click.echo(f"Publishing {str(full_path)} package to {host}")
+    missing = post("publish/manifest", data={"manifest": manifest})["missing"]
 
-    with open(tarfile_name, "rb") as upload_file:
-        click.echo(f"Publishing {str(tarfile_name)} package to {host}")
-        response = post("publish", files={"package_contents": upload_file})
-        id = response["id"]
-        click.echo(f"Package upload complete\nBuild id: {id}")
+    if missing:
+        upload_size = sum(paths_by_digest[d].stat().st_size for d in missing)
+        click.echo(
+            f"Uploading {len(missing)} of {len(paths_by_digest)} unique files "
+            f"({upload_size} bytes)"
+        )
+        _upload_blobs(missing, paths_by_digest)
+
+    response = post("publish", data={"manifest": manifest})
+    id = response["id"]
+    click.echo(f"Package upload complete\nBuild id: {id}")
 
 
 @package_cmd.command()
@@ -126,12 +269,15 @@ def buildstatus(ctx, id):
     """
     View status for all builds, or the build with a specific id
     """
+    from .client import get, get_all
+    from .utils import flatten, format_results
+
     title = "Build Status"
     if id:
         results = [get(f"builds/{id}")]
         title = f"Build: {id}"
     else:
-        results = get("builds")
+        results = get_all("builds")
 
     format_results(
         flatten(
@@ -152,11 +298,14 @@ def list(ctx):
     """
     View all current packages and their functions
     """
-    packages = get("packages")
-    functions = get("functions")
+    from rich.text import Text
+
+    from .client import get_all
+    from .utils import format_results
+
     functions_lookup = {}
 
-    for function in functions:
+    for function in get_all("functions"):
         package_id = function["package"]
         function_dict = {}
         function_dict["Function"] = function["name"]
@@ -173,14 +322,14 @@ def list(ctx):
         else:
             functions_lookup[package_id] = [function_dict]
 
-    for package in packages:
+    for package in get_all("packages"):
         name = package["name"]
         id = package["id"]
         # Use the description since there's more room if it's available,
         # otherwise use the summary
         if not (description := package.get("description", None)):
             description = package["summary"]
-        associated_functions = functions_lookup[id]
+        associated_functions = functions_lookup.get(id, [])
 
         title = Text(f"{name}", style="bold blue")
 
@@ -199,6 +348,10 @@ def genschema(ctx, path):
     Populate package.yaml with package functions
     """
 
+    import yaml
+
+    from .parser import parse
+
     language = None
     try:
         with open(path + "/package.yaml", "r") as yaml_file:
@@ -0,0 +1,386 @@
+import csv
+import json
+import pathlib
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+import click
+
+FINISHED_STATUSES = ["COMPLETE", "ERROR"]
+
+# Upper bound on requests in flight. This matches client.MAX_CONNECTIONS, which is
+# not imported here to keep the client's dependencies from loading on startup.
+MAX_CONCURRENCY = 64
+
+# Tasks whose status is checked per request when waiting for tasks to finish. This
+# keeps the request's list of task ids to a few kilobytes.
+STATUS_BATCH_SIZE = 100
+
+# Conversions from CSV cell text to the type a function parameter expects
+_csv_converters = {
+    "integer": int,
+    "number": float,
+    "boolean": lambda value: value.strip().lower() in ["true", "t", "yes", "y", "1"],
+    "array": json.loads,
+    "object": json.loads,
+}
+
+
+def _read_jsonl(input_file):
+    """
+    Helper function for run that reads parameter sets from JSON lines
+
+    Args:
+        input_file: open file containing one JSON object per line
+
+    Yields:
+        Tuple of the line number and the parameters dict for each non-blank line
+
+    Raises:
+        ClickException if a line is not a JSON object
+    """
+    for line_number, line in enumerate(input_file, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            parameters = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise click.ClickException(f"Invalid JSON on line {line_number}: {exc}")
+
+        if not isinstance(parameters, dict):
+            raise click.ClickException(f"Line {line_number} is not a JSON object")
+
+        yield line_number, parameters
+
+
+def _read_csv(input_file, schema):
+    """
+    Helper function for run that reads parameter sets from CSV, where the header
+    row names the parameters. Cells are converted to the types declared in the
+    function's schema, and empty cells are omitted so that defaults apply.
+
+    Args:
+        input_file: open file containing CSV data with a header row
+        schema: the function's parameter schema
+
+    Yields:
+        Tuple of the line number and the parameters dict for each row
+
+    Raises:
+        ClickException if a cell cannot be converted to the parameter's type
+    """
+    properties = schema.get("properties", {})
+    reader = csv.DictReader(input_file)
+
+    for row in reader:
+        parameters = {}
+
+        for name, value in row.items():
+            if value is None or value == "":
+                continue
+
+            param_type = properties.get(name, {}).get("type")
+            converter = _csv_converters.get(param_type, str)
+
+            try:
+                parameters[name] = converter(value)
+            except ValueError:
+                raise click.ClickException(
+                    f"Invalid {param_type} for {name} on line {reader.line_num}"
+                )
+
+        yield reader.line_num, parameters
+
+
+def _get_function_schema(function, package):
+    """
+    Helper function for run that retrieves the schema for a function
+
+    Args:
+        function: the name of the function
+        package: the name of the package the function belongs to
+
+    Returns:
+        The function's parameter schema
+
+    Raises:
+        ClickException if the function could not be found
+    """
+    from .client import get_all
+
+    package_ids = [p["id"] for p in get_all("packages") if p["name"] == package]
+
+    for function_ in get_all("functions"):
+        if function_["package"] in package_ids and function_["name"] == function:
+            return function_["schema"]
+
+    raise click.ClickException(f"No function {function} found for package {package}")
+
+
+def _create_task(function, package, parameters, priority):
+    """
+    Helper function for _submit_tasks that creates a single task
+
+    Returns:
+        The id of the created task
+    """
+    from .client import post
+
+    task = {
+        "function_name": function,
+        "package_name": package,
+        "parameters": parameters,
+    }
+
+    if priority is not None:
+        task["priority"] = priority
+
+    response = post("tasks", json=task)
+
+    return response["id"]
+
+
+def _submit_tasks(function, package, parameter_sets, concurrency, priority=None):
+    """
+    Create a task for each parameter set, keeping up to concurrency requests in
+    flight at once. Parameter sets are read lazily, so input of any size can be
+    submitted without loading it all into memory.
+
+    Args:
+        function: the name of the function to execute
+        package: the name of the package the function belongs to
+        parameter_sets: iterable of (line number, parameters) tuples
+        concurrency: the maximum number of requests in flight
+        priority: the priority of the tasks, or None for the server default
+
+    Yields:
+        A record dict for each submission, in order of completion
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = {}
+
+        def completed(futures):
+            for future in futures:
+                line_number = in_flight.pop(future)
+
+                try:
+                    yield {"line": line_number, "task_id": future.result()}
+                except click.ClickException as exc:
+                    yield {"line": line_number, "error": exc.format_message()}
+
+        for line_number, parameters in parameter_sets:
+            if len(in_flight) >= concurrency:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from completed(done)
+
+            future = executor.submit(
+                _create_task, function, package, parameters, priority
+            )
+            in_flight[future] = line_number
+
+        yield from completed(as_completed(list(in_flight)))
+
+
+def _get_statuses(task_ids):
+    """
+    Helper function for _wait_for_tasks that retrieves the status of several tasks
+    with a single list request
+
+    Returns:
+        dict of task id to status for each of the tasks found
+    """
+    from .client import get_all
+
+    endpoint = f"tasks?ids={','.join(task_ids)}&fields=id,status"
+
+    return {task["id"]: task["status"] for task in get_all(endpoint, prefetch=False)}
+
+
+def _get_result(task_id):
+    """
+    Helper function for _wait_for_tasks that retrieves the result of a finished task
+
+    Returns:
+        The task result, or None if the task finished without recording one
+    """
+    from .client import get
+
+    try:
+        return get(f"tasks/{task_id}/result")["result"]
+    except click.ClickException:
+        return None
+
+
+def _wait_for_tasks(tasks, concurrency, poll_interval):
+    """
+    Poll the given tasks until they have all finished
+
+    Each poll checks the status of the unfinished tasks in batches of
+    STATUS_BATCH_SIZE per request. Results are retrieved once a task finishes.
+
+    Args:
+        tasks: dict of task id to the line number it was submitted from
+        concurrency: the maximum number of requests in flight
+        poll_interval: seconds to wait between polls of unfinished tasks
+
+    Yields:
+        A record dict for each task as it finishes
+    """
+    pending = dict(tasks)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while pending:
+            task_ids = list(pending)
+            status_futures = {}
+            result_futures = {}
+
+            for start in range(0, len(task_ids), STATUS_BATCH_SIZE):
+                end = start + STATUS_BATCH_SIZE
+                batch = task_ids[start:end]
+                status_futures[executor.submit(_get_statuses, batch)] = batch
+
+            for future in as_completed(status_futures):
+                batch = status_futures[future]
+
+                try:
+                    statuses = future.result()
+                except click.ClickException as exc:
+                    statuses = {}
+                    error = exc.format_message()
+                else:
+                    error = "Task not found"
+
+                for task_id in batch:
+                    status = statuses.get(task_id)
+
+                    if status is None:
+                        yield {
+                            "line": pending.pop(task_id),
+                            "task_id": task_id,
+                            "error": error,
+                        }
+                    elif status in FINISHED_STATUSES:
+                        result_future = executor.submit(_get_result, task_id)
+                        result_futures[result_future] = (task_id, status)
+
+            for future in as_completed(result_futures):
+                task_id, status = result_futures[future]
+
+                yield {
+                    "line": pending.pop(task_id),
+                    "task_id": task_id,
+                    "status": status,
+                    "result": future.result(),
+                }
+
+            if pending:
+                time.sleep(poll_interval)
+
+
+@click.group("task")
+@click.pass_context
+def task_cmd(ctx):
+    """
+    Execute functions
+    """
+    pass
+
+
+@task_cmd.command()
+@click.argument("input_file", type=click.File("r"))
+@click.option("--function", "-f", required=True, help="the function to execute")
+@click.option(
+    "--package", "-p", required=True, help="the package the function belongs to"
+)
+@click.option(
+    "--format",
+    "input_format",
+    type=click.Choice(["jsonl", "csv"], case_sensitive=False),
+    help="format of the input file. Defaults to csv for .csv files, otherwise jsonl",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=click.IntRange(1, MAX_CONCURRENCY),
+    default=8,
+    show_default=True,
+    help="maximum number of requests in flight at once",
+)
+@click.option(
+    "--priority",
+    type=click.IntRange(0, 9),
+    help="priority of the tasks, where higher runs sooner. Defaults to the server's",
+)
+@click.option(
+    "--wait",
+    "wait_for_results",
+    is_flag=True,
+    help="wait for the tasks to finish and output their results",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0.1),
+    default=2.0,
+    show_default=True,
+    help="seconds between checks for finished tasks when waiting",
+)
+@click.pass_context
+def run(
+    ctx,
+    input_file,
+    function,
+    package,
+    input_format,
+    concurrency,
+    priority,
+    wait_for_results,
+    poll_interval,
+):
+    """
+    Execute a function once for each set of parameters in INPUT_FILE.
+
+    INPUT_FILE contains either one JSON object of parameters per line, or CSV
+    with a header row naming the parameters. Use - to read from stdin.
+
+    A JSON line is written to stdout for each task as it is created, or as it
+    finishes when --wait is used.
+    """
+    if input_format is None:
+        suffix = pathlib.Path(input_file.name).suffix.lower()
+        input_format = "csv" if suffix == ".csv" else "jsonl"
+
+    if input_format == "csv":
+        parameter_sets = _read_csv(input_file, _get_function_schema(function, package))
+    else:
+        parameter_sets = _read_jsonl(input_file)
+
+    submitted = {}
+    created = 0
+    errors = 0
+
+    records = _submit_tasks(function, package, parameter_sets, concurrency, priority)
+
+    for record in records:
+        if "error" in record:
+            errors += 1
+        else:
+            created += 1
+
+            if wait_for_results:
+                submitted[record["task_id"]] = record["line"]
+                continue
+
+        click.echo(json.dumps(record))
+
+    click.echo(f"Created {created} tasks", err=True)
+
+    if wait_for_results:
+        for record in _wait_for_tasks(submitted, concurrency, poll_interval):
+            if "error" in record or record["status"] != "COMPLETE":
+                errors += 1
+
+            click.echo(json.dumps(record))
+
+    if errors:
+        raise click.ClickException(f"{errors} tasks failed")
@@ -1,8 +1,5 @@
 import datetime
 
-from rich.console import Console
-from rich.table import Table
-
 
 def flatten(results, object_fields):
     """Flattens any nested objects in results.
@@ -72,6 +69,9 @@ def format_results(results, title="", excluded_fields=[]):
     Returns:
         None
     """
+    from rich.console import Console
+    from rich.table import Table
+
     table = Table(title=title, show_lines=True, title_justify="left")
     console = Console()
     first_row = True
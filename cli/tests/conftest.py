@@ -1,6 +1,13 @@
 import pytest
 
-from functionary.config import config_file
+from functionary.config import config_file, load_config
+
+
+@pytest.fixture(autouse=True)
+def reset_config():
+    """The config file is only read once per process, so discard the snapshot between
+    tests to pick up each test's config file."""
+    load_config.cache_clear()
 
 
 @pytest.fixture
@@ -15,7 +22,7 @@ def fakefs(fs):
 def config(fakefs):
     fakefs.create_file(config_file)
     conf = (
-        "host='http://localhost:8000\n"
+        "host='http://localhost:8000'\n"
         "token='05139f102fbbce91f32153511011b7a185992f54'\n"
         "current_environment_id='e8c5c607-8b03-4e94-a93e-cd3c45c33ffd'"
     )
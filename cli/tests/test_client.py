@@ -0,0 +1,74 @@
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from functionary.client import get_all
+
+TOTAL_RESULTS = 7
+
+
+def paginated_response(url, *args, **kwargs):
+    """Mimics a LimitOffsetPagination list endpoint, with next links using a host
+    that differs from the configured one"""
+    query = parse_qs(urlsplit(url).query)
+    limit = int(query["limit"][0])
+    offset = int(query.get("offset", [0])[0])
+    next_offset = offset + limit
+
+    if next_offset < TOTAL_RESULTS:
+        next_url = (
+            f"http://internal:8000/api/v1/packages?limit={limit}&offset={next_offset}"
+        )
+    else:
+        next_url = None
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(
+        {
+            "count": TOTAL_RESULTS,
+            "next": next_url,
+            "results": [
+                {"id": i} for i in range(offset, min(next_offset, TOTAL_RESULTS))
+            ],
+        }
+    ).encode()
+
+    return response
+
+
+@pytest.mark.usefixtures("config")
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_get_all_follows_next_links(monkeypatch, prefetch):
+    """get_all should return the results from every page"""
+    requested_urls = []
+
+    def record_request(session, url, *args, **kwargs):
+        requested_urls.append(url)
+        return paginated_response(url)
+
+    monkeypatch.setattr(requests.Session, "get", record_request)
+
+    results = list(get_all("packages", page_size=3, prefetch=prefetch))
+
+    assert [result["id"] for result in results] == list(range(TOTAL_RESULTS))
+    assert len(requested_urls) == 3
+    assert all(url.startswith("http://localhost:8000/") for url in requested_urls)
+
+
+@pytest.mark.usefixtures("config")
+def test_requests_share_session(monkeypatch):
+    """Every request should be sent through the same pooled session"""
+    sessions = set()
+
+    def record_session(session, url, *args, **kwargs):
+        sessions.add(id(session))
+        return paginated_response(url)
+
+    monkeypatch.setattr(requests.Session, "get", record_session)
+
+    list(get_all("packages", page_size=2))
+
+    assert len(sessions) == 1
@@ -0,0 +1,77 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from functionary.package import publish
+
+PACKAGE_FILES = {
+    "package.yaml": b"version: '1.0'\n",
+    "functions.py": b"def test():\n    pass\n",
+    "data/lookup.csv": b"a,b\n1,2\n",
+}
+
+
+@pytest.fixture
+def package_path(fakefs):
+    path = Path.home() / "publish-test"
+
+    for name, contents in PACKAGE_FILES.items():
+        fakefs.create_file(path / name, contents=contents)
+
+    # Build artifacts that should never be published
+    fakefs.create_file(path / "publish-test.tar.gz", contents=b"old archive")
+    fakefs.create_file(path / "__pycache__" / "functions.cpython-310.pyc")
+    fakefs.create_file(path / ".git" / "HEAD")
+
+    return path
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Records the requests made by publish, with the server already holding the
+    contents of functions.py"""
+    requests = []
+    stored = {hashlib.sha256(PACKAGE_FILES["functions.py"]).hexdigest()}
+
+    def post(endpoint, data=None, files=None):
+        requests.append((endpoint, data, files))
+
+        if endpoint == "publish/manifest":
+            manifest = json.loads(data["manifest"])
+            digests = [file_["digest"] for file_ in manifest["files"]]
+            return {"missing": [d for d in digests if d not in stored]}
+        elif endpoint == "publish/blobs":
+            stored.update(files.keys())
+            return {"stored": list(files.keys())}
+        else:
+            return {"id": "buildid"}
+
+    monkeypatch.setattr("functionary.client.post", post)
+
+    return requests
+
+
+@pytest.mark.usefixtures("config")
+def test_publish_uploads_only_missing_files(package_path, server):
+    """Only files whose contents the server lacks are uploaded, and build artifacts
+    are excluded from the manifest"""
+    result = CliRunner().invoke(publish, [str(package_path)])
+
+    assert result.exit_code == 0
+    assert "buildid" in result.output
+
+    manifest_request, blobs_request, publish_request = server
+    manifest = json.loads(manifest_request[1]["manifest"])
+
+    assert sorted(file_["path"] for file_ in manifest["files"]) == sorted(
+        PACKAGE_FILES.keys()
+    )
+    assert sorted(blobs_request[2].keys()) == sorted(
+        hashlib.sha256(PACKAGE_FILES[name]).hexdigest()
+        for name in ["package.yaml", "data/lookup.csv"]
+    )
+    assert publish_request[0] == "publish"
+    assert json.loads(publish_request[1]["manifest"]) == manifest
@@ -0,0 +1,70 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+CLI_ROOT = Path(__file__).resolve().parents[1]
+
+# Dependencies that are slow to import and must only be loaded by the subcommands
+# that use them
+HEAVY_MODULES = ["dotenv", "requests", "rich", "yaml"]
+
+# Generous upper bound, in microseconds, on the cumulative import time of the CLI
+# entry point. This is intended to catch a heavy import being reintroduced at the
+# top level, not to benchmark precisely.
+ENTRY_POINT_IMPORT_BUDGET = 150_000
+
+
+def _import_times(code):
+    """Run code in a fresh interpreter with -X importtime and return a mapping of
+    each imported top level module to its cumulative import time in microseconds"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=CLI_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, module = line.split("|")
+        import_times[module.strip()] = int(cumulative)
+
+    return import_times
+
+
+def test_entry_point_import_budget():
+    """Loading the CLI entry point should not import any command modules or heavy
+    dependencies, and should stay within its import time budget"""
+    import_times = _import_times("from functionary.functionary import cli")
+
+    for module in HEAVY_MODULES + ["functionary.package", "functionary.client"]:
+        assert module not in import_times
+
+    assert import_times["functionary.functionary"] < ENTRY_POINT_IMPORT_BUDGET
+
+
+@pytest.mark.parametrize(
+    "command,allowed",
+    [
+        ("login", ["requests"]),
+        ("environment", []),
+        ("package", []),
+        ("task", []),
+    ],
+)
+def test_subcommand_imports(command, allowed):
+    """Resolving a subcommand should only import the heavy dependencies it needs"""
+    import_times = _import_times(
+        "from functionary.functionary import cli; "
+        f"cli.get_command(None, {command!r})"
+    )
+
+    for module in HEAVY_MODULES:
+        if module not in allowed:
+            assert module not in import_times
@@ -0,0 +1,160 @@
+import json
+from pathlib import Path
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from functionary.task import run
+
+SCHEMA = {
+    "properties": {
+        "count": {"type": "integer"},
+        "ratio": {"type": "number"},
+        "enabled": {"type": "boolean"},
+        "tags": {"type": "array"},
+        "name": {"type": "string"},
+    }
+}
+
+
+class Server(dict):
+    """The tasks created, by id, along with the GET requests made"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Records the tasks created by run. Tasks whose parameters contain fail are
+    rejected, and every created task completes with its parameters as the result."""
+    tasks = Server()
+
+    def post(endpoint, data=None, files=None, json=None):
+        if json["parameters"].get("fail"):
+            raise click.ClickException("invalid parameters")
+
+        task_id = f"task{len(tasks)}"
+        tasks[task_id] = json
+
+        return {"id": task_id}
+
+    def get(endpoint):
+        task_id = endpoint.split("/")[1]
+        tasks.requests.append(endpoint)
+
+        return {"result": tasks[task_id]["parameters"]}
+
+    def get_all(endpoint, **kwargs):
+        tasks.requests.append(endpoint)
+
+        if endpoint.startswith("tasks?"):
+            task_ids = endpoint.split("ids=")[1].split("&")[0].split(",")
+            return [{"id": task_id, "status": "COMPLETE"} for task_id in task_ids]
+        if endpoint == "packages":
+            return [{"id": "packageid", "name": "testpackage"}]
+
+        return [{"package": "packageid", "name": "testfunction", "schema": SCHEMA}]
+
+    monkeypatch.setattr("functionary.client.post", post)
+    monkeypatch.setattr("functionary.client.get", get)
+    monkeypatch.setattr("functionary.client.get_all", get_all)
+    return tasks
+
+
+def _run(fakefs, filename, contents, *args):
+    path = Path.home() / filename
+    fakefs.create_file(path, contents=contents)
+
+    return CliRunner(mix_stderr=False).invoke(
+        run, [str(path), "-f", "testfunction", "-p", "testpackage", *args]
+    )
+
+
+def _records(output):
+    return sorted(
+        [json.loads(line) for line in output.splitlines()], key=lambda r: r["line"]
+    )
+
+
+@pytest.mark.usefixtures("config")
+def test_run_jsonl(fakefs, server):
+    """Each line of a JSON lines file creates a task"""
+    contents = '{"name": "a"}\n\n{"name": "b"}\n'
+    result = _run(fakefs, "params.jsonl", contents, "--concurrency", "1")
+
+    assert result.exit_code == 0
+    assert result.stderr == "Created 2 tasks\n"
+    assert [r["line"] for r in _records(result.stdout)] == [1, 3]
+    assert sorted(t["parameters"]["name"] for t in server.values()) == ["a", "b"]
+    assert all(t["function_name"] == "testfunction" for t in server.values())
+    assert all("priority" not in t for t in server.values())
+
+
+@pytest.mark.usefixtures("config")
+def test_run_with_priority(fakefs, server):
+    """The priority option is sent with each task"""
+    result = _run(fakefs, "params.jsonl", '{"name": "a"}\n', "--priority", "1")
+
+    assert result.exit_code == 0
+    assert list(server.values())[0]["priority"] == 1
+
+
+@pytest.mark.usefixtures("config")
+def test_run_csv_converts_types(fakefs, server):
+    """CSV cells are converted to the types in the function schema, and empty cells
+    are omitted"""
+    contents = 'count,ratio,enabled,tags,name\n3,0.5,yes,"[1, 2]",\n'
+    result = _run(fakefs, "params.csv", contents)
+
+    assert result.exit_code == 0
+    assert list(server.values())[0]["parameters"] == {
+        "count": 3,
+        "ratio": 0.5,
+        "enabled": True,
+        "tags": [1, 2],
+    }
+
+
+@pytest.mark.usefixtures("config")
+def test_run_reports_failed_rows(fakefs, server):
+    """A rejected row is reported without stopping the remaining rows, and the
+    command exits with an error"""
+    contents = '{"name": "a"}\n{"fail": true}\n{"name": "c"}\n'
+    result = _run(fakefs, "params.jsonl", contents)
+    records = _records(result.stdout)
+
+    assert result.exit_code != 0
+    assert len(server) == 2
+    assert records[1] == {"line": 2, "error": "invalid parameters"}
+    assert "task_id" in records[0] and "task_id" in records[2]
+
+
+@pytest.mark.usefixtures("config")
+def test_run_wait_outputs_results(fakefs, server):
+    """With --wait, the result of each task is output once it completes"""
+    contents = '{"name": "a"}\n{"name": "b"}\n'
+    result = _run(fakefs, "params.jsonl", contents, "--wait")
+    records = _records(result.stdout)
+
+    assert result.exit_code == 0
+    assert [r["status"] for r in records] == ["COMPLETE", "COMPLETE"]
+    assert [r["result"] for r in records] == [{"name": "a"}, {"name": "b"}]
+
+
+@pytest.mark.usefixtures("config")
+def test_run_wait_checks_statuses_in_batches(fakefs, server, monkeypatch):
+    """Task statuses are checked with one list request per batch of tasks, and each
+    result is retrieved once"""
+    monkeypatch.setattr("functionary.task.STATUS_BATCH_SIZE", 2)
+    contents = '{"name": "a"}\n{"name": "b"}\n{"name": "c"}\n'
+    result = _run(fakefs, "params.jsonl", contents, "--wait")
+    status_requests = [r for r in server.requests if r.startswith("tasks?")]
+
+    assert result.exit_code == 0
+    assert result.stderr == "Created 3 tasks\n"
+    assert len(status_requests) == 2
+    assert all(r.endswith("&fields=id,status") for r in status_requests)
+    assert len([r for r in server.requests if r.endswith("/result")]) == 3
@@ -1,4 +1,5 @@
 from .build import BuildSerializer  # noqa
+from .manifest import ManifestFileSerializer, PackageManifestSerializer  # noqa
 from .package_definition import (  # noqa
     PackageDefinitionSerializer,
     PackageDefinitionWithVersionSerializer,
@@ -0,0 +1,44 @@
+""" Serializers for publishing a package by manifest """
+from pathlib import PurePosixPath
+
+from rest_framework import serializers
+
+SHA256_REGEX = r"^[0-9a-f]{64}$"
+
+
+class ManifestFileSerializer(serializers.Serializer):
+    """Serializer for a single file entry in a package manifest"""
+
+    path = serializers.CharField(max_length=4096)
+    digest = serializers.RegexField(SHA256_REGEX)
+    size = serializers.IntegerField(min_value=0)
+    mode = serializers.IntegerField(min_value=0, max_value=0o777, default=0o644)
+
+    def validate_path(self, value):
+        """Ensure the path stays within the package directory"""
+        path = PurePosixPath(value)
+
+        if path.is_absolute() or ".." in path.parts or str(path) in ["", "."]:
+            raise serializers.ValidationError(f"Invalid path: {value}")
+
+        return str(path)
+
+
+class PackageManifestSerializer(serializers.Serializer):
+    """Serializer for the manifest listing every file in a package and the digest
+    of its contents"""
+
+    files = ManifestFileSerializer(many=True, allow_empty=False)
+
+    def validate_files(self, value):
+        """Ensure that each path appears only once and that the package definition
+        is included"""
+        paths = [file_["path"] for file_ in value]
+
+        if len(paths) != len(set(paths)):
+            raise serializers.ValidationError("Manifest contains duplicate paths")
+
+        if "package.yaml" not in paths:
+            raise serializers.ValidationError("package.yaml not found")
+
+        return value
@@ -9,4 +9,6 @@ router.register(r"builds", views.BuildViewSet)
 urlpatterns = [
     path("", include(router.urls)),
     path("publish", views.PublishView.as_view()),
+    path("publish/manifest", views.PublishManifestView.as_view()),
+    path("publish/blobs", views.PublishBlobsView.as_view()),
 ]
@@ -1,2 +1,2 @@
 from .build import BuildViewSet  # noqa
-from .publish import PublishView  # noqa
+from .publish import PublishBlobsView, PublishManifestView, PublishView  # noqa
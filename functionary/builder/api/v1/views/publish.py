@@ -1,28 +1,80 @@
+import json
+
 from drf_spectacular.utils import extend_schema
 from rest_framework.exceptions import ParseError
-from rest_framework.parsers import MultiPartParser
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from builder.exceptions import InvalidPackage
-from builder.utils import extract_package_definition, initiate_build
+from builder.utils import (
+    assemble_package_contents,
+    extract_package_definition,
+    find_missing_blobs,
+    initiate_build,
+    store_blobs,
+)
 from core.api import HEADER_PARAMETERS
 from core.api.mixins import EnvironmentViewMixin
 from core.api.permissions import HasEnvironmentPermissionForAction
 
-from ..serializers import BuildSerializer, PackageDefinitionWithVersionSerializer
+from ..serializers import (
+    BuildSerializer,
+    PackageDefinitionWithVersionSerializer,
+    PackageManifestSerializer,
+)
+
+MANIFEST_SCHEMA = {
+    "type": "string",
+    "description": (
+        "JSON encoded package manifest of the form "
+        '{"files": [{"path": ..., "digest": ..., "size": ..., "mode": ...}]}, '
+        "where digest is the hex encoded sha256 digest of the file contents"
+    ),
+}
+
+
+def _get_manifest_files(request) -> list[dict]:
+    """Parse and validate the package manifest included in the request
+
+    The manifest may be supplied either as an object in a JSON request body or as a
+    JSON encoded string in a form field.
+
+    Returns:
+        The validated file entries of the manifest
+    """
+    manifest = request.data.get("manifest")
+
+    if isinstance(manifest, str):
+        try:
+            manifest = json.loads(manifest)
+        except json.JSONDecodeError:
+            raise ParseError(detail="manifest must be valid JSON")
+
+    serializer = PackageManifestSerializer(data=manifest)
+
+    if not serializer.is_valid():
+        raise InvalidPackage(
+            f"Invalid manifest. Encountered error: {serializer.errors}"
+        )
+
+    return serializer.validated_data["files"]
 
 
 class PublishView(APIView, EnvironmentViewMixin):
     """View for submitting a package to be built and published."""
 
-    parser_classes = [MultiPartParser]
+    parser_classes = [MultiPartParser, FormParser]
     permission_classes = [HasEnvironmentPermissionForAction]
     permissioned_model = "Package"
 
     # TODO: Add reference to package description YAML documentation once it exists
     @extend_schema(
-        description=("Publish a package"),
+        description=(
+            "Publish a package. Either package_contents or manifest must be "
+            "provided. When publishing by manifest, the contents of every file must "
+            "have already been uploaded via publish/blobs."
+        ),
         request={
             "multipart/form-data": {
                 "type": "object",
@@ -32,6 +84,7 @@ class PublishView(APIView, EnvironmentViewMixin):
                         "format": "binary",
                         "description": "gzipped tarball containing the package files",
                     },
+                    "manifest": MANIFEST_SCHEMA,
                 },
             }
         },
@@ -47,7 +100,13 @@ class PublishView(APIView, EnvironmentViewMixin):
         self._validate_publish_input(request)
 
         environment = self.get_environment()
-        package_contents_blob = request.FILES.get("package_contents").read()
+
+        if request.FILES.get("package_contents") is not None:
+            package_contents_blob = request.FILES.get("package_contents").read()
+        else:
+            package_contents_blob = assemble_package_contents(
+                environment, _get_manifest_files(request)
+            )
 
         # TO-DO: put invalid package yaml class here
         try:
@@ -77,5 +136,86 @@ class PublishView(APIView, EnvironmentViewMixin):
 
     def _validate_publish_input(self, request):
         """Validates that the request includes all required data"""
-        if request.FILES.get("package_contents") is None:
-            raise ParseError(detail="package_contents is required and must be a file")
+        if (
+            request.FILES.get("package_contents") is None
+            and request.data.get("manifest") is None
+        ):
+            raise ParseError(
+                detail="package_contents must be a file, or a manifest must be provided"
+            )
+
+
+class PublishManifestView(APIView, EnvironmentViewMixin):
+    """View for determining which package files need to be uploaded before a package
+    can be published by manifest."""
+
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    permission_classes = [HasEnvironmentPermissionForAction]
+    permissioned_model = "Package"
+
+    @extend_schema(
+        description=(
+            "Submit a package manifest and receive the digests of the file contents "
+            "that have not yet been uploaded"
+        ),
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"manifest": MANIFEST_SCHEMA},
+            }
+        },
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "missing": {"type": "array", "items": {"type": "string"}}
+                },
+            }
+        },
+        parameters=HEADER_PARAMETERS,
+    )
+    def post(self, request, *args, **kwargs):
+        missing = find_missing_blobs(
+            self.get_environment(), _get_manifest_files(request)
+        )
+
+        return Response({"missing": missing})
+
+
+class PublishBlobsView(APIView, EnvironmentViewMixin):
+    """View for uploading the contents of package files ahead of publishing a package
+    by manifest."""
+
+    parser_classes = [MultiPartParser]
+    permission_classes = [HasEnvironmentPermissionForAction]
+    permissioned_model = "Package"
+
+    @extend_schema(
+        description=(
+            "Upload package file contents. Each file must be supplied in a field "
+            "named for the hex encoded sha256 digest of its contents."
+        ),
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "additionalProperties": {"type": "string", "format": "binary"},
+            }
+        },
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "stored": {"type": "array", "items": {"type": "string"}}
+                },
+            }
+        },
+        parameters=HEADER_PARAMETERS,
+    )
+    def post(self, request, *args, **kwargs):
+        if not request.FILES:
+            raise ParseError(detail="At least one file must be provided")
+
+        blobs = {digest: upload.read() for digest, upload in request.FILES.items()}
+        store_blobs(self.get_environment(), blobs)
+
+        return Response({"stored": list(blobs.keys())})
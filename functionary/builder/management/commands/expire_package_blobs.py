@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from builder.utils import expire_package_blobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue the background deletion of uploaded package file contents that have "
+        "not been used for PACKAGE_BLOB_RETENTION_DAYS. Intended to be run "
+        "periodically, such as daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of blobs to delete per batch",
+        )
+
+    def handle(self, *args, **options):
+        expire_package_blobs.delay(batch_size=options["batch_size"])
+        self.stdout.write("Queued package blob expiry")
@@ -0,0 +1,47 @@
+# Generated by Django 4.1.1 on 2026-10-19 08:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_task_output_compression"),
+        ("builder", "0002_buildlog"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackageBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("digest", models.CharField(max_length=64)),
+                ("size", models.PositiveBigIntegerField()),
+                ("contents", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "environment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="core.environment",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="packageblob",
+            constraint=models.UniqueConstraint(
+                fields=("environment", "digest"),
+                name="package_blob_environment_digest_unique_together",
+            ),
+        ),
+    ]
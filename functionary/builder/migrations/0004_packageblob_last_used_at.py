@@ -0,0 +1,21 @@
+# Generated by Django 4.1.1 on 2026-10-19 09:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("builder", "0003_packageblob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packageblob",
+            name="last_used_at",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+    ]
@@ -1,2 +1,3 @@
 from .build import Build, BuildResource  # noqa
 from .build_log import BuildLog  # noqa
+from .package_blob import PackageBlob  # noqa
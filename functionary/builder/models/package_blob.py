@@ -0,0 +1,39 @@
+""" PackageBlob model """
+from django.db import models
+from django.utils import timezone
+
+from core.models import Environment
+
+
+class PackageBlob(models.Model):
+    """Content addressed storage for the individual files of published packages.
+    Publishing with a manifest only requires uploading the files whose contents are
+    not already stored for the environment.
+
+    Attributes:
+        environment: the environment the contents were published to
+        digest: hex encoded sha256 digest of the contents
+        size: size of the contents in bytes
+        contents: the file contents
+        created_at: time that the contents were first uploaded
+        last_used_at: time that the contents were last referenced by a manifest.
+                      Blobs unused for PACKAGE_BLOB_RETENTION_DAYS are deleted.
+    """
+
+    environment = models.ForeignKey(to=Environment, on_delete=models.CASCADE)
+    digest = models.CharField(max_length=64)
+    size = models.PositiveBigIntegerField()
+    contents = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["environment", "digest"],
+                name="package_blob_environment_digest_unique_together",
+            )
+        ]
+
+    def __str__(self):
+        return self.digest
@@ -1,3 +1,211 @@
-from django.test import TestCase  # noqa
+import hashlib
+import io
+import json
+import tarfile
+from datetime import timedelta
 
-# Create your tests here.
+import pytest
+import yaml
+from django.utils import timezone
+
+from builder.models import Build, PackageBlob
+from builder.utils import expire_package_blobs
+from core.models import Team
+
+PACKAGE_YAML = yaml.dump(
+    {
+        "version": "1.0",
+        "package": {
+            "name": "testpackage",
+            "language": "python",
+            "functions": [{"name": "testfunction", "parameters": []}],
+        },
+    }
+).encode()
+FUNCTIONS_PY = b"def testfunction():\n    return 1\n"
+
+
+def _manifest(files, sizes=None):
+    sizes = sizes or {}
+
+    return json.dumps(
+        {
+            "files": [
+                {
+                    "path": path,
+                    "digest": hashlib.sha256(contents).hexdigest(),
+                    "size": sizes.get(path, len(contents)),
+                }
+                for path, contents in files.items()
+            ]
+        }
+    )
+
+
+def _store(environment, contents, digest=None):
+    return PackageBlob.objects.create(
+        environment=environment,
+        digest=digest or hashlib.sha256(contents).hexdigest(),
+        size=len(contents),
+        contents=contents,
+    )
+
+
+@pytest.fixture
+def environment():
+    return Team.objects.create(name="team").environments.get()
+
+
+@pytest.fixture
+def request_headers(environment):
+    return {"HTTP_X_ENVIRONMENT_ID": str(environment.id)}
+
+
+@pytest.fixture
+def package_files():
+    return {"package.yaml": PACKAGE_YAML, "functions.py": FUNCTIONS_PY}
+
+
+def test_manifest_reports_missing_blobs(
+    admin_client, environment, request_headers, package_files
+):
+    """Only the digests of contents not yet uploaded are reported as missing"""
+    stored = hashlib.sha256(FUNCTIONS_PY).hexdigest()
+    PackageBlob.objects.create(
+        environment=environment,
+        digest=stored,
+        size=len(FUNCTIONS_PY),
+        contents=FUNCTIONS_PY,
+    )
+
+    response = admin_client.post(
+        "/api/v1/publish/manifest",
+        data={"manifest": _manifest(package_files)},
+        **request_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.data["missing"] == [hashlib.sha256(PACKAGE_YAML).hexdigest()]
+
+
+def test_manifest_rejects_paths_outside_package(
+    admin_client, request_headers, package_files
+):
+    """Manifest paths may not escape the package directory"""
+    package_files["../escape.py"] = b""
+
+    response = admin_client.post(
+        "/api/v1/publish/manifest",
+        data={"manifest": _manifest(package_files)},
+        **request_headers,
+    )
+
+    assert response.status_code == 400
+
+
+def test_blobs_must_match_digest(admin_client, request_headers):
+    """Uploaded contents that do not match their digest are rejected"""
+    digest = hashlib.sha256(b"expected").hexdigest()
+
+    response = admin_client.post(
+        "/api/v1/publish/blobs",
+        data={digest: io.BytesIO(b"actual")},
+        **request_headers,
+    )
+
+    assert response.status_code == 400
+    assert not PackageBlob.objects.exists()
+
+
+def test_publish_by_manifest(admin_client, request_headers, package_files, mocker):
+    """A package can be published from a manifest once its contents are uploaded"""
+    mocker.patch("builder.utils.build_package.delay")
+    manifest = _manifest(package_files)
+
+    response = admin_client.post(
+        "/api/v1/publish", data={"manifest": manifest}, **request_headers
+    )
+    assert response.status_code == 400
+    assert not Build.objects.exists()
+
+    admin_client.post(
+        "/api/v1/publish/blobs",
+        data={
+            hashlib.sha256(contents).hexdigest(): io.BytesIO(contents)
+            for contents in package_files.values()
+        },
+        **request_headers,
+    )
+    response = admin_client.post(
+        "/api/v1/publish", data={"manifest": manifest}, **request_headers
+    )
+    assert response.status_code == 200
+
+    build = Build.objects.get(id=response.data["id"])
+    package_contents = io.BytesIO(bytes(build.resources.package_contents))
+
+    with tarfile.open(fileobj=package_contents, mode="r") as tarball:
+        assert tarball.extractfile("functions.py").read() == FUNCTIONS_PY
+
+
+def test_publish_rejects_size_mismatch(
+    admin_client, environment, request_headers, package_files
+):
+    """A manifest whose sizes don't match the stored contents is rejected"""
+    for contents in package_files.values():
+        _store(environment, contents)
+
+    manifest = _manifest(package_files, sizes={"functions.py": len(FUNCTIONS_PY) + 1})
+
+    for url in ["/api/v1/publish/manifest", "/api/v1/publish"]:
+        response = admin_client.post(
+            url, data={"manifest": manifest}, **request_headers
+        )
+
+        assert response.status_code == 400
+        assert "functions.py" in str(response.data)
+
+    assert not Build.objects.exists()
+
+
+def test_publish_rejects_digest_mismatch(
+    admin_client, environment, request_headers, package_files
+):
+    """Stored contents that don't match their digest are not built"""
+    _store(environment, PACKAGE_YAML)
+    _store(
+        environment,
+        b"def testfunction():\n    return 2\n",
+        digest=hashlib.sha256(FUNCTIONS_PY).hexdigest(),
+    )
+
+    response = admin_client.post(
+        "/api/v1/publish",
+        data={"manifest": _manifest(package_files)},
+        **request_headers,
+    )
+
+    assert response.status_code == 400
+    assert not Build.objects.exists()
+
+
+def test_expire_package_blobs(
+    admin_client, environment, request_headers, package_files, settings
+):
+    """Blobs are deleted once unused for the retention period, while referencing a
+    blob from a manifest keeps it"""
+    settings.PACKAGE_BLOB_RETENTION_DAYS = 30
+    expired = timezone.now() - timedelta(days=31)
+    used = _store(environment, FUNCTIONS_PY)
+    unused = _store(environment, b"stale")
+    PackageBlob.objects.update(last_used_at=expired)
+
+    admin_client.post(
+        "/api/v1/publish/manifest",
+        data={"manifest": _manifest(package_files)},
+        **request_headers,
+    )
+    expire_package_blobs()
+
+    assert PackageBlob.objects.filter(pk=used.pk).exists()
+    assert not PackageBlob.objects.filter(pk=unused.pk).exists()
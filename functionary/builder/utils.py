@@ -1,10 +1,12 @@
 import datetime
+import hashlib
 import io
 import json
 import logging
 import os
 import shutil
 import tarfile
+import time
 from typing import TypeVar
 from uuid import UUID
 
@@ -14,14 +16,16 @@ from celery.utils.log import get_task_logger
 from django.conf import settings
 from django.db import transaction
 from django.template.loader import get_template
+from django.utils import timezone
 from docker.errors import APIError, BuildError, DockerException
 from pydantic import Field, Json, create_model
 
 from core.models import Environment, Function, Package, User
+from core.utils.metrics import BUILD_SECONDS
 
 from .celery import app
 from .exceptions import InvalidPackage
-from .models import Build, BuildLog, BuildResource
+from .models import Build, BuildLog, BuildResource, PackageBlob
 
 logger = get_task_logger(__name__)
 logger.setLevel(getattr(logging, settings.LOG_LEVEL))
@@ -65,6 +69,141 @@ def extract_package_definition(package_contents: bytes) -> dict:
     return package_definition
 
 
+def find_missing_blobs(environment: Environment, files: list[dict]) -> list[str]:
+    """Determine which of the file contents in a manifest have not yet been uploaded
+    for the environment
+
+    Stored contents referenced by the manifest are marked as used, so that they are
+    kept for the publish that follows.
+
+    Args:
+        environment: The environment the package is being published to
+        files: The validated file entries of a package manifest
+
+    Returns:
+        The digests with no stored contents, in the order provided
+
+    Raises:
+        InvalidPackage: A file's size does not match that of the stored contents
+    """
+    digests = [file_["digest"] for file_ in files]
+    blobs = PackageBlob.objects.filter(environment=environment, digest__in=set(digests))
+    sizes = dict(blobs.values_list("digest", "size"))
+
+    for file_ in files:
+        if file_["digest"] in sizes and sizes[file_["digest"]] != file_["size"]:
+            raise InvalidPackage(f"Size of {file_['path']} does not match its contents")
+
+    blobs.update(last_used_at=timezone.now())
+
+    return list(dict.fromkeys(d for d in digests if d not in sizes))
+
+
+def store_blobs(environment: Environment, blobs: dict[str, bytes]) -> None:
+    """Store uploaded package file contents, verifying that each matches its digest
+
+    Args:
+        environment: The environment the package is being published to
+        blobs: dict of the claimed sha256 digest to the file contents
+
+    Raises:
+        InvalidPackage: The contents do not match the digest they were uploaded as
+    """
+    package_blobs = []
+
+    for digest, contents in blobs.items():
+        if hashlib.sha256(contents).hexdigest() != digest:
+            raise InvalidPackage(f"Contents do not match digest {digest}")
+
+        package_blobs.append(
+            PackageBlob(
+                environment=environment,
+                digest=digest,
+                size=len(contents),
+                contents=contents,
+            )
+        )
+
+    # Blobs are immutable, so one that was stored concurrently is already correct
+    PackageBlob.objects.bulk_create(package_blobs, ignore_conflicts=True)
+
+
+def assemble_package_contents(environment: Environment, files: list[dict]) -> bytes:
+    """Assemble a package tarball from previously uploaded file contents
+
+    Args:
+        environment: The environment the package is being published to
+        files: The validated file entries of a package manifest
+
+    Returns:
+        A gzipped tarball containing the package files
+
+    Raises:
+        InvalidPackage: The contents of one or more files have not been uploaded, or
+            do not match the size and digest given in the manifest
+    """
+    digests = [file_["digest"] for file_ in files]
+    blobs = PackageBlob.objects.filter(environment=environment, digest__in=set(digests))
+    contents_by_digest = {
+        digest: bytes(contents)
+        for digest, contents in blobs.values_list("digest", "contents")
+    }
+
+    if missing := [
+        digest for digest in dict.fromkeys(digests) if digest not in contents_by_digest
+    ]:
+        raise InvalidPackage(f"Contents not uploaded for: {', '.join(missing)}")
+
+    for digest, contents in contents_by_digest.items():
+        if hashlib.sha256(contents).hexdigest() != digest:
+            raise InvalidPackage(f"Stored contents do not match digest {digest}")
+
+    for file_ in files:
+        if len(contents_by_digest[file_["digest"]]) != file_["size"]:
+            raise InvalidPackage(f"Size of {file_['path']} does not match its contents")
+
+    blobs.update(last_used_at=timezone.now())
+    package_contents_io = io.BytesIO()
+
+    with tarfile.open(fileobj=package_contents_io, mode="w:gz") as tarball:
+        for file_ in files:
+            contents = contents_by_digest[file_["digest"]]
+            tarinfo = tarfile.TarInfo(name=file_["path"])
+            tarinfo.size = len(contents)
+            tarinfo.mode = file_["mode"]
+            tarball.addfile(tarinfo, io.BytesIO(contents))
+
+    return package_contents_io.getvalue()
+
+
+@app.task
+def expire_package_blobs(batch_size: int = None) -> None:
+    """Delete uploaded package file contents that no published manifest has
+    referenced for PACKAGE_BLOB_RETENTION_DAYS
+
+    A single batch is deleted per run. If more remain, the task requeues itself.
+
+    Args:
+        batch_size: Maximum number of blobs to delete per run. Defaults to
+                    PACKAGE_BLOB_EXPIRE_BATCH_SIZE.
+    """
+    if not settings.PACKAGE_BLOB_RETENTION_DAYS:
+        return
+
+    batch_size = batch_size or settings.PACKAGE_BLOB_EXPIRE_BATCH_SIZE
+    cutoff = timezone.now() - datetime.timedelta(
+        days=settings.PACKAGE_BLOB_RETENTION_DAYS
+    )
+    expired = PackageBlob.objects.filter(last_used_at__lt=cutoff).values_list(
+        "pk", flat=True
+    )
+    count, _ = PackageBlob.objects.filter(pk__in=list(expired[:batch_size])).delete()
+    logger.debug("Deleted %s expired package blobs", count)
+
+    if count == batch_size:
+        expire_package_blobs.delay(batch_size=batch_size)
+
+
 def initiate_build(
     creator: User,
     environment: Environment,
@@ -167,6 +306,7 @@ def build_package(build_id: UUID):
     docker_client = docker.from_env()
 
     logger.info(f"Starting build {build_id}")
+    start = time.monotonic()
 
     workdir = f"{settings.BUILDER_WORKDIR_BASE}/{build_id}"
     os.makedirs(workdir)
@@ -231,6 +371,8 @@ def build_package(build_id: UUID):
         BuildLog.objects.create(build=build, log=build_log)
         build.save()
 
+    BUILD_SECONDS.labels(status=build.status).observe(time.monotonic() - start)
+
     logger.debug(f"Cleaning up remnants of build {build_id}")
     shutil.rmtree(workdir)
 
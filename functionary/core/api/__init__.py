@@ -8,3 +8,13 @@ HEADER_PARAMETERS = [
         description=("ID for the Environment to which this request corresponds"),
     ),
 ]
+
+FIELDS_PARAMETER = OpenApiParameter(
+    name="fields",
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description=(
+        "Comma separated list of the fields to include in the response. All fields "
+        "are included when omitted."
+    ),
+)
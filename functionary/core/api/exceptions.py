@@ -16,7 +16,8 @@ def custom_exception_handler(exc, context):
         return None, resulting in a 500 error.
     """
     response = exception_handler(exc, context)
-    if response is not None:
+    # Django's Http404 and PermissionDenied are converted by DRF but have no codes
+    if response is not None and isinstance(exc, APIException):
         response.data["code"] = exc.get_codes()
 
     return response
@@ -44,3 +45,11 @@ class InvalidEnvironmentHeader(APIException):
     status_code = 400
     default_detail = "X-Environment-Id header must be valid"
     default_code = "invalid_env_header"
+
+
+class InvalidFieldsParameter(APIException):
+    """The fields query parameter names fields that the resource does not have"""
+
+    status_code = 400
+    default_detail = "fields must only contain fields of the resource"
+    default_code = "invalid_fields"
@@ -1,13 +1,26 @@
 from functools import cache
-from typing import Union
+from typing import Optional, Union
 
 from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.http import parse_etags
+from rest_framework import status
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
 
 from core.auth import Permission
 from core.models import Environment
+from core.utils.catalog import (
+    get_cached_response,
+    get_catalog_version,
+    set_cached_response,
+)
 
-from .exceptions import InvalidEnvironmentHeader, MissingEnvironmentHeader
+from .exceptions import (
+    InvalidEnvironmentHeader,
+    InvalidFieldsParameter,
+    MissingEnvironmentHeader,
+)
 
 
 class EnvironmentViewMixin:
@@ -56,3 +69,134 @@ class EnvironmentViewMixin:
         """
         if not self.request.user.has_perm(permission, self.get_environment()):
             raise PermissionDenied
+
+
+class CatalogCacheMixin:
+    """Provides conditional GET and response caching for viewsets over an
+    environment's packages or functions, based on the environment's catalog version.
+
+    Responses carry an ETag of the catalog version, and requests whose If-None-Match
+    matches it receive a 304 without the catalog being queried. Serialized list
+    responses are cached per environment, catalog version and request path.
+
+    Must be used with EnvironmentViewMixin.
+    """
+
+    def get_queryset(self):
+        # Cached responses must reflect the version they are cached under, which a
+        # lagging read replica can't guarantee
+        return super().get_queryset().using(DEFAULT_DB_ALIAS)
+
+    def get_catalog_etag(self) -> str:
+        version = get_catalog_version(self.get_environment().id)
+
+        return f'"{version}-{self.request.accepted_renderer.format}"'
+
+    def _not_modified(self, etag: str) -> bool:
+        if_none_match = self.request.headers.get("If-None-Match")
+
+        return if_none_match is not None and (
+            if_none_match.strip() == "*"
+            or etag in [tag.removeprefix("W/") for tag in parse_etags(if_none_match)]
+        )
+
+    def list(self, request, *args, **kwargs):
+        environment_id = self.get_environment().id
+        version = get_catalog_version(environment_id)
+        etag = self.get_catalog_etag()
+
+        if self._not_modified(etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        path = request.get_full_path()
+        data = get_cached_response(environment_id, version, path)
+
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            set_cached_response(environment_id, version, path, data)
+
+        return Response(data, headers={"ETag": etag})
+
+    def retrieve(self, request, *args, **kwargs):
+        etag = self.get_catalog_etag()
+
+        # Looked up first so that an object that doesn't exist is a 404 even when
+        # the ETag matches
+        instance = self.get_object()
+
+        if self._not_modified(etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        serializer = self.get_serializer(instance)
+
+        return Response(serializer.data, headers={"ETag": etag})
+
+
+class SparseFieldsMixin:
+    """Provides sparse fieldsets for list and retrieve through the fields query
+    parameter, such as ?fields=id,status
+
+    Only the requested fields are serialized, and only the columns backing them are
+    loaded. When every field maps to a single column, lists are loaded with
+    QuerySet.values() so that no model instances are built, and are serialized by
+    the FlatListSerializer fast path.
+
+    The serializer class must use SparseFieldsSerializerMixin.
+    """
+
+    sparse_fields_actions = ["list", "retrieve"]
+
+    def get_sparse_fields(self) -> Optional[list[str]]:
+        """The fields requested through the fields query parameter
+
+        Returns:
+            The requested field names, or None if all fields should be included
+
+        Raises:
+            InvalidFieldsParameter: A requested field does not exist
+        """
+        if self.action not in self.sparse_fields_actions:
+            return None
+
+        fields = [
+            field.strip()
+            for field in self.request.query_params.get("fields", "").split(",")
+            if field.strip()
+        ]
+
+        if not fields:
+            return None
+
+        available = self.get_serializer_class()().fields
+        unknown = [field for field in fields if field not in available]
+
+        if unknown:
+            raise InvalidFieldsParameter(f"Unknown fields: {', '.join(unknown)}")
+
+        return fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.action not in self.sparse_fields_actions:
+            return queryset
+
+        fields = self.get_sparse_fields()
+
+        if self.action == "retrieve" and fields is None:
+            return queryset
+
+        columns = self.get_serializer_class()(fields=fields).get_flat_columns()
+
+        if columns is None:
+            return queryset
+        if self.action == "list":
+            return queryset.values(*columns)
+
+        return queryset.only(*columns)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.sparse_fields_actions:
+            kwargs.setdefault("fields", self.get_sparse_fields())
+
+        return super().get_serializer(*args, **kwargs)
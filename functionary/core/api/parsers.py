@@ -0,0 +1,44 @@
+""" JSON parsing backed by orjson, falling back to DRF's stdlib based parsing """
+import io
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# orjson parses integers that don't fit in 64 bits as floats, losing precision. Any
+# run of digits this long might be such an integer. Digits are found by translating
+# every digit to 0 and everything else to a space, which is much faster than a regex.
+_LONG_DIGITS = b"0" * 19
+_DIGITS_TABLE = bytes(
+    ord("0") if chr(byte) in "0123456789" else ord(" ") for byte in range(256)
+)
+
+
+class ORJSONParser(parsers.JSONParser):
+    """JSONParser that parses with orjson when it is installed
+
+    Bodies that aren't UTF-8 encoded, or that may contain integers too large for
+    orjson to parse exactly, are left to JSONParser.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        data = stream.read()
+
+        if _LONG_DIGITS in data.translate(_DIGITS_TABLE):
+            return super().parse(io.BytesIO(data), media_type, parser_context)
+
+        try:
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,82 @@
+""" JSON rendering backed by orjson, falling back to DRF's stdlib based rendering """
+import math
+
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if orjson is not None:
+    # Dates and times are passed to DRF's encoder so that they are formatted
+    # exactly as the stdlib renderer formats them. Non-string keys are accepted,
+    # as the json module accepts them.
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# Types orjson doesn't handle natively, such as Decimal, timedelta and lazy
+# translation strings, are encoded as DRF's encoder encodes them
+_encoder = encoders.JSONEncoder()
+
+
+def _has_non_finite_float(data) -> bool:
+    """Whether data contains a NaN or infinite float, which orjson renders as null
+    rather than rejecting or rendering as the json module does"""
+    containers = [data]
+
+    while containers:
+        container = containers.pop()
+        values = container.values() if isinstance(container, dict) else container
+
+        # Containers of only numbers, the bulk of most numeric data, are checked in
+        # one pass: the sum of finite numbers is finite
+        try:
+            if math.isfinite(math.fsum(values)):
+                continue
+        except (TypeError, ValueError, OverflowError):
+            pass
+
+        for value in values:
+            if value.__class__ is float:
+                if not math.isfinite(value):
+                    return True
+            elif isinstance(value, (dict, list, tuple)):
+                containers.append(value)
+
+    return False
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer that renders with orjson when it is installed
+
+    Output matches JSONRenderer's compact output. Indented output, as requested by
+    the browsable API, is left to JSONRenderer, as is data orjson can't render the
+    same way: integers that don't fit in 64 bits and non-finite floats.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            rendered = orjson.dumps(
+                data, default=_encoder.default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Non-finite floats are rendered as null, so they can only be present if
+        # the output has a null
+        if b"null" in rendered and _has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape the line and paragraph separators, which are valid JSON but not
+        # valid javascript, as JSONRenderer does
+        return rendered.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -0,0 +1,104 @@
+""" Serializer building blocks shared by the API versions """
+from typing import Callable, Optional
+
+from django.db import models
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+
+def _identity(value):
+    return value
+
+
+def _is_flat(field: serializers.Field) -> bool:
+    """Whether the field reads a single column of the model, so that its value can
+    be taken from a row returned by QuerySet.values()"""
+    if isinstance(field, serializers.RelatedField):
+        return isinstance(field, PrimaryKeyRelatedField) and field.pk_field is None
+
+    if isinstance(
+        field, (serializers.BaseSerializer, serializers.SerializerMethodField)
+    ):
+        return False
+
+    return field.source != "*" and "." not in field.source
+
+
+def _row_converter(field: serializers.Field) -> Callable:
+    """The function that converts a non-null column value into the field's
+    representation"""
+    if isinstance(field, PrimaryKeyRelatedField):
+        # values() already returns the primary key of the related object
+        return _identity
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == "hex_verbose":
+        return str
+    if isinstance(
+        field,
+        (serializers.CharField, serializers.IntegerField, serializers.BooleanField),
+    ):
+        return _identity
+    if isinstance(field, serializers.JSONField) and not field.binary:
+        return _identity
+
+    return field.to_representation
+
+
+class SparseFieldsSerializerMixin:
+    """Allows the fields a serializer outputs to be narrowed with the fields keyword
+    argument, such as SomeSerializer(instance, fields=["id", "status"]).
+
+    Set FlatListSerializer as the Meta.list_serializer_class so that lists of rows
+    from QuerySet.values() can be serialized as well as model instances.
+    """
+
+    def __init__(self, *args, fields: Optional[list[str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def get_flat_columns(self) -> Optional[list[str]]:
+        """The model columns backing the serializer's fields
+
+        Returns:
+            The columns to pass to QuerySet.values() or QuerySet.only(), or None if
+            any field needs more than a single column of the model
+        """
+        fields = self.fields.values()
+
+        if not all(_is_flat(field) for field in fields):
+            return None
+
+        return [field.source for field in fields]
+
+
+class FlatListSerializer(serializers.ListSerializer):
+    """List serializer that takes a fast path for rows from QuerySet.values()
+
+    Each row is converted with a precomputed converter per field instead of going
+    through the field's get_attribute and to_representation, producing the same
+    output as the child serializer would for the equivalent model instance. Model
+    instances are serialized as usual.
+    """
+
+    def to_representation(self, data):
+        rows = data.all() if isinstance(data, models.manager.BaseManager) else data
+        rows = list(rows)
+
+        if not rows or not isinstance(rows[0], dict):
+            return super().to_representation(rows)
+
+        converters = [
+            (name, field.source, _row_converter(field))
+            for name, field in self.child.fields.items()
+            if not field.write_only
+        ]
+
+        return [
+            {
+                name: None if row[source] is None else convert(row[source])
+                for name, source, convert in converters
+            }
+            for row in rows
+        ]
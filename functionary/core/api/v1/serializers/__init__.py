@@ -8,5 +8,6 @@ from .task import (  # noqa
     TaskSerializer,
 )
 from .task_log import TaskLogSerializer  # noqa
+from .task_timing import TaskTimingSerializer  # noqa
 from .team import TeamEnvironmentSerializer, TeamSerializer  # noqa
 from .user import UserSerializer  # noqa
@@ -2,15 +2,17 @@
 from django.core.exceptions import ValidationError
 from rest_framework import serializers
 
+from core.api.serializers import FlatListSerializer, SparseFieldsSerializerMixin
 from core.models import Function, Task
 
 
-class TaskSerializer(serializers.ModelSerializer):
-    """Basic serializer for the Task model"""
+class TaskSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    """Basic serializer for the Task model. Supports sparse fieldsets."""
 
     class Meta:
         model = Task
         fields = "__all__"
+        list_serializer_class = FlatListSerializer
 
 
 class TaskCreateByIdSerializer(serializers.ModelSerializer):
@@ -18,7 +20,7 @@ class TaskCreateByIdSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
-        fields = ["function", "parameters"]
+        fields = ["function", "parameters", "priority"]
 
     def create(self, validated_data):
         """Custom create that calls clean() on the task instance"""
@@ -39,7 +41,7 @@ class TaskCreateByNameSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
-        fields = ["function_name", "package_name", "parameters"]
+        fields = ["function_name", "package_name", "parameters", "priority"]
 
     def create(self, validated_data):
         """Custom create that calls clean() on the task instance"""
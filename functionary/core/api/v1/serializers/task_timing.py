@@ -0,0 +1,20 @@
+""" TaskTiming serializers """
+from rest_framework import serializers
+
+from core.models import TaskTiming
+
+
+class TaskTimingSerializer(serializers.ModelSerializer):
+    """Serializer for the TaskTiming model, including the seconds spent in each
+    stage of the tasking pipeline"""
+
+    created_at = serializers.DateTimeField(read_only=True)
+    stages = serializers.DictField(
+        child=serializers.FloatField(allow_null=True), read_only=True
+    )
+    total = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = TaskTiming
+        fields = ["created_at"] + [f"{name}_at" for name in TaskTiming.TIMESTAMPS]
+        fields += ["stages", "total"]
@@ -1,3 +1,4 @@
+from core.api.mixins import CatalogCacheMixin
 from core.api.permissions import HasEnvironmentPermissionForAction
 from core.api.viewsets import EnvironmentReadOnlyModelViewSet
 from core.models import Function
@@ -5,7 +6,7 @@ from core.models import Function
 from ..serializers import FunctionSerializer
 
 
-class FunctionViewSet(EnvironmentReadOnlyModelViewSet):
+class FunctionViewSet(CatalogCacheMixin, EnvironmentReadOnlyModelViewSet):
     """View functions across all known packages"""
 
     queryset = Function.objects.all()
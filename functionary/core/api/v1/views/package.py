@@ -1,3 +1,4 @@
+from core.api.mixins import CatalogCacheMixin
 from core.api.permissions import HasEnvironmentPermissionForAction
 from core.api.viewsets import EnvironmentModelViewSet
 from core.models import Package
@@ -5,7 +6,7 @@ from core.models import Package
 from ..serializers import PackageSerializer
 
 
-class PackageViewSet(EnvironmentModelViewSet):
+class PackageViewSet(CatalogCacheMixin, EnvironmentModelViewSet):
     """View for retrieving and updating packages"""
 
     queryset = Package.objects.all()
@@ -1,5 +1,8 @@
+import uuid
+
 from django.core.exceptions import ObjectDoesNotExist
 from drf_spectacular.utils import (
+    OpenApiParameter,
     PolymorphicProxySerializer,
     extend_schema,
     extend_schema_view,
@@ -9,7 +12,9 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
-from core.api import HEADER_PARAMETERS
+from core.api import FIELDS_PARAMETER, HEADER_PARAMETERS
+from core.api.exceptions import BadRequest
+from core.api.mixins import SparseFieldsMixin
 from core.api.permissions import HasEnvironmentPermissionForAction
 from core.api.v1.serializers import (
     TaskCreateByIdSerializer,
@@ -18,16 +23,32 @@ from core.api.v1.serializers import (
     TaskLogSerializer,
     TaskResultSerializer,
     TaskSerializer,
+    TaskTimingSerializer,
 )
 from core.api.viewsets import EnvironmentGenericViewSet
 from core.models import Task, TaskResult
+from core.utils.database import ReplicaReadMixin
+from core.utils.metrics import TASK_CREATE_SECONDS
 
 
 @extend_schema_view(
-    retrieve=extend_schema(parameters=HEADER_PARAMETERS),
-    list=extend_schema(parameters=HEADER_PARAMETERS),
+    retrieve=extend_schema(parameters=[*HEADER_PARAMETERS, FIELDS_PARAMETER]),
+    list=extend_schema(
+        parameters=[
+            *HEADER_PARAMETERS,
+            FIELDS_PARAMETER,
+            OpenApiParameter(
+                name="ids",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                description="Comma separated list of task ids to limit the list to",
+            ),
+        ]
+    ),
 )
 class TaskViewSet(
+    SparseFieldsMixin,
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
@@ -39,6 +60,19 @@ class TaskViewSet(
     serializer_class = TaskSerializer
     permission_classes = [HasEnvironmentPermissionForAction]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.action == "list" and (ids := self.request.query_params.get("ids")):
+            try:
+                task_ids = [uuid.UUID(task_id) for task_id in ids.split(",")]
+            except ValueError:
+                raise BadRequest("ids must be a comma separated list of task ids")
+
+            queryset = queryset.filter(id__in=task_ids)
+
+        return queryset
+
     def get_serializer_class(self):
         if self.action == "create":
             if "function_name" in self.request.data.keys():
@@ -67,6 +101,7 @@ class TaskViewSet(
         },
         parameters=HEADER_PARAMETERS,
     )
+    @TASK_CREATE_SECONDS.time()
     def create(self, request, *args, **kwargs):
         request_serializer = self.get_serializer(data=request.data)
         request_serializer.is_valid(raise_exception=True)
@@ -92,7 +127,7 @@ class TaskViewSet(
     def result(self, request, pk=None):
         task = self.get_object()
 
-        if not TaskResult.objects.filter(task=task).exists():
+        if not TaskResult.objects.using(task._state.db).filter(task=task).exists():
             raise NotFound(f"No result found for task {pk}.")
 
         serializer = TaskResultSerializer(task)
@@ -114,3 +149,22 @@ class TaskViewSet(
             raise NotFound(f"No log found for task {pk}.")
 
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        description=(
+            "Retrieve when the task reached each point of the tasking pipeline, and "
+            "the seconds spent in each stage"
+        ),
+        parameters=HEADER_PARAMETERS,
+        responses={status.HTTP_200_OK: TaskTimingSerializer},
+    )
+    @action(methods=["get"], detail=True)
+    def timing(self, request, pk=None):
+        task = self.get_object()
+
+        try:
+            serializer = TaskTimingSerializer(task.tasktiming)
+        except ObjectDoesNotExist:
+            raise NotFound(f"No timing found for task {pk}.")
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
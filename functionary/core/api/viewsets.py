@@ -6,6 +6,7 @@ from rest_framework.viewsets import GenericViewSet
 
 from core.api import HEADER_PARAMETERS
 from core.api.mixins import EnvironmentViewMixin
+from core.utils.database import ReplicaReadMixin
 
 
 class EnvironmentGenericViewSet(EnvironmentViewMixin, GenericViewSet):
@@ -70,12 +71,14 @@ class EnvironmentModelViewSet(
     retrieve=extend_schema(parameters=HEADER_PARAMETERS),
 )
 class EnvironmentReadOnlyModelViewSet(
+    ReplicaReadMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     EnvironmentGenericViewSet,
 ):
     """Replacement for ReadOnlyModelViewSet that provides queryset filtering and access
-    control based on the requesting user's environment permissions.
+    control based on the requesting user's environment permissions. Reads are served
+    from the read replica when one is configured.
 
     The ViewSet's queryset must be filterable by an environment, either directly or
     through another field on the model. If the environment is defined through another
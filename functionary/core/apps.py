@@ -1,6 +1,33 @@
 from django.apps import AppConfig
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save
+
+
+def _bump_package_catalog(sender, instance, **kwargs):
+    """Invalidate the catalog of the environment a Package belongs to"""
+    from core.utils.catalog import bump_catalog_version
+
+    bump_catalog_version(instance.environment_id)
+
+
+def _bump_function_catalog(sender, instance, **kwargs):
+    """Invalidate the catalog of the environment a Function belongs to"""
+    from core.utils.catalog import bump_catalog_version
+
+    try:
+        environment_id = instance.package.environment_id
+    except ObjectDoesNotExist:
+        # Deleted along with its package, which invalidates the catalog itself
+        return
+
+    bump_catalog_version(environment_id)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        for signal in [post_save, post_delete]:
+            signal.connect(_bump_package_catalog, sender="core.Package")
+            signal.connect(_bump_function_catalog, sender="core.Function")
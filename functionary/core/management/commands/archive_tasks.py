@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.retention import archive_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue the background archival of tasks past their environment's retention "
+        "period. Intended to be run periodically, such as daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of tasks per environment to archive per batch",
+        )
+
+    def handle(self, *args, **options):
+        archive_tasks.delay(batch_size=options["batch_size"])
+        self.stdout.write("Queued task archival")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.maintenance import compress_task_output
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue the background compression of task logs and results recorded before "
+        "compressed storage was introduced"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Number of rows of each model to compress per batch",
+        )
+
+    def handle(self, *args, **options):
+        compress_task_output.delay(batch_size=options["batch_size"])
+        self.stdout.write("Queued task output compression")
@@ -2,11 +2,20 @@ from django.core.management.base import BaseCommand
 
 from core.utils.listener import start_listening
 from core.utils.messaging import wait_for_connection
+from core.utils.metrics import start_metrics_server
 
 
 class Command(BaseCommand):
     help = "Ingest messages and hand them off to workers to be processed"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            help="Port to serve metrics on. Metrics are not served if unset.",
+        )
+
+    def handle(self, *args, **options):
+        start_metrics_server(options["metrics_port"])
         wait_for_connection()
         start_listening()
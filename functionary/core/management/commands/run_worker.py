@@ -1,20 +1,46 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from core.celery import app
+from core.utils.database import configure_worker_connections
 from core.utils.messaging import initialize_messaging, wait_for_connection
+from core.utils.metrics_dir import use_multiprocess_metrics
 
 
-# TODO: Make various things configurable. Concurrency, etc.
 class Command(BaseCommand):
     help = "Run the task workers"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            help="Port to serve metrics on. Metrics are not served if unset.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.CORE_WORKER_CONCURRENCY,
+            help="Number of worker processes. Defaults to one per CPU.",
+        )
+
     def handle(self, *args, **options):
+        if options["metrics_port"] is not None:
+            # Metrics are recorded in the pool processes, so they must be shared
+            # with this process, which serves them. This has to be set up before
+            # the metrics module, and with it prometheus_client, is imported.
+            use_multiprocess_metrics("worker")
+
+            from core.utils.metrics import start_metrics_server
+
+            start_metrics_server(options["metrics_port"])
+
         wait_for_connection()
 
         # TODO: Once there's a proper runner registration process, the need for this
         #       largely goes away and it can potentially be moved to a mangement
         #       command.
         initialize_messaging()
+        configure_worker_connections()
 
-        worker = app.Worker()
+        worker = app.Worker(concurrency=options["concurrency"])
         worker.start()
@@ -0,0 +1,17 @@
+from core.utils.database import track_writes
+
+
+class ReadYourWritesMiddleware:
+    """Keeps users who have just written to the database reading from the primary,
+    rather than a replica that may not have their write yet.
+
+    Must come after AuthenticationMiddleware. API requests are covered too, since
+    DRF sets the user it authenticates on the underlying request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_writes(request):
+            return self.get_response(request)
@@ -0,0 +1,46 @@
+# Generated by Django 4.1.1 on 2026-10-19 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_function_variables_variable_and_more"),
+    ]
+
+    # Existing log and result text is preserved in the legacy columns. It is moved
+    # into the compressed columns in batches by core.utils.maintenance rather than
+    # here, so that the migration does not rewrite the tables while holding a lock.
+    operations = [
+        migrations.RenameField(
+            model_name="tasklog",
+            old_name="log",
+            new_name="legacy_log",
+        ),
+        migrations.AlterField(
+            model_name="tasklog",
+            name="legacy_log",
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name="tasklog",
+            name="compressed_log",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.RenameField(
+            model_name="taskresult",
+            old_name="result",
+            new_name="legacy_result",
+        ),
+        migrations.AlterField(
+            model_name="taskresult",
+            name="legacy_result",
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name="taskresult",
+            name="compressed_result",
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.1 on 2026-10-19 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_task_output_compression"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="environment",
+            name="runner_pool",
+            field=models.CharField(default="public", max_length=64),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.1 on 2026-10-19 09:07
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_environment_runner_pool"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="priority",
+            field=models.PositiveSmallIntegerField(
+                default=4, validators=[django.core.validators.MaxValueValidator(9)]
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.1.1 on 2026-10-19 09:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_task_priority"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskTiming",
+            fields=[
+                (
+                    "task",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="core.task",
+                    ),
+                ),
+                ("published_at", models.DateTimeField(null=True)),
+                ("received_at", models.DateTimeField(null=True)),
+                ("pulled_at", models.DateTimeField(null=True)),
+                ("started_at", models.DateTimeField(null=True)),
+                ("exited_at", models.DateTimeField(null=True)),
+                ("result_published_at", models.DateTimeField(null=True)),
+                ("recorded_at", models.DateTimeField(null=True)),
+            ],
+        ),
+    ]
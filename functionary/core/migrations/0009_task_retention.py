@@ -0,0 +1,82 @@
+# Generated by Django 4.1.1 on 2026-10-19 09:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Partitioned tables require the partition key in the primary key, so the
+# PostgreSQL partitioned form of the archive table is created by hand
+PARTITIONED_ARCHIVE_TABLE_SQL = """
+CREATE TABLE "core_archivedtask" (
+    "id" uuid NOT NULL,
+    "environment_id" uuid NOT NULL,
+    "function_name" varchar(64) NOT NULL,
+    "package_name" varchar(64) NOT NULL,
+    "parameters" jsonb NOT NULL,
+    "status" varchar(16) NOT NULL,
+    "priority" smallint NOT NULL CHECK ("priority" >= 0),
+    "creator" varchar(150) NOT NULL,
+    "created_at" timestamp with time zone NOT NULL,
+    "updated_at" timestamp with time zone NOT NULL,
+    "archived_at" timestamp with time zone NOT NULL,
+    "compressed_result" bytea NULL,
+    "compressed_log" bytea NULL,
+    "timing" jsonb NULL,
+    PRIMARY KEY ("id", "created_at")
+) PARTITION BY RANGE ("created_at")
+"""
+
+
+class CreateArchiveModel(migrations.CreateModel):
+    """Creates the archive table, partitioned by created_at on PostgreSQL when
+    TASK_ARCHIVE_PARTITIONED is set. Partitions are added as they are needed by
+    core.utils.retention."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if (
+            schema_editor.connection.vendor == "postgresql"
+            and settings.TASK_ARCHIVE_PARTITIONED
+        ):
+            schema_editor.execute(PARTITIONED_ARCHIVE_TABLE_SQL)
+        else:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_tasktiming"),
+    ]
+
+    operations = [
+        CreateArchiveModel(
+            name="ArchivedTask",
+            fields=[
+                ("id", models.UUIDField(primary_key=True, serialize=False)),
+                ("environment_id", models.UUIDField()),
+                ("function_name", models.CharField(max_length=64)),
+                ("package_name", models.CharField(max_length=64)),
+                ("parameters", models.JSONField()),
+                ("status", models.CharField(max_length=16)),
+                ("priority", models.PositiveSmallIntegerField()),
+                ("creator", models.CharField(max_length=150)),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                ("compressed_result", models.BinaryField(null=True)),
+                ("compressed_log", models.BinaryField(null=True)),
+                ("timing", models.JSONField(null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="environment",
+            name="task_retention_days",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="archivedtask",
+            index=models.Index(
+                fields=["environment_id", "created_at"],
+                name="archivedtask_env_created_at",
+            ),
+        ),
+    ]
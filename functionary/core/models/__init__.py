@@ -1,3 +1,4 @@
+from .archived_task import ArchivedTask  # noqa
 from .environment import Environment  # noqa
 from .function import Function  # noqa
 from .mixins import ModelSaveHookMixin  # noqa
@@ -5,6 +6,7 @@ from .package import Package  # noqa
 from .task import Task  # noqa
 from .task_log import TaskLog  # noqa
 from .task_result import TaskResult  # noqa
+from .task_timing import TaskTiming  # noqa
 from .team import Team  # noqa
 from .user import User  # noqa
 from .user_role import EnvironmentUserRole, TeamUserRole  # noqa
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from django.db import models
+
+from core.utils.compression import decompress_text
+
+
+class ArchivedTask(models.Model):
+    """A Task moved out of the task tables by the retention policy
+
+    Archived tasks are self contained: the function, package and creator are
+    recorded by name so that they remain meaningful after those are deleted, and the
+    log, result and timing are folded into the same row. The only index is on
+    environment and created_at, keeping archival inserts cheap.
+
+    On PostgreSQL the table can be range partitioned by month of created_at (see
+    TASK_ARCHIVE_PARTITIONED), so that expiring old archives drops whole partitions.
+    """
+
+    id = models.UUIDField(primary_key=True)
+    environment_id = models.UUIDField()
+    function_name = models.CharField(max_length=64)
+    package_name = models.CharField(max_length=64)
+    parameters = models.JSONField()
+    status = models.CharField(max_length=16)
+    priority = models.PositiveSmallIntegerField()
+    creator = models.CharField(max_length=150)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    compressed_result = models.BinaryField(null=True)
+    compressed_log = models.BinaryField(null=True)
+    timing = models.JSONField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["environment_id", "created_at"],
+                name="archivedtask_env_created_at",
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.id)
+
+    @property
+    def result(self) -> Optional[str]:
+        return decompress_text(self.compressed_result)
+
+    @property
+    def log(self) -> Optional[str]:
+        return decompress_text(self.compressed_log)
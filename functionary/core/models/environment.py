@@ -12,6 +12,9 @@ class Environment(models.Model):
         id: unique identifier (UUID)
         name: the name of the environment
         team: the Team that this environment belongs to
+        runner_pool: the pool of runners that executes this environment's tasks
+        task_retention_days: days tasks are kept before being archived. Unset uses
+                             TASK_RETENTION_DAYS, and 0 keeps tasks forever.
     """
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -19,6 +22,8 @@ class Environment(models.Model):
     team = models.ForeignKey(
         to="Team", related_name="environments", on_delete=models.CASCADE, db_index=True
     )
+    runner_pool = models.CharField(max_length=64, default="public")
+    task_retention_days = models.PositiveIntegerField(null=True, blank=True)
 
     class Meta:
         constraints = [
@@ -7,6 +7,7 @@ import jsonschema
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MaxValueValidator
 from django.db import models
 
 from core.models import ModelSaveHookMixin
@@ -26,6 +27,8 @@ class Task(ModelSaveHookMixin, models.Model):
                      should include an environment.
         parameters: JSON representing the parameters that will be passed to the function
         status: tasking status
+        priority: dispatch priority, from PRIORITY_LOW to PRIORITY_MAX. Higher priority
+                  tasks are delivered to runners ahead of queued lower priority ones.
         creator: the user that initiated the task
         created_at: task creation timestamp
         updated_at: task updated timestamp
@@ -43,12 +46,23 @@ class Task(ModelSaveHookMixin, models.Model):
         (ERROR, "Error"),
     ]
 
+    # Statuses a task does not move on from
+    FINISHED_STATUSES = [COMPLETE, ERROR]
+
+    PRIORITY_LOW = 0
+    PRIORITY_NORMAL = 4
+    PRIORITY_HIGH = 8
+    PRIORITY_MAX = 9
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     function = models.ForeignKey(to="Function", on_delete=models.CASCADE)
     environment = models.ForeignKey(to="Environment", on_delete=models.CASCADE)
     parameters = models.JSONField(encoder=DjangoJSONEncoder)
     return_type = models.CharField(max_length=64, null=True)
     status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    priority = models.PositiveSmallIntegerField(
+        default=PRIORITY_NORMAL, validators=[MaxValueValidator(PRIORITY_MAX)]
+    )
     creator = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -130,3 +144,11 @@ class Task(ModelSaveHookMixin, models.Model):
             return self.tasklog.log
         except ObjectDoesNotExist:
             return None
+
+    @property
+    def timing(self):
+        """Convenience property for accessing the pipeline timing record"""
+        try:
+            return self.tasktiming
+        except ObjectDoesNotExist:
+            return None
@@ -1,9 +1,19 @@
 from django.db import models
 
+from core.utils.compression import compressed_text_property
+
 
 class TaskLog(models.Model):
-    """Log output from the execution of a Task"""
+    """Log output from the execution of a Task
+
+    The log is stored compressed and is decompressed only when accessed. Rows
+    recorded before compression was introduced hold their log in legacy_log until
+    the background backfill migrates them.
+    """
 
     task = models.OneToOneField(primary_key=True, to="Task", on_delete=models.CASCADE)
-    log = models.TextField()
+    compressed_log = models.BinaryField(null=True)
+    legacy_log = models.TextField(null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    log = compressed_text_property("compressed_log", "legacy_log")
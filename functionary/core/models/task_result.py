@@ -2,15 +2,34 @@ import json
 
 from django.db import models
 
+from core.utils.compression import compressed_text_property
+
 
 class TaskResult(models.Model):
-    """Results from the execution of a Task"""
+    """Results from the execution of a Task
+
+    The result is stored compressed and is decompressed only when accessed. Rows
+    recorded before compression was introduced hold their result in legacy_result
+    until the background backfill migrates them.
+    """
 
     task = models.OneToOneField(primary_key=True, to="Task", on_delete=models.CASCADE)
-    result = models.TextField()
+    compressed_result = models.BinaryField(null=True)
+    legacy_result = models.TextField(null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    result = compressed_text_property("compressed_result", "legacy_result")
+
     @property
     def json(self):
-        """Return the result as loaded JSON rather than the raw string"""
-        return json.loads(self.result)
+        """Return the result as loaded JSON rather than the raw string. The loaded
+        value is kept until the result changes, so that repeated access, such as
+        while rendering a page, parses the result only once."""
+        result = self.result
+        cached = self.__dict__.get("_json")
+
+        if cached is None or cached[0] is not result:
+            cached = (result, json.loads(result))
+            self.__dict__["_json"] = cached
+
+        return cached[1]
@@ -0,0 +1,72 @@
+from django.db import models
+
+
+class TaskTiming(models.Model):
+    """When a Task reached each point of the tasking pipeline
+
+    The timestamps travel with the tasking and result messages and are recorded
+    together with the result, so tracking them costs no additional writes while the
+    task is in flight. Timestamps taken by the runner come from the runner's clock,
+    so stages that span core and the runner include any clock skew between them.
+    """
+
+    # Timestamps in pipeline order, following the task's created_at. Each is
+    # carried in the messages under its name without the _at suffix.
+    TIMESTAMPS = [
+        "published",
+        "received",
+        "pulled",
+        "started",
+        "exited",
+        "result_published",
+        "recorded",
+    ]
+
+    # Pipeline stages as the timestamps they fall between
+    STAGES = [
+        ("dispatch", "created", "published"),
+        ("queued", "published", "received"),
+        ("image_pull", "received", "pulled"),
+        ("container_start", "pulled", "started"),
+        ("execution", "started", "exited"),
+        ("result_publish", "exited", "result_published"),
+        ("result_record", "result_published", "recorded"),
+    ]
+
+    task = models.OneToOneField(primary_key=True, to="Task", on_delete=models.CASCADE)
+    published_at = models.DateTimeField(null=True)
+    received_at = models.DateTimeField(null=True)
+    pulled_at = models.DateTimeField(null=True)
+    started_at = models.DateTimeField(null=True)
+    exited_at = models.DateTimeField(null=True)
+    result_published_at = models.DateTimeField(null=True)
+    recorded_at = models.DateTimeField(null=True)
+
+    @property
+    def created_at(self):
+        return self.task.created_at
+
+    @property
+    def stages(self) -> dict:
+        """Seconds spent in each stage of the pipeline, or None for stages whose
+        timestamps were not reported"""
+        stages = {}
+
+        for name, start, end in self.STAGES:
+            start_at = getattr(self, f"{start}_at")
+            end_at = getattr(self, f"{end}_at")
+
+            if start_at is None or end_at is None:
+                stages[name] = None
+            else:
+                stages[name] = (end_at - start_at).total_seconds()
+
+        return stages
+
+    @property
+    def total(self):
+        """Seconds from the task being created to its result being recorded"""
+        if self.recorded_at is None:
+            return None
+
+        return (self.recorded_at - self.created_at).total_seconds()
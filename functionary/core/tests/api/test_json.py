@@ -0,0 +1,74 @@
+import io
+import math
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.api.parsers import ORJSONParser
+from core.api.renderers import ORJSONRenderer
+
+DATA = {
+    "id": uuid.uuid4(),
+    "created_at": datetime(2022, 10, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    "day": date(2022, 10, 1),
+    "duration": timedelta(seconds=90),
+    "amount": Decimal("1.50"),
+    "nested": [{"text": "café  ", 1: None, "ok": True}],
+}
+
+
+def test_renderer_matches_json_renderer():
+    """Output is byte for byte that of the stdlib based renderer"""
+    assert ORJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+
+def test_renderer_indented_output():
+    """Indented output requested through the media type is honored"""
+    rendered = ORJSONRenderer().render(DATA, "application/json; indent=4")
+
+    assert rendered == JSONRenderer().render(DATA, "application/json; indent=4")
+
+
+@pytest.mark.parametrize("data", [{"result": 2**70}, {"result": [1.5, -(2**64)]}])
+def test_renderer_large_integers(data):
+    """Integers beyond 64 bits are rendered exactly, as the stdlib renders them"""
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+def test_renderer_rejects_non_finite_floats(value):
+    """Non-finite floats are rejected as the stdlib renderer rejects them in strict
+    mode, rather than rendered as null"""
+    with pytest.raises(ValueError):
+        JSONRenderer().render({"result": [None, value]})
+    with pytest.raises(ValueError):
+        ORJSONRenderer().render({"result": [None, value]})
+
+
+def test_parser_matches_json_parser():
+    body = b'{"text": "caf\\u00e9", "values": [1, 2.5, null, true]}'
+
+    assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+        io.BytesIO(body)
+    )
+
+
+@pytest.mark.parametrize("body", [b"{", b'{"value": NaN}', b"\xff"])
+def test_parser_rejects_invalid_json(body):
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(body))
+
+
+def test_parser_large_integers():
+    """Integers beyond 64 bits keep their exact value"""
+    body = b'{"big": 123456789012345678901234567890, "small": -12}'
+
+    assert ORJSONParser().parse(io.BytesIO(body)) == {
+        "big": 123456789012345678901234567890,
+        "small": -12,
+    }
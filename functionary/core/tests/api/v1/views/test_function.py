@@ -0,0 +1,87 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Function, Package, Team
+
+
+@pytest.fixture
+def environment():
+    team = Team.objects.create(name="team")
+    return team.environments.get()
+
+
+@pytest.fixture
+def function(environment):
+    package = Package.objects.create(name="testpackage", environment=environment)
+
+    return Function.objects.create(
+        name="testfunction", package=package, schema={"type": "object"}
+    )
+
+
+@pytest.fixture
+def request_headers(environment):
+    return {"HTTP_X_ENVIRONMENT_ID": str(environment.id)}
+
+
+@pytest.mark.django_db
+def test_list_not_modified(admin_client, function, request_headers):
+    """A request revalidating the current ETag gets a 304 without querying the
+    catalog"""
+    url = reverse("function-list")
+    etag = admin_client.get(url, **request_headers)["ETag"]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag, **request_headers)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert not any("core_function" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_list_is_cached_until_catalog_changes(admin_client, function, request_headers):
+    """Listings are served from the cache until a function changes, which also
+    changes the ETag"""
+    url = reverse("function-list")
+    response = admin_client.get(url, **request_headers)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert admin_client.get(url, **request_headers).data == response.data
+
+    assert not any("core_function" in query["sql"] for query in queries)
+
+    function.summary = "updated"
+    function.save()
+    updated = admin_client.get(
+        url, HTTP_IF_NONE_MATCH=response["ETag"], **request_headers
+    )
+
+    assert updated.status_code == 200
+    assert updated["ETag"] != response["ETag"]
+    assert updated.data["results"][0]["summary"] == "updated"
+
+
+@pytest.mark.django_db
+def test_retrieve_not_modified(admin_client, function, request_headers):
+    """Individual functions can be revalidated too"""
+    url = reverse("function-detail", kwargs={"pk": function.id})
+    etag = admin_client.get(url, **request_headers)["ETag"]
+    response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag, **request_headers)
+
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_retrieve_missing_not_modified_is_404(admin_client, function, request_headers):
+    """A matching ETag does not hide that the requested function doesn't exist"""
+    url = reverse("function-detail", kwargs={"pk": function.id})
+    etag = admin_client.get(url, **request_headers)["ETag"]
+    missing_url = reverse("function-detail", kwargs={"pk": uuid.uuid4()})
+    response = admin_client.get(missing_url, HTTP_IF_NONE_MATCH=etag, **request_headers)
+
+    assert response.status_code == 404
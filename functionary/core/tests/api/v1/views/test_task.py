@@ -1,9 +1,14 @@
 import json
+import uuid
+from datetime import timedelta
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from core.models import Function, Package, Task, TaskResult, Team
+from core.api.v1.serializers import TaskSerializer
+from core.models import Function, Package, Task, TaskResult, TaskTiming, Team
 
 
 @pytest.fixture
@@ -62,6 +67,31 @@ def test_create(admin_client, function, request_headers):
     assert Task.objects.filter(id=task_id).exists()
 
 
+def test_create_with_priority(admin_client, function, request_headers):
+    """Tasks default to normal priority, and priority can be set on creation"""
+    url = reverse("task-list")
+
+    for priority, expected in [(None, Task.PRIORITY_NORMAL), (Task.PRIORITY_MAX, 9)]:
+        task_input = {"function": str(function.id), "parameters": {"prop1": 5}}
+
+        if priority is not None:
+            task_input["priority"] = priority
+
+        response = admin_client.post(
+            url, data=task_input, content_type="application/json", **request_headers
+        )
+
+        assert response.status_code == 201
+        assert Task.objects.get(id=response.data["id"]).priority == expected
+
+    task_input["priority"] = Task.PRIORITY_MAX + 1
+    response = admin_client.post(
+        url, data=task_input, content_type="application/json", **request_headers
+    )
+
+    assert response.status_code == 400
+
+
 def test_create_returns_400_for_invalid_parameters(
     admin_client, function, request_headers
 ):
@@ -125,3 +155,90 @@ def test_result_type_is_preserved(admin_client, task, request_headers):
     task_result.save()
     response = admin_client.get(url, **request_headers)
     assert type(response.data["result"]) is bool
+
+
+def test_timing(admin_client, task, request_headers):
+    """The timing of each pipeline stage is returned, with unreported stages null"""
+    url = f"{reverse('task-list')}{task.id}/timing/"
+
+    assert admin_client.get(url, **request_headers).status_code == 404
+
+    TaskTiming.objects.create(
+        task=task,
+        published_at=task.created_at + timedelta(seconds=1),
+        received_at=task.created_at + timedelta(seconds=3),
+        recorded_at=task.created_at + timedelta(seconds=10),
+    )
+    response = admin_client.get(url, **request_headers)
+
+    assert response.status_code == 200
+    assert response.data["stages"]["dispatch"] == 1
+    assert response.data["stages"]["queued"] == 2
+    assert response.data["stages"]["execution"] is None
+    assert response.data["total"] == 10
+
+
+def test_list_matches_serializer(admin_client, task, request_headers):
+    """Listed tasks are identical to the instance serializer output"""
+    task.return_type = None
+    task.save()
+    response = admin_client.get(reverse("task-list"), **request_headers)
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        json.loads(json.dumps(TaskSerializer(task).data, default=str))
+    ]
+
+
+def test_list_sparse_fields(admin_client, task, request_headers):
+    """Only the requested fields are returned, and only their columns are loaded"""
+    url = f"{reverse('task-list')}?fields=id,status"
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url, **request_headers)
+
+    select = next(q["sql"] for q in queries if '"core_task"."status"' in q["sql"])
+
+    assert response.status_code == 200
+    assert response.data["results"] == [{"id": str(task.id), "status": task.status}]
+    assert '"core_task"."parameters"' not in select
+
+
+def test_retrieve_sparse_fields(admin_client, task, request_headers):
+    """A retrieved task includes only the requested fields"""
+    url = f"{reverse('task-list')}{task.id}/?fields=function,priority"
+    response = admin_client.get(url, **request_headers)
+
+    assert response.status_code == 200
+    assert response.data == {"function": task.function_id, "priority": task.priority}
+
+
+def test_unknown_sparse_fields_returns_400(admin_client, task, request_headers):
+    """Requesting a field the task does not have is rejected"""
+    url = f"{reverse('task-list')}?fields=id,nope"
+    response = admin_client.get(url, **request_headers)
+
+    assert response.status_code == 400
+    assert "nope" in response.data["detail"]
+
+
+def test_list_filtered_by_ids(admin_client, task, function, request_headers):
+    """The list can be limited to a set of tasks by id"""
+    other = Task.objects.create(
+        function=function,
+        environment=function.package.environment,
+        parameters={"prop1": 1},
+        creator=task.creator,
+    )
+    url = f"{reverse('task-list')}?ids={task.id},{uuid.uuid4()}&fields=id,status"
+    response = admin_client.get(url, **request_headers)
+
+    assert response.status_code == 200
+    assert [row["id"] for row in response.data["results"]] == [str(task.id)]
+    assert str(other.id) not in response.content.decode()
+    assert (
+        admin_client.get(
+            f"{reverse('task-list')}?ids=notanid", **request_headers
+        ).status_code
+        == 400
+    )
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from core.models import Function, Package, Task, TaskLog, TaskResult, Team
+from core.utils.compression import CODEC_RAW, CODEC_ZLIB
+
+
+@pytest.fixture
+def task(admin_user):
+    environment = Team.objects.create(name="team").environments.get()
+    package = Package.objects.create(name="testpackage", environment=environment)
+    function = Function.objects.create(
+        name="testfunction", package=package, schema={"type": "object"}
+    )
+
+    return Task.objects.create(
+        function=function,
+        environment=environment,
+        parameters={},
+        creator=admin_user,
+    )
+
+
+@pytest.mark.django_db
+def test_large_output_is_stored_compressed(task):
+    """Large log and result payloads are compressed and read back unchanged"""
+    log = "the same log line, over and over\n" * 1000
+    result = '"' + "x" * 10000 + '"'
+
+    TaskLog.objects.create(task=task, log=log)
+    TaskResult.objects.create(task=task, result=result)
+    task = Task.objects.get(id=task.id)
+
+    assert bytes(task.tasklog.compressed_log)[:1] == CODEC_ZLIB
+    assert len(task.tasklog.compressed_log) < len(log)
+    assert task.log == log
+    assert task.raw_result == result
+    assert task.result == "x" * 10000
+
+
+@pytest.mark.django_db
+def test_small_output_is_stored_raw(task):
+    """Payloads too small to benefit from compression are stored uncompressed"""
+    TaskLog.objects.create(task=task, log="short")
+
+    task_log = TaskLog.objects.get(task=task)
+
+    assert bytes(task_log.compressed_log) == CODEC_RAW + b"short"
+    assert task_log.log == "short"
+
+
+@pytest.mark.django_db
+def test_legacy_output_is_readable(task):
+    """Rows recorded before compression was introduced are still readable"""
+    TaskLog.objects.create(task=task, legacy_log="old log")
+    TaskResult.objects.create(task=task, legacy_result="[1, 2]")
+    task = Task.objects.get(id=task.id)
+
+    assert task.log == "old log"
+    assert task.result == [1, 2]
+
+
+@pytest.mark.django_db
+def test_result_is_parsed_once(task, mocker):
+    """Repeated access to the loaded result doesn't parse it again"""
+    TaskResult.objects.create(task=task, result='[{"a": 1}]')
+    task = Task.objects.get(id=task.id)
+    loads = mocker.spy(json, "loads")
+
+    assert task.result == [{"a": 1}]
+    assert task.result is task.result
+    assert loads.call_count == 1
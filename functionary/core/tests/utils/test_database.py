@@ -0,0 +1,72 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+
+from core.utils.database import (
+    ReplicaRouter,
+    configure_worker_connections,
+    get_read_database,
+    track_writes,
+)
+
+
+def test_configure_worker_connections(settings, mocker):
+    """Workers use their own connection lifetime and start without a connection"""
+    settings.WORKER_DB_CONN_MAX_AGE = 300
+    mocker.patch.dict(connection.settings_dict, {"CONN_MAX_AGE": 0})
+    close_all = mocker.patch("core.utils.database.connections.close_all")
+
+    configure_worker_connections()
+
+    assert connection.settings_dict["CONN_MAX_AGE"] == 300
+    close_all.assert_called_once()
+
+
+@pytest.fixture
+def replica(mocker):
+    mocker.patch("core.utils.database.replica_configured", return_value=True)
+    cache.clear()
+
+
+@pytest.mark.usefixtures("replica")
+def test_safe_requests_read_from_replica(rf, admin_user):
+    """Safe requests read from the replica, and others from the primary"""
+    get_request = rf.get("/")
+    get_request.user = admin_user
+    post_request = rf.post("/")
+    post_request.user = admin_user
+
+    assert get_read_database(get_request) == "replica"
+    assert get_read_database(post_request) == "default"
+
+
+@pytest.mark.usefixtures("replica")
+def test_reads_follow_writes(rf, admin_user, django_user_model):
+    """A user who has just written reads from the primary, while others are
+    unaffected"""
+    request = rf.post("/")
+    request.user = admin_user
+
+    with track_writes(request):
+        ReplicaRouter().db_for_write(django_user_model)
+
+    request = rf.get("/")
+    request.user = admin_user
+    other_request = rf.get("/")
+    other_request.user = django_user_model(pk=admin_user.pk + 1)
+
+    assert get_read_database(request) == "default"
+    assert get_read_database(other_request) == "replica"
+
+
+def test_router_keeps_replica_objects_on_replica(django_user_model):
+    """Objects read from the replica read their relations from it, while writes
+    always go to the primary"""
+    router = ReplicaRouter()
+    instance = django_user_model()
+    instance._state.db = "replica"
+
+    assert router.db_for_read(django_user_model, instance=instance) == "replica"
+    assert router.db_for_read(django_user_model) == "default"
+    assert router.db_for_write(django_user_model, instance=instance) == "default"
+    assert not router.allow_migrate("replica", "core")
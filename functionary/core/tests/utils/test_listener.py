@@ -0,0 +1,40 @@
+import json
+from unittest.mock import Mock
+
+from pika.exceptions import ChannelClosedByBroker, ChannelClosedByClient
+
+from core.utils import listener
+
+
+def test_task_status_events_are_coalesced(mocker):
+    """Status events are buffered and applied as one batch per flush"""
+    record_task_progress = mocker.patch("core.utils.listener.record_task_progress")
+    properties = Mock(
+        headers={"x-msg-type": "TASK_STATUS"},
+        content_type="application/json",
+        content_encoding="utf-8",
+    )
+
+    for status in ["RECEIVED", "STARTED"]:
+        body = json.dumps({"events": [{"task_id": "task1", "status": status}]})
+        listener._handle_delivery(Mock(), Mock(), properties, body.encode())
+
+    record_task_progress.delay.assert_not_called()
+
+    listener._flush_task_progress(Mock(is_open=True))
+    listener._flush_task_progress(Mock(is_open=True))
+
+    record_task_progress.delay.assert_called_once_with(["task1"])
+
+
+def test_missing_pool_queue_is_declared(mocker):
+    """A pool queue found missing when checking its depth is declared"""
+    declare_runner_pool = mocker.patch("core.utils.listener.declare_runner_pool")
+
+    listener._on_pool_check_closed(Mock(), ChannelClosedByClient(200, "OK"), "gpu")
+    declare_runner_pool.assert_not_called()
+
+    listener._on_pool_check_closed(
+        Mock(), ChannelClosedByBroker(404, "NOT_FOUND"), "gpu"
+    )
+    declare_runner_pool.assert_called_once_with("gpu")
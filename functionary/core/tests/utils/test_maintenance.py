@@ -0,0 +1,51 @@
+import pytest
+
+from core.models import Function, Package, Task, TaskLog, TaskResult, Team
+from core.utils.maintenance import compress_task_output
+
+
+@pytest.fixture
+def legacy_tasks(admin_user):
+    environment = Team.objects.create(name="team").environments.get()
+    package = Package.objects.create(name="testpackage", environment=environment)
+    function = Function.objects.create(
+        name="testfunction", package=package, schema={"type": "object"}
+    )
+    tasks = []
+
+    for i in range(3):
+        task = Task.objects.create(
+            function=function,
+            environment=environment,
+            parameters={},
+            creator=admin_user,
+        )
+        TaskLog.objects.create(task=task, legacy_log=f"log {i}\n" * 100)
+        TaskResult.objects.create(task=task, legacy_result=f"{i}")
+        tasks.append(task)
+
+    return tasks
+
+
+@pytest.mark.django_db
+def test_compress_task_output(legacy_tasks, mocker):
+    """Legacy rows are compressed in batches, requeueing until none remain"""
+    requeue = mocker.patch("core.utils.maintenance.compress_task_output.apply_async")
+
+    compress_task_output(batch_size=2)
+
+    assert TaskLog.objects.filter(legacy_log__isnull=False).count() == 1
+    assert TaskResult.objects.filter(legacy_result__isnull=False).count() == 1
+    requeue.assert_called_once()
+
+    requeue.reset_mock()
+    compress_task_output(batch_size=2)
+
+    assert not TaskLog.objects.filter(legacy_log__isnull=False).exists()
+    assert not TaskResult.objects.filter(legacy_result__isnull=False).exists()
+    requeue.assert_not_called()
+
+    for i, task in enumerate(legacy_tasks):
+        task = Task.objects.get(id=task.id)
+        assert task.log == f"log {i}\n" * 100
+        assert task.result == i
@@ -0,0 +1,158 @@
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+
+from core.models import Function, Package, Task, Team
+from core.utils import messaging
+from core.utils.messaging import (
+    ACCEPT_HEADER,
+    JSON_CONTENT_TYPE,
+    MSGPACK_CONTENT_TYPE,
+    PUBLIC_EXCHANGE,
+    ZLIB_CONTENT_ENCODING,
+    decode_message,
+    encode_message,
+    get_route,
+    negotiate_content_type,
+    send_message,
+)
+from core.utils.runners import record_runner_load
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def task(admin_user):
+    environment = Team.objects.create(name="team").environments.get()
+    package = Package.objects.create(
+        name="testpackage", environment=environment, image_name="testpackage"
+    )
+    function = Function.objects.create(
+        name="testfunction", package=package, schema={"type": "object"}
+    )
+
+    return Task.objects.create(
+        function=function, environment=environment, parameters={}, creator=admin_user
+    )
+
+
+def _report(runner, active, images, pool="public", content_types=None):
+    record_runner_load(
+        {
+            "runner": runner,
+            "pool": pool,
+            "capacity": 4,
+            "active": active,
+            "images": images,
+            "content_types": content_types or [JSON_CONTENT_TYPE],
+        }
+    )
+
+
+@pytest.mark.django_db
+def test_route_to_pool_without_runners(task):
+    """With no runner load known, tasks go to the environment's pool"""
+    assert get_route(task) == (PUBLIC_EXCHANGE, "public")
+
+    task.environment.runner_pool = "gpu"
+    assert get_route(task) == (PUBLIC_EXCHANGE, "gpu")
+
+
+@pytest.mark.django_db
+def test_route_to_least_loaded_runner_with_image(task):
+    """Tasks go to the least loaded runner that has the image cached"""
+    image = task.function.package.full_image_name
+    _report("busy", 3, [image])
+    _report("idle", 0, [])
+    _report("warm", 1, [image])
+    _report("other_pool", 0, [image], pool="gpu")
+
+    assert get_route(task) == (PUBLIC_EXCHANGE, "runner.warm")
+
+
+@pytest.mark.django_db
+def test_route_skips_full_runners(task):
+    """Runners without free capacity are not selected"""
+    _report("full", 4, [task.function.package.full_image_name])
+
+    assert get_route(task) == (PUBLIC_EXCHANGE, "public")
+
+
+@pytest.mark.django_db
+def test_route_counts_dispatched_tasks(task):
+    """Tasks routed to a runner since its last report count towards its load, and
+    the count starts over with its next report"""
+    image = task.function.package.full_image_name
+    _report("first", 2, [image])
+    _report("second", 3, [image])
+
+    routes = [get_route(task)[1] for _ in range(4)]
+
+    assert routes == ["runner.first", "runner.first", "runner.second", "public"]
+
+    _report("first", 0, [image])
+
+    assert get_route(task) == (PUBLIC_EXCHANGE, "runner.first")
+
+
+@pytest.mark.parametrize(
+    "content_type,message",
+    [
+        (JSON_CONTENT_TYPE, {"output": "log line\n" * 1000}),
+        (MSGPACK_CONTENT_TYPE, {"output": "log line\n"}),
+        (MSGPACK_CONTENT_TYPE, {"output": "log line\n" * 1000}),
+    ],
+)
+def test_encode_decode_round_trip(content_type, message):
+    """Messages decode to their original value, with large msgpack bodies compressed
+    and JSON bodies never compressed"""
+    body, content_encoding = encode_message(message, content_type)
+    properties = SimpleNamespace(
+        content_type=content_type, content_encoding=content_encoding
+    )
+
+    assert decode_message(body, properties) == message
+    assert (content_encoding == ZLIB_CONTENT_ENCODING) == (
+        content_type == MSGPACK_CONTENT_TYPE and len(message["output"]) > 1024
+    )
+
+
+def test_decode_message_without_content_type():
+    """Messages from senders that don't set a content type are treated as JSON"""
+    properties = SimpleNamespace(content_type=None, content_encoding=None)
+
+    assert decode_message(b'{"a": 1}', properties) == {"a": 1}
+
+
+def test_negotiate_content_type(settings):
+    """msgpack is only used when every runner in the pool supports it"""
+    both = [JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE]
+    assert negotiate_content_type("public") == JSON_CONTENT_TYPE
+
+    _report("new", 0, [], content_types=both)
+    _report("other_pool", 0, [], pool="gpu")
+    assert negotiate_content_type("public") == MSGPACK_CONTENT_TYPE
+
+    settings.MESSAGE_ENCODING = "json"
+    assert negotiate_content_type("public") == JSON_CONTENT_TYPE
+
+    settings.MESSAGE_ENCODING = "auto"
+    _report("old", 0, [])
+    assert negotiate_content_type("public") == JSON_CONTENT_TYPE
+
+
+def test_send_message_advertises_content_types(mocker):
+    """Runners learn from each message which encodings they may reply with"""
+    connection = mocker.patch.object(messaging, "build_connection").return_value
+
+    send_message(PUBLIC_EXCHANGE, "public", "TASK_PACKAGE", {"id": "task"})
+
+    properties = connection.channel().basic_publish.call_args.kwargs["properties"]
+    assert properties.headers == {
+        "x-msg-type": "TASK_PACKAGE",
+        ACCEPT_HEADER: [JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE],
+    }
@@ -0,0 +1,40 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from django.test import RequestFactory
+from django.urls import NoReverseMatch, reverse
+
+from core.utils.metrics import TASK_RESULTS, metrics_view
+from core.utils.metrics_dir import use_multiprocess_metrics
+
+
+def test_metrics_view():
+    """Recorded metrics are exposed for scraping"""
+    TASK_RESULTS.labels(status="COMPLETE").inc()
+
+    response = metrics_view(RequestFactory().get("/metrics"))
+    body = response.content.decode()
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    assert 'functionary_task_results_total{status="COMPLETE"}' in body
+
+
+def test_metrics_url_disabled_by_default():
+    """The unauthenticated metrics endpoint is opt in"""
+    with pytest.raises(NoReverseMatch):
+        reverse("metrics")
+
+
+def test_use_multiprocess_metrics_respects_configured_dir(tmp_path):
+    """A configured PROMETHEUS_MULTIPROC_DIR is used and left untouched"""
+    metrics_file = tmp_path / "counter_1.db"
+    metrics_file.write_bytes(b"")
+
+    with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}):
+        use_multiprocess_metrics("worker")
+
+        assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == str(tmp_path)
+
+    assert metrics_file.exists()
@@ -0,0 +1,146 @@
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.models import (
+    ArchivedTask,
+    Function,
+    Package,
+    Task,
+    TaskLog,
+    TaskResult,
+    TaskTiming,
+    Team,
+)
+from core.utils.retention import archive_tasks
+
+
+@pytest.fixture
+def environment():
+    return Team.objects.create(name="team").environments.get()
+
+
+@pytest.fixture
+def tasks(environment, admin_user):
+    """Three tasks created 10, 20 and 30 days ago, and one created today"""
+    package = Package.objects.create(name="testpackage", environment=environment)
+    function = Function.objects.create(
+        name="testfunction", package=package, schema={"type": "object"}
+    )
+    tasks = []
+
+    for age in [10, 20, 30, 0]:
+        task = Task.objects.create(
+            function=function,
+            environment=environment,
+            parameters={"age": age},
+            creator=admin_user,
+            status=Task.COMPLETE,
+        )
+        Task.objects.filter(id=task.id).update(
+            created_at=timezone.now() - timedelta(days=age)
+        )
+        TaskLog.objects.create(task=task, log=f"log {age}")
+        TaskResult.objects.create(task=task, result=json.dumps(age))
+        TaskTiming.objects.create(task=task, recorded_at=timezone.now())
+        tasks.append(task)
+
+    return tasks
+
+
+@pytest.mark.django_db
+def test_archive_tasks_to_table(tasks, environment, settings, mocker):
+    """Tasks past retention are moved to the archive table in batches, requeueing
+    until none remain"""
+    settings.TASK_RETENTION_DAYS = 5
+    requeue = mocker.patch("core.utils.retention.archive_tasks.apply_async")
+
+    archive_tasks(batch_size=2)
+
+    assert ArchivedTask.objects.count() == 2
+    requeue.assert_called_once()
+
+    archive_tasks(batch_size=2)
+
+    assert list(Task.objects.all()) == [tasks[3]]
+    assert not TaskLog.objects.exclude(task=tasks[3]).exists()
+
+    archived = ArchivedTask.objects.get(id=tasks[0].id)
+    assert archived.function_name == "testfunction"
+    assert archived.parameters == {"age": 10}
+    assert archived.log == "log 10"
+    assert json.loads(archived.result) == 10
+    assert "recorded" in archived.timing
+
+
+@pytest.mark.django_db
+def test_environment_retention_overrides_default(tasks, environment, settings):
+    """An environment's own retention takes precedence over the default"""
+    settings.TASK_RETENTION_DAYS = 5
+    environment.task_retention_days = 25
+    environment.save()
+
+    archive_tasks()
+
+    assert list(ArchivedTask.objects.values_list("id", flat=True)) == [tasks[2].id]
+
+    environment.task_retention_days = 0
+    environment.save()
+
+    archive_tasks()
+
+    assert Task.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_unfinished_tasks_are_kept(tasks, settings):
+    """Tasks that are pending or in progress are not archived however old they are"""
+    settings.TASK_RETENTION_DAYS = 5
+    Task.objects.filter(id=tasks[1].id).update(status=Task.PENDING)
+    Task.objects.filter(id=tasks[2].id).update(status=Task.IN_PROGRESS)
+
+    archive_tasks()
+
+    assert list(ArchivedTask.objects.values_list("id", flat=True)) == [tasks[0].id]
+    assert set(Task.objects.values_list("id", flat=True)) == {
+        tasks[1].id,
+        tasks[2].id,
+        tasks[3].id,
+    }
+
+
+@pytest.mark.django_db
+def test_archive_tasks_to_export(tasks, environment, settings, tmp_path):
+    """In export mode tasks are written to compressed JSON lines files"""
+    settings.TASK_RETENTION_DAYS = 15
+    settings.TASK_ARCHIVE_MODE = "export"
+    settings.TASK_ARCHIVE_DIR = str(tmp_path)
+
+    archive_tasks()
+
+    [export_file] = (tmp_path / str(environment.id)).iterdir()
+
+    with gzip.open(export_file, "rt") as export:
+        records = [json.loads(line) for line in export]
+
+    assert [record["parameters"]["age"] for record in records] == [30, 20]
+    assert records[0]["log"] == "log 30"
+    assert Task.objects.count() == 2
+    assert not ArchivedTask.objects.exists()
+
+
+@pytest.mark.django_db
+def test_expire_archive(tasks, settings):
+    """Archived tasks older than the archive retention are removed"""
+    settings.TASK_RETENTION_DAYS = 5
+    settings.TASK_ARCHIVE_RETENTION_DAYS = 25
+
+    archive_tasks()
+
+    assert set(ArchivedTask.objects.values_list("id", flat=True)) == {
+        tasks[0].id,
+        tasks[1].id,
+    }
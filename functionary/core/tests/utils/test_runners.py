@@ -0,0 +1,35 @@
+import time
+
+import pytest
+from django.core.cache import cache
+
+from core.utils.runners import get_runner_loads, record_runner_load
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def test_record_runner_load():
+    """Each runner's most recent report is kept"""
+    record_runner_load({"runner": "one", "capacity": 4, "active": 1})
+    record_runner_load({"runner": "two", "capacity": 2, "active": 0})
+    record_runner_load({"runner": "one", "capacity": 4, "active": 3})
+
+    loads = get_runner_loads()
+
+    assert set(loads) == {"one", "two"}
+    assert loads["one"]["active"] == 3
+
+
+def test_stale_runner_loads_excluded(settings, mocker):
+    """Runners that have stopped reporting are not returned"""
+    now = time.time()
+    mocker.patch("core.utils.runners.time.time", return_value=now - 120)
+    record_runner_load({"runner": "gone", "capacity": 4, "active": 0})
+
+    mocker.patch("core.utils.runners.time.time", return_value=now)
+    record_runner_load({"runner": "current", "capacity": 4, "active": 0})
+
+    assert set(get_runner_loads()) == {"current"}
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+from pika.exceptions import UnroutableError
+
+from core.models import Function, Package, Task, TaskTiming, Team
+from core.utils import tasking
+from core.utils.tasking import (
+    _generate_task_message,
+    publish_task,
+    record_task_progress,
+    record_task_result,
+)
+
+
+@pytest.fixture
+def task(admin_user):
+    team = Team.objects.create(name="team")
+    package = Package.objects.create(
+        name="testpackage", environment=team.environments.get()
+    )
+    function = Function.objects.create(name="testfunction", package=package, schema={})
+
+    return Task.objects.create(
+        function=function,
+        environment=package.environment,
+        parameters={},
+        creator=admin_user,
+    )
+
+
+def _result_message(task, **kwargs):
+    return {
+        "task_id": str(task.id),
+        "status": 0,
+        "output": "output",
+        "result": "{}",
+        **kwargs,
+    }
+
+
+@pytest.mark.django_db
+def test_publish_task_declares_new_pool(task, mocker):
+    """A pool assigned after startup has its queue declared when it is first used"""
+    task.environment.runner_pool = "newpool"
+    task.environment.save()
+    send_message = mocker.patch.object(
+        tasking, "send_message", side_effect=[UnroutableError([]), None]
+    )
+    declare_runner_pool = mocker.patch.object(tasking, "declare_runner_pool")
+
+    publish_task(task.id)
+
+    declare_runner_pool.assert_called_once_with("newpool")
+    assert [call.args[1] for call in send_message.call_args_list] == [
+        "newpool",
+        "newpool",
+    ]
+
+
+@pytest.mark.django_db
+def test_task_message_carries_timing(task):
+    """The tasking message carries the created and published times"""
+    timing = _generate_task_message(task)["timing"]
+
+    assert timing["created"] == task.created_at.timestamp()
+    assert timing["created"] <= timing["published"]
+
+
+@pytest.mark.django_db
+def test_record_task_result_stores_timing(task):
+    """The timing reported with a result is recorded along with the recorded time"""
+    now = time.time()
+    timing = {"published": now - 5, "received": now - 4, "exited": now - 1}
+
+    record_task_result(_result_message(task, timing=timing))
+    task_timing = TaskTiming.objects.get(task=task)
+
+    assert task_timing.published_at.timestamp() == pytest.approx(now - 5)
+    assert task_timing.pulled_at is None
+    assert task_timing.recorded_at.timestamp() >= now
+    assert task_timing.stages["queued"] == pytest.approx(1)
+
+
+@pytest.mark.django_db
+def test_record_task_result_without_timing(task):
+    """Results from runners that do not report timing are still recorded"""
+    record_task_result(_result_message(task))
+
+    assert Task.objects.get(id=task.id).status == "COMPLETE"
+    assert not TaskTiming.objects.filter(task=task).exists()
+
+
+@pytest.mark.django_db
+def test_record_task_progress(task, admin_user, django_assert_num_queries):
+    """Pending tasks are marked in progress in a single update, and tasks that
+    have already finished are left alone"""
+    finished = Task.objects.create(
+        function=task.function,
+        environment=task.environment,
+        parameters={},
+        creator=admin_user,
+        status=Task.COMPLETE,
+    )
+
+    with django_assert_num_queries(1):
+        record_task_progress([str(task.id), str(finished.id)])
+
+    assert Task.objects.get(id=task.id).status == Task.IN_PROGRESS
+    assert Task.objects.get(id=finished.id).status == Task.COMPLETE
@@ -0,0 +1,73 @@
+""" Versioning and caching of the package and function catalog of each environment """
+import hashlib
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _version_key(environment_id) -> str:
+    return f"catalog:version:{environment_id}"
+
+
+def _new_version() -> int:
+    """A starting version for an environment without one. Time based, so that a
+    version lost from the cache is never reissued for different contents."""
+    return time.time_ns()
+
+
+def get_catalog_version(environment_id) -> int:
+    """The current version of an environment's catalog
+
+    Args:
+        environment_id: ID of the environment
+
+    Returns:
+        An opaque version number that changes whenever a package or function in the
+        environment changes
+    """
+    version = cache.get(_version_key(environment_id))
+
+    if version is None:
+        cache.add(_version_key(environment_id), _new_version(), timeout=None)
+        version = cache.get(_version_key(environment_id))
+
+    return version
+
+
+def bump_catalog_version(environment_id) -> None:
+    """Mark an environment's catalog as changed, invalidating its ETags and cached
+    responses"""
+    try:
+        cache.incr(_version_key(environment_id))
+    except ValueError:
+        cache.add(_version_key(environment_id), _new_version(), timeout=None)
+
+
+def get_cached_response(
+    environment_id, version: int, path: str
+) -> Optional[dict | list]:
+    """Retrieve the serialized response data cached for a catalog request
+
+    Args:
+        environment_id: ID of the environment the request is for
+        version: The catalog version the data must be for
+        path: The full path of the request, including the query string
+    """
+    return cache.get(_response_key(environment_id, version, path))
+
+
+def set_cached_response(environment_id, version: int, path: str, data) -> None:
+    """Cache the serialized response data for a catalog request"""
+    cache.set(
+        _response_key(environment_id, version, path),
+        data,
+        settings.CATALOG_CACHE_TIMEOUT,
+    )
+
+
+def _response_key(environment_id, version: int, path: str) -> str:
+    path_hash = hashlib.sha1(path.encode()).hexdigest()
+
+    return f"catalog:response:{environment_id}:{version}:{path_hash}"
@@ -0,0 +1,108 @@
+""" Compressed storage helpers for large text payloads such as task logs """
+import zlib
+from typing import Optional, Union
+
+from django.conf import settings
+
+# The first byte of every stored payload identifies how the remainder is encoded,
+# allowing additional codecs to be introduced without rewriting existing rows.
+CODEC_RAW = b"\x00"
+CODEC_ZLIB = b"\x01"
+
+
+def compress_text(text: Optional[str]) -> Optional[bytes]:
+    """Encode text for storage, compressing it when doing so saves space.
+
+    Payloads smaller than TASK_OUTPUT_COMPRESSION_MIN_SIZE, or those that do not
+    shrink when compressed, are stored raw so that reads of small values never pay
+    for decompression.
+
+    Args:
+        text: The text to encode
+
+    Returns:
+        The codec marker followed by the encoded text, or None if text is None
+    """
+    if text is None:
+        return None
+
+    raw = text.encode("utf-8")
+
+    if len(raw) >= settings.TASK_OUTPUT_COMPRESSION_MIN_SIZE:
+        compressed = zlib.compress(raw, settings.TASK_OUTPUT_COMPRESSION_LEVEL)
+
+        if len(compressed) < len(raw):
+            return CODEC_ZLIB + compressed
+
+    return CODEC_RAW + raw
+
+
+def decompress_text(data: Optional[Union[bytes, memoryview]]) -> Optional[str]:
+    """Decode a payload previously encoded with compress_text
+
+    Args:
+        data: The stored payload. Database backends may return a memoryview rather
+              than bytes for binary columns.
+
+    Returns:
+        The original text, or None if data is None
+
+    Raises:
+        ValueError: The payload uses an unknown codec
+    """
+    if data is None:
+        return None
+
+    data = bytes(data)
+    codec, payload = data[:1], data[1:]
+
+    match codec:
+        case b"\x00":
+            return payload.decode("utf-8")
+        case b"\x01":
+            return zlib.decompress(payload).decode("utf-8")
+        case _:
+            raise ValueError(f"Unknown compression codec: {codec!r}")
+
+
+def compressed_text_property(compressed_field: str, legacy_field: str) -> property:
+    """Build a property that transparently compresses on write and lazily decompresses
+    on read.
+
+    Rows written before compression was introduced keep their contents in
+    legacy_field until they are migrated, so reads fall back to it when no compressed
+    value is present. Assigning a value always writes the compressed form and clears
+    the legacy value.
+
+    Args:
+        compressed_field: Name of the BinaryField holding the encoded payload
+        legacy_field: Name of the TextField holding uncompressed legacy content
+
+    Returns:
+        A property suitable for use as a model attribute
+    """
+    cache_attr = f"_{compressed_field}_text"
+
+    def getter(self) -> Optional[str]:
+        compressed = getattr(self, compressed_field)
+
+        if compressed is None:
+            return getattr(self, legacy_field)
+
+        cached = self.__dict__.get(cache_attr)
+
+        # Compare identity so that a payload replaced directly on the field, such as
+        # by refresh_from_db(), is decompressed again rather than served stale.
+        if cached is None or cached[0] is not compressed:
+            cached = (compressed, decompress_text(compressed))
+            self.__dict__[cache_attr] = cached
+
+        return cached[1]
+
+    def setter(self, value: Optional[str]) -> None:
+        compressed = compress_text(value)
+        setattr(self, compressed_field, compressed)
+        setattr(self, legacy_field, None)
+        self.__dict__[cache_attr] = (compressed, value)
+
+    return property(getter, setter)
@@ -0,0 +1,119 @@
+""" Database connection management and read replica routing """
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Alias of the optional read replica in DATABASES
+REPLICA_DATABASE = "replica"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Whether the current request has written to the database
+_wrote = ContextVar("database_wrote", default=False)
+
+
+def configure_worker_connections() -> None:
+    """Apply WORKER_DB_CONN_MAX_AGE and close any connections opened so far
+
+    Must be called before a celery worker starts, so that no connection opened
+    during startup is inherited by the forked pool processes. Within the pool
+    processes, celery's Django integration closes unusable or expired connections
+    around every task, so each process holds at most one connection per database.
+    """
+    for alias in connections:
+        connections[alias].settings_dict[
+            "CONN_MAX_AGE"
+        ] = settings.WORKER_DB_CONN_MAX_AGE
+
+    connections.close_all()
+
+
+class ReplicaRouter:
+    """Routes every write to the primary database
+
+    Reads only go to the replica when a queryset is explicitly directed there, as
+    ReplicaReadMixin does. Objects loaded from the replica keep reading their
+    related objects from it, so that a single response sees consistent data.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+
+        if instance is not None and instance._state.db == REPLICA_DATABASE:
+            return REPLICA_DATABASE
+
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DATABASE
+
+
+def replica_configured() -> bool:
+    return REPLICA_DATABASE in settings.DATABASES
+
+
+def _recent_write_key(user) -> str:
+    return f"database:recent_write:{user.pk}"
+
+
+@contextmanager
+def track_writes(request):
+    """Remember that the requesting user wrote to the database if the request does
+    so within the block, so that their reads are served from the primary until the
+    replica has caught up"""
+    token = _wrote.set(False)
+
+    try:
+        yield
+    finally:
+        # The user is looked up afterwards, as API authentication happens within
+        # the view
+        user = getattr(request, "user", None)
+
+        if (
+            _wrote.get()
+            and replica_configured()
+            and user is not None
+            and user.is_authenticated
+        ):
+            cache.set(_recent_write_key(user), True, settings.DB_REPLICA_STICKY_SECONDS)
+
+        _wrote.reset(token)
+
+
+def get_read_database(request) -> str:
+    """The database alias that a request's reads should use
+
+    Safe requests read from the replica when one is configured, unless the user
+    has written within the last DB_REPLICA_STICKY_SECONDS, in which case they read
+    from the primary so that they see their own writes.
+    """
+    if (
+        replica_configured()
+        and request.method in SAFE_METHODS
+        and not (
+            request.user.is_authenticated and cache.get(_recent_write_key(request.user))
+        )
+    ):
+        return REPLICA_DATABASE
+
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """Serves a view's queryset from the read replica where get_read_database
+    allows it. For use with both Django views and DRF viewsets."""
+
+    def get_queryset(self):
+        return super().get_queryset().using(get_read_database(self.request))
@@ -1,11 +1,26 @@
-import json
 import logging
-
-from core.utils.messaging import build_connection
-from core.utils.tasking import record_task_result
+from functools import partial
+
+from django.conf import settings
+from pika.exceptions import ChannelClosedByBroker
+from pika.spec import NOT_FOUND
+
+from core.utils.messaging import (
+    TASK_RESULTS_QUEUE,
+    build_connection,
+    declare_runner_pool,
+    decode_message,
+    get_runner_pools,
+)
+from core.utils.metrics import MESSAGES_RECEIVED, QUEUE_DEPTH
+from core.utils.runners import record_runner_load
+from core.utils.tasking import record_task_progress, record_task_result
 
 logger = logging.getLogger(__name__)
 
+# IDs of the tasks that status events have been received for since the last flush
+_task_progress = set()
+
 
 def start_listening():
     logger.info("Starting listener")
@@ -25,6 +40,67 @@ def _on_connection_open(connection):
     logger.info("Connected")
     connection.channel(on_open_callback=_on_channel_open)
 
+    _poll_queue_depths(connection)
+    _flush_task_progress(connection)
+
+
+def _flush_task_progress(connection):
+    """Periodically hand off the tasks that status events were received for, so
+    that a burst of events results in a single batched update"""
+    if not connection.is_open:
+        return
+
+    if _task_progress:
+        record_task_progress.delay(list(_task_progress))
+        _task_progress.clear()
+
+    connection.ioloop.call_later(
+        settings.TASK_STATUS_FLUSH_INTERVAL, _flush_task_progress, connection
+    )
+
+
+def _poll_queue_depths(connection):
+    """Periodically record the number of messages waiting in each queue"""
+    if not connection.is_open:
+        return
+
+    # Each check gets its own short-lived channel, since the broker closes the
+    # channel if the queue doesn't exist yet. The pools are looked up each time so
+    # that pools newly assigned to environments are picked up.
+    for queue in [TASK_RESULTS_QUEUE, *get_runner_pools()]:
+        connection.channel(on_open_callback=partial(_check_queue_depth, queue=queue))
+
+    connection.ioloop.call_later(
+        settings.METRICS_QUEUE_DEPTH_INTERVAL, _poll_queue_depths, connection
+    )
+
+
+def _check_queue_depth(channel, queue):
+    def on_declare_ok(frame):
+        QUEUE_DEPTH.labels(queue=queue).set(frame.method.message_count)
+        channel.close()
+
+    if queue != TASK_RESULTS_QUEUE:
+        channel.add_on_close_callback(partial(_on_pool_check_closed, queue=queue))
+
+    channel.queue_declare(queue, passive=True, callback=on_declare_ok)
+
+
+def _on_pool_check_closed(channel, reason, queue):
+    """Declare the queue of a pool assigned to an environment after the queues were
+    declared on startup, so that its runners can consume from it"""
+    if not (
+        isinstance(reason, ChannelClosedByBroker) and reason.reply_code == NOT_FOUND
+    ):
+        return
+
+    logger.info("Declaring queue for new runner pool %s", queue)
+
+    try:
+        declare_runner_pool(queue)
+    except Exception as exc:
+        logger.error("Unable to declare queue for runner pool %s: %s", queue, exc)
+
 
 def _on_channel_open(new_channel):
     """Called when our channel has opened"""
@@ -40,13 +116,19 @@ def _handle_delivery(channel, deliver, properties, body):
     # TODO: Implement handling of specific exceptions
     try:
         msg_type = properties.headers.get("x-msg-type", "__NONE__")
-        msg_body = json.loads(body.decode())
+        msg_body = decode_message(body, properties)
 
         logger.info("Received message %s", msg_type)
+        MESSAGES_RECEIVED.labels(msg_type=msg_type).inc()
 
         match msg_type:
             case "TASK_RESULT":
                 record_task_result.delay(msg_body)
+            case "TASK_STATUS":
+                # Every status a runner reports means the task is in progress
+                _task_progress.update(event["task_id"] for event in msg_body["events"])
+            case "RUNNER_LOAD":
+                record_runner_load(msg_body)
             case _:
                 logger.error("Unrecognized message type: %s", msg_type)
 
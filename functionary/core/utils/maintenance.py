@@ -0,0 +1,77 @@
+import logging
+
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.db import transaction
+
+from core.celery import app
+from core.models import TaskLog, TaskResult
+
+logger = get_task_logger(__name__)
+logger.setLevel(getattr(logging, settings.LOG_LEVEL))
+
+# (model, legacy field, compressed field, text property) for each compressed payload
+_COMPRESSED_OUTPUTS = [
+    (TaskLog, "legacy_log", "compressed_log", "log"),
+    (TaskResult, "legacy_result", "compressed_result", "result"),
+]
+
+
+def _compress_legacy_batch(
+    model, legacy_field: str, compressed_field: str, text_attr: str, batch_size: int
+) -> int:
+    """Compress a single batch of rows that still store their output uncompressed
+
+    Returns:
+        The number of rows compressed
+    """
+    with transaction.atomic():
+        rows = list(
+            model.objects.select_for_update(skip_locked=True)
+            .filter(**{f"{legacy_field}__isnull": False})
+            .only("pk", legacy_field)
+            .order_by("pk")[:batch_size]
+        )
+
+        for row in rows:
+            # Assigning through the property writes the compressed payload and
+            # clears the legacy value
+            setattr(row, text_attr, getattr(row, legacy_field))
+
+        model.objects.bulk_update(rows, [compressed_field, legacy_field])
+
+    return len(rows)
+
+
+@app.task()
+def compress_task_output(batch_size: int = None) -> None:
+    """Compress TaskLog and TaskResult rows recorded before compressed storage was
+    introduced.
+
+    A single batch of each model is processed per run. If more rows remain, the task
+    requeues itself after TASK_OUTPUT_BACKFILL_DELAY seconds so that the backfill
+    does not monopolize the database or the worker.
+
+    Args:
+        batch_size: Maximum number of rows of each model to compress per run.
+                    Defaults to TASK_OUTPUT_BACKFILL_BATCH_SIZE.
+    """
+    batch_size = batch_size or settings.TASK_OUTPUT_BACKFILL_BATCH_SIZE
+    remaining = False
+
+    for model, legacy_field, compressed_field, text_attr in _COMPRESSED_OUTPUTS:
+        count = _compress_legacy_batch(
+            model, legacy_field, compressed_field, text_attr, batch_size
+        )
+        logger.debug("Compressed %s %s rows", count, model.__name__)
+
+        if count == batch_size:
+            remaining = True
+
+    if remaining:
+        compress_task_output.apply_async(
+            kwargs={"batch_size": batch_size},
+            countdown=settings.TASK_OUTPUT_BACKFILL_DELAY,
+        )
+    else:
+        logger.info("Task output compression backfill complete")
@@ -1,13 +1,19 @@
 import json
 import logging
 import ssl
+import zlib
 from time import sleep
-from typing import Tuple
+from typing import Optional, Tuple
 
+import msgpack
 import pika
 from django.conf import settings
-from pika.exceptions import AMQPConnectionError, UnroutableError
+from pika.exceptions import AMQPConnectionError, ChannelClosedByBroker, UnroutableError
 from pika.exchange_type import ExchangeType
+from pika.spec import PRECONDITION_FAILED
+
+from core.models import Environment, Task
+from core.utils.runners import get_dispatch_counts, get_runner_loads, record_dispatch
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +21,20 @@ PUBLIC_EXCHANGE = "runners.public"
 PUBLIC_QUEUE = "public"
 TASK_RESULTS_QUEUE = "tasking.results"
 
+# Supported message body encodings, identified by the content_type property. JSON is
+# understood by every runner, while msgpack is only sent to runners that advertise
+# support for it.
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+SUPPORTED_CONTENT_TYPES = [JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE]
+
+# Header listing the encodings core can decode, sent with every message to runners so
+# that they only reply with an encoding core understands
+ACCEPT_HEADER = "x-accept-content-types"
+
+# content_encoding of msgpack bodies that have been compressed
+ZLIB_CONTENT_ENCODING = "zlib"
+
 
 def build_connection(ca=None, cert=None, key=None, open_callback=None):
     """Creates a connection to RabbitMQ.
@@ -57,44 +77,194 @@ def build_connection(ca=None, cert=None, key=None, open_callback=None):
         return pika.BlockingConnection(pika.ConnectionParameters(**connection_params))
 
 
+def get_runner_queue(runner: str) -> str:
+    """The name of the queue that only the named runner consumes from"""
+    return f"runner.{runner}"
+
+
+def get_pool_route(task) -> Tuple[str, str]:
+    """Determine the exchange and routing key for the runner pool of the provided
+    task's environment
+
+    Args:
+        task: Task instance to determine routing information for
+
+    Returns:
+        A tuple of strings: (exchange, routing_key)
+    """
+    return (PUBLIC_EXCHANGE, task.environment.runner_pool)
+
+
+def _select_runner(pool: str, image: str) -> Optional[str]:
+    """Select the least loaded runner in the pool that has free capacity and already
+    has the image cached, based on the most recent load reports
+
+    Tasks dispatched to a runner since its last report count towards its load, so
+    that a burst of tasks is spread across runners rather than all sent to the one
+    that last reported idle.
+    """
+    loads = [
+        load
+        for load in get_runner_loads().values()
+        if load.get("pool", PUBLIC_QUEUE) == pool and image in load.get("images", [])
+    ]
+    dispatched = get_dispatch_counts(loads)
+    candidates = [
+        (load, load["active"] + dispatched[load["runner"]])
+        for load in loads
+        if load["active"] + dispatched[load["runner"]] < load["capacity"]
+    ]
+
+    if not candidates:
+        return None
+
+    load, _ = min(
+        candidates, key=lambda candidate: candidate[1] / candidate[0]["capacity"]
+    )
+    record_dispatch(load)
+
+    return load["runner"]
+
+
 def get_route(task) -> Tuple[str, str]:
     """Determine the correct exchange and routing key for provided task
 
+    Tasks are sent directly to a runner in the environment's pool that has capacity
+    and already has the package image, avoiding a cold pull. If there is no such
+    runner the task goes to the pool's shared queue, to be picked up by whichever
+    runner frees up first.
+
     Args:
         task: Task instance to determine routing information for
 
     Returns:
         A tuple of strings: (exchange, routing_key)
     """
-    # TODO: Implement actual routing determination logic. For now, this always returns
-    #       the public runner pool exchange and routing key
-    return (PUBLIC_EXCHANGE, PUBLIC_QUEUE)
+    pool = task.environment.runner_pool
+    runner = _select_runner(pool, task.function.package.full_image_name)
+
+    if runner is None:
+        return get_pool_route(task)
+
+    return (PUBLIC_EXCHANGE, get_runner_queue(runner))
+
+
+def negotiate_content_type(pool: str) -> str:
+    """Determine the encoding to use for messages sent to a runner pool
+
+    Messages sent directly to a runner can still end up on the pool queue, so the
+    compact encoding is only used when every runner known to be in the pool supports
+    it. Runners predating load reports can't advertise anything, so
+    MESSAGE_ENCODING can be set to json to rule them out.
+
+    Args:
+        pool: The runner pool the message is destined for
+
+    Returns:
+        The content type to encode the message with
+    """
+    if settings.MESSAGE_ENCODING == "json":
+        return JSON_CONTENT_TYPE
+
+    runners = [
+        load
+        for load in get_runner_loads().values()
+        if load.get("pool", PUBLIC_QUEUE) == pool
+    ]
+
+    if runners and all(
+        MSGPACK_CONTENT_TYPE in load.get("content_types", []) for load in runners
+    ):
+        return MSGPACK_CONTENT_TYPE
+
+    return JSON_CONTENT_TYPE
+
+
+def encode_message(message, content_type=JSON_CONTENT_TYPE) -> Tuple[bytes, str]:
+    """Encode a message body
+
+    msgpack bodies at least MESSAGE_COMPRESSION_MIN_SIZE bytes long are also
+    compressed. JSON bodies never are, since runners that only understand JSON
+    don't know to decompress them.
+
+    Args:
+        message: The message to encode
+        content_type: The encoding to use
+
+    Returns:
+        A tuple of the encoded body and its content_encoding
+    """
+    if content_type != MSGPACK_CONTENT_TYPE:
+        return json.dumps(message).encode(), "utf-8"
 
+    body = msgpack.packb(message)
 
-def send_message(exchange, routing_key, msg_type, message):
-    """Sends a JSON message to the specified queue.
+    if len(body) >= settings.MESSAGE_COMPRESSION_MIN_SIZE:
+        return zlib.compress(body), ZLIB_CONTENT_ENCODING
+
+    return body, None
+
+
+def decode_message(body: bytes, properties):
+    """Decode a message body according to its content_type and content_encoding
+
+    Messages without a content_type are treated as JSON.
+
+    Args:
+        body: The body of the received message
+        properties: The properties of the received message
+
+    Returns:
+        The decoded message
+    """
+    if properties.content_encoding == ZLIB_CONTENT_ENCODING:
+        body = zlib.decompress(body)
+
+    if properties.content_type == MSGPACK_CONTENT_TYPE:
+        return msgpack.unpackb(body)
+
+    return json.loads(body.decode())
+
+
+def send_message(
+    exchange,
+    routing_key,
+    msg_type,
+    message,
+    priority=None,
+    content_type=JSON_CONTENT_TYPE,
+):
+    """Sends a message to the specified queue.
 
     Sends the given message to the queue. If msg_type is populated, it
-    sets the x-msg-type header to that value.
+    sets the x-msg-type header to that value. The encodings that core can decode
+    are advertised in the ACCEPT_HEADER header.
 
     Args:
         exchange: The message broker exchange to send the message to
         routing_key: The routing key to use when delivering the message
         msg_type: The value of x-msg-type to set in the header, or None
-        message: The message to send, must be valid JSON.
+        message: The message to send, must be serializable as JSON.
+        priority: The AMQP priority of the message, or None. Only honored by
+            queues declared with x-max-priority.
+        content_type: The encoding to send the message with. Defaults to JSON,
+            which every consumer understands.
 
     Raises:
         pika.exceptions.UnroutableError: if unable to publish the message
     """
 
     headers = {"x-msg-type": msg_type} if msg_type else {}
+    headers[ACCEPT_HEADER] = SUPPORTED_CONTENT_TYPES
+    body, content_encoding = encode_message(message, content_type)
 
     # TODO Update this to use a persistent connection to the queue
     publish_props = pika.BasicProperties(
-        content_type="application/json",
-        content_encoding="utf-8",
+        content_type=content_type,
+        content_encoding=content_encoding,
         headers=headers,
         delivery_mode=1,
+        priority=priority,
     )
 
     connection = build_connection()
@@ -105,7 +275,7 @@ def send_message(exchange, routing_key, msg_type, message):
         channel.basic_publish(
             exchange=exchange,
             routing_key=routing_key,
-            body=json.dumps(message),
+            body=body,
             properties=publish_props,
             mandatory=True,
         )
@@ -117,6 +287,14 @@ def send_message(exchange, routing_key, msg_type, message):
         connection.close()
 
 
+def get_runner_pools() -> list[str]:
+    """The names of all runner pools, which are also the names of their queues"""
+    pools = {PUBLIC_QUEUE, *settings.RUNNER_POOLS}
+    pools.update(Environment.objects.values_list("runner_pool", flat=True).distinct())
+
+    return sorted(pools)
+
+
 def initialize_messaging():
     """Declares the exchanges and queues necessary for communicating with the runners"""
     connection = build_connection()
@@ -129,9 +307,9 @@ def initialize_messaging():
         durable=True,
         auto_delete=False,
     )
-    logger.debug("Configuring rabbitmq queue: %s", PUBLIC_QUEUE)
-    channel.queue_declare(PUBLIC_QUEUE, durable=True, auto_delete=False)
-    channel.queue_bind(PUBLIC_QUEUE, PUBLIC_EXCHANGE)
+    # Each runner pool has a queue shared by all of the runners in it
+    for pool in get_runner_pools():
+        channel = _declare_pool_queue(connection, channel, pool)
 
     logger.debug("Configuring rabbitmq queue: %s", TASK_RESULTS_QUEUE)
     channel.queue_declare(TASK_RESULTS_QUEUE, durable=True, auto_delete=False)
@@ -140,6 +318,67 @@ def initialize_messaging():
     connection.close()
 
 
+def declare_runner_pool(pool: str) -> None:
+    """Declares the queue for a runner pool that was not known when messaging was
+    initialized, such as one newly assigned to an environment
+
+    Args:
+        pool: The name of the runner pool
+    """
+    connection = build_connection()
+
+    try:
+        _declare_pool_queue(connection, connection.channel(), pool)
+    finally:
+        connection.close()
+
+
+def _declare_pool_queue(connection, channel, pool):
+    """Declare the queue shared by the runners in a pool and bind it to the public
+    exchange
+
+    Returns:
+        A usable channel, as with _declare_priority_queue
+    """
+    logger.debug("Configuring rabbitmq queue: %s", pool)
+    channel = _declare_priority_queue(connection, channel, pool)
+    channel.queue_bind(pool, PUBLIC_EXCHANGE)
+
+    return channel
+
+
+def _declare_priority_queue(connection, channel, queue):
+    """Declare a durable queue that delivers higher priority messages first
+
+    Queue arguments can't be changed once a queue exists, so a queue declared before
+    priorities were introduced is left as is, and keeps delivering in FIFO order,
+    until it is deleted and redeclared.
+
+    Returns:
+        A usable channel. The broker closes the channel when the declaration fails,
+        in which case a new one is opened.
+    """
+    try:
+        channel.queue_declare(
+            queue,
+            durable=True,
+            auto_delete=False,
+            arguments={"x-max-priority": Task.PRIORITY_MAX},
+        )
+    except ChannelClosedByBroker as exc:
+        if exc.reply_code != PRECONDITION_FAILED:
+            raise
+
+        logger.warning(
+            "Queue %s exists without priority support. Delete it and restart to "
+            "enable task priorities.",
+            queue,
+        )
+        channel = connection.channel()
+
+    return channel
+
+
 def connection_ready() -> bool:
     """Determine if we are able to connect to the message broker
 
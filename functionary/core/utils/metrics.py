@@ -0,0 +1,89 @@
+"""Prometheus metrics for the functionary processes
+
+The web server exposes these through the metrics view, while the listener and
+worker commands serve them on METRICS_PORT. Processes that fork, such as the celery
+workers and multi-process web servers, must set PROMETHEUS_MULTIPROC_DIR to a
+directory shared by the process tree so that the metrics of every child process are
+aggregated when scraped.
+"""
+import os
+
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+# Buckets in seconds for operations ranging from a fast database write to a slow
+# image build
+FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SLOW_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800)
+
+TASK_CREATE_SECONDS = Histogram(
+    "functionary_task_create_seconds",
+    "Time to create a task through the API",
+    buckets=FAST_BUCKETS,
+)
+TASK_PUBLISH_SECONDS = Histogram(
+    "functionary_task_publish_seconds",
+    "Time to publish a tasking message to the message broker",
+    buckets=FAST_BUCKETS,
+)
+TASK_RESULTS = Counter(
+    "functionary_task_results",
+    "Task results recorded",
+    ["status"],
+)
+MESSAGES_RECEIVED = Counter(
+    "functionary_messages_received",
+    "Messages received by the listener",
+    ["msg_type"],
+)
+QUEUE_DEPTH = Gauge(
+    "functionary_queue_depth",
+    "Messages waiting in a message broker queue",
+    ["queue"],
+    multiprocess_mode="liveall",
+)
+BUILD_SECONDS = Histogram(
+    "functionary_build_seconds",
+    "Time to build and push a package image",
+    ["status"],
+    buckets=SLOW_BUCKETS,
+)
+
+
+def _get_registry():
+    """The registry to collect from, aggregating across processes when running in
+    multiprocess mode"""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    return registry
+
+
+def start_metrics_server(port) -> None:
+    """Serve metrics over http on the given port. Does nothing if port is None.
+
+    Args:
+        port: The port to listen on
+    """
+    if port is not None:
+        start_http_server(int(port), registry=_get_registry())
+
+
+def metrics_view(request) -> HttpResponse:
+    """Expose metrics for scraping"""
+    return HttpResponse(
+        generate_latest(_get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
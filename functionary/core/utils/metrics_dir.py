@@ -0,0 +1,44 @@
+"""Multiprocess mode setup for the metrics of forking worker processes
+
+This is kept apart from core.utils.metrics because it must run before
+prometheus_client is imported.
+"""
+import glob
+import logging
+import os
+import sys
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+def use_multiprocess_metrics(name: str) -> None:
+    """Record metrics in multiprocess mode, so that metrics recorded by forked worker
+    processes are aggregated by the metrics server in the parent process
+
+    PROMETHEUS_MULTIPROC_DIR is used when set. Otherwise a directory for the named
+    process is created under the system temp directory and cleared of any metrics
+    left by a previous run.
+
+    Args:
+        name: Name of the process, used to keep its default directory separate from
+              those of other processes
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        return
+
+    if "prometheus_client" in sys.modules:
+        logger.warning(
+            "prometheus_client was imported before multiprocess mode was configured. "
+            "Metrics from %s worker processes will not be served.",
+            name,
+        )
+        return
+
+    directory = os.path.join(tempfile.gettempdir(), f"functionary-metrics-{name}")
+    os.makedirs(directory, exist_ok=True)
+
+    for metrics_file in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(metrics_file)
+
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
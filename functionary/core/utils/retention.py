@@ -0,0 +1,295 @@
+import gzip
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from core.celery import app
+from core.models import ArchivedTask, Environment, Task, TaskTiming
+from core.utils.compression import compress_text
+
+logger = get_task_logger(__name__)
+logger.setLevel(getattr(logging, settings.LOG_LEVEL))
+
+ARCHIVE_MODES = ["table", "export", "delete"]
+
+
+def _compressed_output(task, relation: str, compressed_field: str, text_attr: str):
+    """The stored payload of a task's log or result, reusing the compressed form
+    when the row already has one"""
+    try:
+        output = getattr(task, relation)
+    except ObjectDoesNotExist:
+        return None
+
+    if (compressed := getattr(output, compressed_field)) is not None:
+        return bytes(compressed)
+
+    return compress_text(getattr(output, text_attr))
+
+
+def _timing(task):
+    """The task's pipeline timestamps as a dict, or None if none were recorded"""
+    try:
+        timing = task.tasktiming
+    except ObjectDoesNotExist:
+        return None
+
+    return {
+        name: getattr(timing, f"{name}_at").isoformat()
+        for name in TaskTiming.TIMESTAMPS
+        if getattr(timing, f"{name}_at") is not None
+    }
+
+
+def _archived_task(task: Task) -> ArchivedTask:
+    return ArchivedTask(
+        id=task.id,
+        environment_id=task.environment_id,
+        function_name=task.function.name,
+        package_name=task.function.package.name,
+        parameters=task.parameters,
+        status=task.status,
+        priority=task.priority,
+        creator=task.creator.username,
+        created_at=task.created_at,
+        updated_at=task.updated_at,
+        compressed_result=_compressed_output(
+            task, "taskresult", "compressed_result", "result"
+        ),
+        compressed_log=_compressed_output(task, "tasklog", "compressed_log", "log"),
+        timing=_timing(task),
+    )
+
+
+def _is_partitioned() -> bool:
+    """Whether the archive table was created partitioned"""
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [ArchivedTask._meta.db_table],
+        )
+        return cursor.fetchone() is not None
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _next_month(month: datetime) -> datetime:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _partition_name(month: datetime) -> str:
+    return f"{ArchivedTask._meta.db_table}_p{month:%Y_%m}"
+
+
+def _ensure_partitions(archived_tasks: list[ArchivedTask]) -> None:
+    """Create the monthly archive partitions that the given tasks fall into"""
+    table = ArchivedTask._meta.db_table
+    months = {_month_start(archived.created_at) for archived in archived_tasks}
+
+    with connection.cursor() as cursor:
+        for month in sorted(months):
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{_partition_name(month)}" '
+                f'PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+                [month, _next_month(month)],
+            )
+
+
+def _export(environment: Environment, archived_tasks: list[ArchivedTask]) -> str:
+    """Write archived tasks to a new gzip compressed JSON lines file
+
+    The file is written under a temporary name and renamed once complete, so a
+    file with the final name is always whole.
+
+    Returns:
+        The path of the file written
+    """
+    directory = os.path.join(settings.TASK_ARCHIVE_DIR, str(environment.id))
+    os.makedirs(directory, exist_ok=True)
+
+    first_created = archived_tasks[0].created_at.astimezone(timezone.utc)
+    filename = f"tasks-{first_created:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+    path = os.path.join(directory, filename)
+
+    with gzip.open(f"{path}.tmp", "wt", encoding="utf-8") as export_file:
+        for archived in archived_tasks:
+            record = {
+                "id": archived.id,
+                "environment_id": archived.environment_id,
+                "function_name": archived.function_name,
+                "package_name": archived.package_name,
+                "parameters": archived.parameters,
+                "status": archived.status,
+                "priority": archived.priority,
+                "creator": archived.creator,
+                "created_at": archived.created_at,
+                "updated_at": archived.updated_at,
+                "result": archived.result,
+                "log": archived.log,
+                "timing": archived.timing,
+            }
+            export_file.write(json.dumps(record, cls=DjangoJSONEncoder) + "\n")
+
+    os.replace(f"{path}.tmp", path)
+
+    return path
+
+
+def _archive_batch(
+    environment: Environment, cutoff: datetime, mode: str, batch_size: int
+) -> int:
+    """Archive a single batch of an environment's finished tasks created before
+    cutoff, then delete them along with their logs, results and timing
+
+    Tasks that haven't finished are left alone, as their result may still arrive.
+
+    Returns:
+        The number of tasks archived
+    """
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(
+                environment=environment,
+                created_at__lt=cutoff,
+                status__in=Task.FINISHED_STATUSES,
+            )
+            .select_related(
+                "creator",
+                "function__package",
+                "taskresult",
+                "tasklog",
+                "tasktiming",
+            )
+            .order_by("created_at")[:batch_size]
+        )
+
+        if not tasks:
+            return 0
+
+        if mode != "delete":
+            archived_tasks = [_archived_task(task) for task in tasks]
+
+            if mode == "export":
+                path = _export(environment, archived_tasks)
+                logger.debug("Exported %s tasks to %s", len(tasks), path)
+            else:
+                if _is_partitioned():
+                    _ensure_partitions(archived_tasks)
+
+                ArchivedTask.objects.bulk_create(archived_tasks)
+
+        Task.objects.filter(id__in=[task.id for task in tasks]).delete()
+
+    return len(tasks)
+
+
+def _expire_archive(batch_size: int) -> int:
+    """Remove archived tasks older than TASK_ARCHIVE_RETENTION_DAYS
+
+    A partitioned archive drops every partition that has fully expired. Otherwise
+    a single batch of rows is deleted.
+
+    Returns:
+        The number of rows deleted, or 0 when partitions were dropped
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.TASK_ARCHIVE_RETENTION_DAYS
+    )
+
+    if _is_partitioned():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = %s::regclass",
+                [ArchivedTask._meta.db_table],
+            )
+
+            for (partition,) in cursor.fetchall():
+                month = datetime.strptime(
+                    partition.rsplit("_p", 1)[1], "%Y_%m"
+                ).replace(tzinfo=timezone.utc)
+
+                if _next_month(month) <= cutoff:
+                    logger.info("Dropping expired archive partition %s", partition)
+                    cursor.execute(f'DROP TABLE "{partition}"')
+
+        return 0
+
+    expired = ArchivedTask.objects.filter(created_at__lt=cutoff).values_list(
+        "pk", flat=True
+    )
+    count, _ = ArchivedTask.objects.filter(pk__in=list(expired[:batch_size])).delete()
+
+    return count
+
+
+@app.task()
+def archive_tasks(batch_size: int = None) -> None:
+    """Apply the task retention policy
+
+    Tasks older than their environment's task_retention_days, or TASK_RETENTION_DAYS
+    for environments that don't set one, are archived as configured by
+    TASK_ARCHIVE_MODE. Tasks that haven't finished are kept. A single batch per
+    environment is processed per run. If more tasks remain, the task requeues itself
+    after TASK_ARCHIVE_DELAY seconds so that archival does not monopolize the
+    database or the worker.
+
+    Args:
+        batch_size: Maximum number of tasks per environment to archive per run.
+                    Defaults to TASK_ARCHIVE_BATCH_SIZE.
+    """
+    mode = settings.TASK_ARCHIVE_MODE
+
+    if mode not in ARCHIVE_MODES:
+        raise ImproperlyConfigured(
+            f"Invalid TASK_ARCHIVE_MODE: {mode}. "
+            f'Valid choices are: {", ".join(ARCHIVE_MODES)}'
+        )
+
+    batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+    now = datetime.now(timezone.utc)
+    remaining = False
+
+    for environment in Environment.objects.all():
+        retention_days = environment.task_retention_days
+
+        if retention_days is None:
+            retention_days = settings.TASK_RETENTION_DAYS
+
+        if not retention_days:
+            continue
+
+        cutoff = now - timedelta(days=retention_days)
+        count = _archive_batch(environment, cutoff, mode, batch_size)
+        logger.debug("Archived %s tasks from environment %s", count, environment.id)
+
+        if count == batch_size:
+            remaining = True
+
+    if settings.TASK_ARCHIVE_RETENTION_DAYS:
+        if _expire_archive(batch_size) == batch_size:
+            remaining = True
+
+    if remaining:
+        archive_tasks.apply_async(
+            kwargs={"batch_size": batch_size}, countdown=settings.TASK_ARCHIVE_DELAY
+        )
+    else:
+        logger.info("Task archival complete")
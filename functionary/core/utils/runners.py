@@ -0,0 +1,81 @@
+"""Tracking of the load reported by runners"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+RUNNER_LOAD_CACHE_KEY = "runners:load"
+
+
+def record_runner_load(report: dict) -> None:
+    """Record the load reported by a runner in a RUNNER_LOAD message
+
+    This is a read-modify-write of a single cache entry, so it must only be called
+    from one process. The listener handles these messages itself, rather than
+    handing them off to the workers, for that reason.
+
+    Args:
+        report: The message body from a RUNNER_LOAD message
+    """
+    loads = cache.get(RUNNER_LOAD_CACHE_KEY, {})
+    loads[report["runner"]] = {**report, "reported_at": time.time()}
+
+    cutoff = time.time() - settings.RUNNER_LOAD_STALE_AFTER
+    loads = {
+        runner: load for runner, load in loads.items() if load["reported_at"] > cutoff
+    }
+
+    cache.set(RUNNER_LOAD_CACHE_KEY, loads, timeout=settings.RUNNER_LOAD_STALE_AFTER)
+
+
+def get_runner_loads() -> dict:
+    """Get the most recent load reported by each runner
+
+    Runners that have not reported within RUNNER_LOAD_STALE_AFTER seconds are
+    excluded.
+
+    Returns:
+        A dict mapping runner name to its last load report
+    """
+    cutoff = time.time() - settings.RUNNER_LOAD_STALE_AFTER
+
+    return {
+        runner: load
+        for runner, load in cache.get(RUNNER_LOAD_CACHE_KEY, {}).items()
+        if load["reported_at"] > cutoff
+    }
+
+
+def _dispatch_key(load: dict) -> str:
+    return f"runners:dispatched:{load['runner']}:{load['reported_at']}"
+
+
+def get_dispatch_counts(loads: list[dict]) -> dict:
+    """Get the number of tasks dispatched to each runner since its load report
+
+    Args:
+        loads: Load reports as returned by get_runner_loads
+
+    Returns:
+        A dict mapping runner name to the tasks sent to it since the given report
+    """
+    counts = cache.get_many([_dispatch_key(load) for load in loads])
+
+    return {load["runner"]: counts.get(_dispatch_key(load), 0) for load in loads}
+
+
+def record_dispatch(load: dict) -> None:
+    """Count a task dispatched to a runner against its current load report, so that
+    tasks routed before the runner next reports are accounted for
+
+    Args:
+        load: The load report of the runner the task was sent to
+    """
+    key = _dispatch_key(load)
+    cache.add(key, 0, timeout=settings.RUNNER_LOAD_STALE_AFTER)
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Expired along with the report in the meantime
+        pass
@@ -1,12 +1,23 @@
 import logging
+import time
+from datetime import datetime, timezone
+from functools import partial
 from uuid import UUID
 
 from celery.utils.log import get_task_logger
 from django.conf import settings
+from pika.exceptions import UnroutableError
 
 from core.celery import app
-from core.models import Task, TaskLog, TaskResult
-from core.utils.messaging import get_route, send_message
+from core.models import Task, TaskLog, TaskResult, TaskTiming
+from core.utils.messaging import (
+    declare_runner_pool,
+    get_pool_route,
+    get_route,
+    negotiate_content_type,
+    send_message,
+)
+from core.utils.metrics import TASK_PUBLISH_SECONDS, TASK_RESULTS
 
 logger = get_task_logger(__name__)
 logger.setLevel(getattr(logging, settings.LOG_LEVEL))
@@ -19,6 +30,21 @@ def _generate_task_message(task: Task) -> dict:
         "package": task.function.package.full_image_name,
         "function": task.function.name,
         "function_parameters": task.parameters,
+        "priority": task.priority,
+        "timing": {
+            "created": task.created_at.timestamp(),
+            "published": time.time(),
+        },
+    }
+
+
+def _parse_timing(timing: dict) -> dict:
+    """Convert the epoch timestamps carried in a result message to TaskTiming
+    fields, ignoring any that were not reported"""
+    return {
+        f"{name}_at": datetime.fromtimestamp(timing[name], tz=timezone.utc)
+        for name in TaskTiming.TIMESTAMPS
+        if timing.get(name) is not None
     }
 
 
@@ -38,10 +64,60 @@ def publish_task(task_id: UUID) -> None:
     """
     logger.debug(f"Publishing message for Task: {task_id}")
 
-    task = Task.objects.select_related("function", "function__package").get(id=task_id)
+    task = Task.objects.select_related(
+        "environment", "function", "function__package"
+    ).get(id=task_id)
+    message = _generate_task_message(task)
 
     exchange, routing_key = get_route(task)
-    send_message(exchange, routing_key, "TASK_PACKAGE", _generate_task_message(task))
+    send = partial(
+        send_message,
+        msg_type="TASK_PACKAGE",
+        message=message,
+        priority=task.priority,
+        content_type=negotiate_content_type(task.environment.runner_pool),
+    )
+
+    with TASK_PUBLISH_SECONDS.time():
+        try:
+            send(exchange, routing_key)
+            return
+        except UnroutableError:
+            pool_exchange, pool_routing_key = get_pool_route(task)
+
+        # The selected runner's queue no longer exists, so fall back to its pool
+        if (exchange, routing_key) != (pool_exchange, pool_routing_key):
+            try:
+                send(pool_exchange, pool_routing_key)
+                return
+            except UnroutableError:
+                pass
+
+        # The pool's queue doesn't exist, because the environment was assigned the
+        # pool after the queues were declared on startup
+        declare_runner_pool(pool_routing_key)
+        send(pool_exchange, pool_routing_key)
+
+
+@app.task()
+def record_task_progress(task_ids: list[str]) -> None:
+    """Mark the tasks that runners have reported receiving or starting as in
+    progress, with a single update per batch of ids
+
+    Tasks that have already moved past PENDING are left alone, so a status event
+    that arrives after the task's result can't regress it.
+
+    Args:
+        task_ids: IDs of the tasks to mark as in progress
+    """
+    batch_size = settings.TASK_STATUS_BATCH_SIZE
+
+    for start in range(0, len(task_ids), batch_size):
+        end = start + batch_size
+
+        Task.objects.filter(id__in=task_ids[start:end], status=Task.PENDING).update(
+            status=Task.IN_PROGRESS, updated_at=datetime.now(timezone.utc)
+        )
 
 
 @app.task()
@@ -55,6 +131,7 @@ def record_task_result(task_result_message: dict) -> None:
     status = task_result_message["status"]
     output = task_result_message["output"]
     result = task_result_message["result"]
+    timing = task_result_message.get("timing")
 
     try:
         task = Task.objects.get(id=task_id)
@@ -65,9 +142,16 @@ def record_task_result(task_result_message: dict) -> None:
     TaskLog.objects.create(task=task, log=output)
     TaskResult.objects.create(task=task, result=result)
 
+    # Runners that predate timing do not report it
+    if timing is not None:
+        timing["recorded"] = time.time()
+        TaskTiming.objects.create(task=task, **_parse_timing(timing))
+
     # TODO: This status determination feels like it belongs in the runner. This should
     #       be reworked so that there are explicitly known statuses that could come
     #       back from the runner, rather than passing through the command exit status
     #       as is happening now.
     task.status = "COMPLETE" if status == 0 else "ERROR"
     task.save()
+
+    TASK_RESULTS.labels(status=task.status).inc()
@@ -15,6 +15,7 @@ from pathlib import Path
 from django.core.exceptions import ImproperlyConfigured
 
 from .builder_ import *  # noqa
+from .cache_ import *  # noqa
 from .celery_ import *  # noqa
 from .core_ import *  # noqa
 from .logging_ import *  # noqa
@@ -67,6 +68,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ReadYourWritesMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -95,6 +97,21 @@ WSGI_APPLICATION = "functionary.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
+
+def _conn_max_age(variable: str, default: int):
+    """Read a CONN_MAX_AGE from the environment, where "none" means connections are
+    kept indefinitely"""
+    value = os.environ.get(variable, str(default))
+
+    return None if value.lower() == "none" else int(value)
+
+
+# Seconds a connection is kept open for reuse by later requests. 0 closes it at the
+# end of each request. Workers run the same settings, but with
+# WORKER_DB_CONN_MAX_AGE applied when started by run_worker and run_build_worker.
+DB_CONN_MAX_AGE = _conn_max_age("DB_CONN_MAX_AGE", 60)
+WORKER_DB_CONN_MAX_AGE = _conn_max_age("WORKER_DB_CONN_MAX_AGE", 600)
+
 DATABASE_CONFIGS = {
     "sqlite": {
         "ENGINE": "django.db.backends.sqlite3",
@@ -107,6 +124,18 @@ DATABASE_CONFIGS = {
         "PASSWORD": os.environ.get("DB_PASSWORD", "password"),
         "HOST": os.environ.get("DB_HOST", "postgresql"),
         "PORT": int(os.environ.get("DB_PORT", 5432)),
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        # Check a reused connection is still usable before the first query of each
+        # request or task, rather than failing it
+        "CONN_HEALTH_CHECKS": True,
+        # Server side cursors don't survive transaction pooling, so set this when
+        # connecting through a pooler such as pgbouncer in transaction mode
+        "DISABLE_SERVER_SIDE_CURSORS": (
+            os.environ.get("DB_TRANSACTION_POOLING", "false").lower() == "true"
+        ),
+        "OPTIONS": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 10)),
+        },
     },
 }
 
@@ -121,6 +150,19 @@ DATABASES = {
     "default": DATABASE_CONFIGS[os.environ.get("DB_ENGINE", "postgresql").lower()]
 }
 
+# Optional read replica. Safe requests to read only views are served from it, except
+# for users who have written within the last DB_REPLICA_STICKY_SECONDS.
+if DB_REPLICA_HOST := os.environ.get("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DB_REPLICA_HOST,
+        "PORT": int(os.environ.get("DB_REPLICA_PORT", os.environ.get("DB_PORT", 5432))),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["core.utils.database.ReplicaRouter"]
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get("DB_REPLICA_STICKY_SECONDS", 15))
+
 # User model override
 AUTH_USER_MODEL = "core.User"
 
@@ -2,3 +2,15 @@
 import os
 
 BUILDER_WORKDIR_BASE = os.environ.get("BUILDER_WORKDIR_BASE", "/tmp")
+
+# Number of concurrent package builds. Unset uses one per CPU.
+BUILDER_WORKER_CONCURRENCY = os.environ.get("BUILDER_WORKER_CONCURRENCY")
+
+# Days that uploaded package file contents are kept after last being referenced by a
+# published manifest. 0 keeps them forever.
+PACKAGE_BLOB_RETENTION_DAYS = int(os.environ.get("PACKAGE_BLOB_RETENTION_DAYS", 30))
+
+# Batch size when deleting expired package file contents
+PACKAGE_BLOB_EXPIRE_BATCH_SIZE = int(
+    os.environ.get("PACKAGE_BLOB_EXPIRE_BATCH_SIZE", 500)
+)
@@ -0,0 +1,16 @@
+"""Cache related settings"""
+import os
+
+REDIS_CACHE_HOST = os.environ.get("REDIS_HOST", "localhost")
+REDIS_CACHE_PORT = os.environ.get("REDIS_PORT", "6379")
+REDIS_CACHE_DB = os.environ.get("REDIS_CACHE_DB", "1")
+
+# Runner load reports are recorded by the listener and read by the workers that
+# route tasks, so the cache must be shared by all web and worker processes. It uses
+# a separate database of the Redis server that serves as the Celery broker.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{REDIS_CACHE_HOST}:{REDIS_CACHE_PORT}/{REDIS_CACHE_DB}",
+    }
+}
@@ -3,3 +3,62 @@ import os
 REGISTRY_HOST = os.environ.get("REGISTRY_HOST", "localhost")
 REGISTRY_PORT = os.environ.get("REGISTRY_PORT", "5000")
 REGISTRY = f"{REGISTRY_HOST}:{REGISTRY_PORT}"
+
+# Task log and result payloads at or above this size (in bytes) are stored compressed
+TASK_OUTPUT_COMPRESSION_MIN_SIZE = int(
+    os.environ.get("TASK_OUTPUT_COMPRESSION_MIN_SIZE", 256)
+)
+TASK_OUTPUT_COMPRESSION_LEVEL = int(os.environ.get("TASK_OUTPUT_COMPRESSION_LEVEL", 6))
+
+# Batch size and delay (in seconds) between batches when compressing legacy task
+# output rows in the background
+TASK_OUTPUT_BACKFILL_BATCH_SIZE = int(
+    os.environ.get("TASK_OUTPUT_BACKFILL_BATCH_SIZE", 500)
+)
+TASK_OUTPUT_BACKFILL_DELAY = int(os.environ.get("TASK_OUTPUT_BACKFILL_DELAY", 1))
+
+# Days tasks are kept before archival, for environments that don't set their own.
+# Unset or 0 keeps tasks forever.
+TASK_RETENTION_DAYS = int(os.environ.get("TASK_RETENTION_DAYS", 0))
+
+# What happens to tasks past retention: "table" moves them to the archive table,
+# "export" writes them to compressed JSON lines files in TASK_ARCHIVE_DIR, and
+# "delete" removes them outright
+TASK_ARCHIVE_MODE = os.environ.get("TASK_ARCHIVE_MODE", "table").lower()
+TASK_ARCHIVE_DIR = os.environ.get("TASK_ARCHIVE_DIR", "task_archive")
+
+# Days archived tasks are kept in the archive table. Unset or 0 keeps them forever.
+TASK_ARCHIVE_RETENTION_DAYS = int(os.environ.get("TASK_ARCHIVE_RETENTION_DAYS", 0))
+
+# Create the archive table partitioned by month on PostgreSQL. Only takes effect
+# when the table is created by migration.
+TASK_ARCHIVE_PARTITIONED = (
+    os.environ.get("TASK_ARCHIVE_PARTITIONED", "false").lower() == "true"
+)
+
+# Batch size and delay (in seconds) between batches when archiving tasks
+TASK_ARCHIVE_BATCH_SIZE = int(os.environ.get("TASK_ARCHIVE_BATCH_SIZE", 500))
+TASK_ARCHIVE_DELAY = int(os.environ.get("TASK_ARCHIVE_DELAY", 1))
+
+# Number of processes for the main worker. Unset uses one per CPU.
+CORE_WORKER_CONCURRENCY = os.environ.get("CORE_WORKER_CONCURRENCY")
+
+# Seconds between checks of the number of messages waiting in each queue, which is
+# reported as a metric by the listener
+METRICS_QUEUE_DEPTH_INTERVAL = int(os.environ.get("METRICS_QUEUE_DEPTH_INTERVAL", 15))
+
+# Seconds between applying the task status events received from runners, and the
+# most tasks updated by a single statement
+TASK_STATUS_FLUSH_INTERVAL = float(os.environ.get("TASK_STATUS_FLUSH_INTERVAL", 1))
+TASK_STATUS_BATCH_SIZE = int(os.environ.get("TASK_STATUS_BATCH_SIZE", 500))
+
+# Seconds that serialized function and package listings are cached for. Cached
+# listings are also discarded whenever the environment's catalog changes.
+CATALOG_CACHE_TIMEOUT = int(os.environ.get("CATALOG_CACHE_TIMEOUT", 3600))
+
+# Seconds after its last load report that a runner is considered gone
+RUNNER_LOAD_STALE_AFTER = int(os.environ.get("RUNNER_LOAD_STALE_AFTER", 60))
+
+# Whether the web server exposes metrics at /metrics. The endpoint is not
+# authenticated, so only enable it where it can't be reached by the public.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "false").lower() == "true"
@@ -4,3 +4,14 @@ RABBITMQ_HOST = os.getenv("RABBITMQ_HOST", "localhost")
 RABBITMQ_PORT = os.getenv("RABBITMQ_PORT", 5672)
 RABBITMQ_USER = os.getenv("RABBITMQ_USER")
 RABBITMQ_PASSWORD = os.getenv("RABBITMQ_PASSWORD")
+
+# Runner pools whose queues are declared on startup, in addition to any pools
+# assigned to environments
+RUNNER_POOLS = os.getenv("RUNNER_POOLS", "public").split(",")
+
+# Encoding of messages sent to runners. auto uses msgpack for pools whose runners all
+# support it, while json always sends JSON.
+MESSAGE_ENCODING = os.getenv("MESSAGE_ENCODING", "auto")
+
+# msgpack message bodies at or above this size (in bytes) are compressed
+MESSAGE_COMPRESSION_MIN_SIZE = int(os.getenv("MESSAGE_COMPRESSION_MIN_SIZE", 1024))
@@ -6,3 +6,16 @@ LOGIN_URL = "/ui/login"
 LOGOUT_URL = "/ui/logout"
 LOGIN_REDIRECT_URL = "ui:home"
 LOGOUT_REDIRECT_URL = "ui:login"
+
+# Number of rows per page, and how long (in seconds) parsed tables are cached, when
+# rendering task results as a table
+UI_TABLE_PAGE_SIZE = 50
+UI_TABLE_CACHE_TIMEOUT = 3600
+
+# Number of compiled task parameter form classes kept per process, and how long (in
+# seconds) rendered unbound forms are cached
+UI_FORM_CACHE_SIZE = 256
+UI_FORM_CACHE_TIMEOUT = 3600
+
+# How long (in seconds) each user's environment selector listing is cached
+UI_ENV_SELECT_CACHE_TIMEOUT = 3600
@@ -14,6 +14,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.apps import apps
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import (
@@ -23,6 +24,8 @@ from drf_spectacular.views import (
 )
 from rest_framework.authtoken.views import obtain_auth_token
 
+from core.utils.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include("core.api.v1.urls")),
@@ -45,6 +48,11 @@ urlpatterns = [
 ]
 
 
+if settings.METRICS_ENABLED:
+    urlpatterns += [
+        path("metrics", metrics_view, name="metrics"),
+    ]
+
 # Add URLs for Django Debug Toolbar if it is an installed app
 if apps.is_installed("debug_toolbar"):
     urlpatterns += [
@@ -0,0 +1,43 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+def _invalidate_function_form(sender, instance, **kwargs):
+    """Discard compiled parameter forms when a Function is updated or removed"""
+    from .forms.forms import invalidate_task_parameter_form
+
+    invalidate_task_parameter_form(instance.id)
+
+
+def _invalidate_user_environments(sender, instance, **kwargs):
+    """Discard a user's cached environment listing when their roles change"""
+    from .components.env_to_select import invalidate_user_environments
+
+    user_id = instance.id if sender._meta.label == "core.User" else instance.user_id
+    invalidate_user_environments(user_id)
+
+
+def _invalidate_all_environments(sender, instance, **kwargs):
+    """Discard all cached environment listings when an Environment or Team changes"""
+    from .components.env_to_select import invalidate_all_environments
+
+    invalidate_all_environments()
+
+
+class UiConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "ui"
+
+    def ready(self):
+        for signal in [post_save, post_delete]:
+            signal.connect(_invalidate_function_form, sender="core.Function")
+
+            for sender in [
+                "core.User",
+                "core.TeamUserRole",
+                "core.EnvironmentUserRole",
+            ]:
+                signal.connect(_invalidate_user_environments, sender=sender)
+
+            for sender in ["core.Environment", "core.Team"]:
+                signal.connect(_invalidate_all_environments, sender=sender)
@@ -1,25 +1,88 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
 from django_unicorn.components import UnicornView
 
 from core.models import Environment
 
+_VERSION_KEY = "ui:env_select:version"
+
+
+def _new_version() -> int:
+    """A starting version when none is cached. Time based, so that a version lost
+    from the cache never brings back listings cached under an old one."""
+    return time.time_ns()
+
+
+def _cache_key(user_id) -> str:
+    """Cache key for a user's environment listing. The key embeds a global version so
+    that changes to any Environment or Team invalidate every user's listing at once.
+    """
+    version = cache.get(_VERSION_KEY)
+
+    if version is None:
+        cache.add(_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(_VERSION_KEY)
+
+    return f"ui:env_select:{version}:{user_id}"
+
+
+def _load_grouped_environments(user) -> dict:
+    """Query the environments visible to user, grouped by team name"""
+    if user.is_superuser:
+        envs = Environment.objects.select_related("team").all()
+    else:
+        envs = user.environments.select_related("team")
+
+    grouped = {}
+
+    for env in envs.order_by("team__name", "name"):
+        grouped.setdefault(env.team.name, []).append(
+            {"id": str(env.id), "name": env.name}
+        )
+
+    return grouped
+
+
+def get_grouped_environments(user) -> dict:
+    """Retrieve the environments visible to user, grouped by team name. The result
+    is cached per user until their roles or any environment or team changes.
+
+    Only the Django cache API is used, so any backend works. With a per-process
+    backend, changes made by another process are only picked up once the listing
+    expires after UI_ENV_SELECT_CACHE_TIMEOUT.
+
+    Args:
+        user: The User to list environments for
+
+    Returns:
+        A dict of team name to a list of {"id", "name"} environment dicts
+    """
+    cache_key = _cache_key(user.id)
+
+    if (grouped := cache.get(cache_key)) is None:
+        grouped = _load_grouped_environments(user)
+        cache.set(cache_key, grouped, settings.UI_ENV_SELECT_CACHE_TIMEOUT)
+
+    return grouped
+
+
+def invalidate_user_environments(user_id) -> None:
+    """Discard the cached environment listing for a single user"""
+    cache.delete(_cache_key(user_id))
+
+
+def invalidate_all_environments() -> None:
+    """Discard the cached environment listings for all users"""
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.add(_VERSION_KEY, _new_version(), timeout=None)
+
 
 class EnvToSelectView(UnicornView):
     environments = {}
 
     def hydrate(self):
-        # Clear any old environments first
-        self.environments = {}
-
-        if self.request.user.is_superuser:
-            envs = (
-                Environment.objects.select_related("team")
-                .all()
-                .order_by("team__name", "name")
-            )
-        else:
-            envs = self.request.user.environments.select_related("team").order_by(
-                "team__name", "name"
-            )
-
-        for env in envs:
-            self.environments.setdefault(env.team.name, []).append(env)
+        self.environments = get_grouped_environments(self.request.user)
@@ -1,5 +1,9 @@
 import csv
+import io
+import math
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django_unicorn.components import PollUpdate, UnicornView
 
@@ -7,6 +11,9 @@ from core.auth import Permission
 
 FINISHED_STATUS = ["COMPLETE", "ERROR"]
 
+# Maximum number of characters of a result inspected when detecting CSV output
+CSV_SNIFF_SAMPLE_SIZE = 16384
+
 
 class TaskDetailView(UnicornView):
     """View for handling the task detail view along with the various dynamically
@@ -15,6 +22,8 @@ class TaskDetailView(UnicornView):
     output_format = None
     format_error = None
     formatted_result = None
+    page = 1
+    page_count = 1
 
     def hydrate(self):
         # NOTE: hydrate is the only method that gets called on every access, so
@@ -46,12 +55,36 @@ class TaskDetailView(UnicornView):
         """Set the results output format to table and format the results data for
         table rendering if possible"""
         self.output_format = "table"
+        self.go_to_page(1)
+
+    def go_to_page(self, page):
+        """Load a single page of the table formatted results
 
+        Only the requested page of rows is held on the component, so that large
+        results are never sent to the browser in their entirety. Each page is
+        cached once it has been read from the result.
+        """
         try:
-            self.formatted_result = _format_table(self.task.result)
+            table_page = _get_table_page(self.task, int(page))
             self.format_error = None
         except Exception:
             self.format_error = "Result data is unsuitable for table output"
+            return
+
+        self.page = table_page["page"]
+        self.page_count = table_page["page_count"]
+        self.formatted_result = {
+            "headers": table_page["headers"],
+            "data": table_page["data"],
+        }
+
+    def next_page(self):
+        """Advance the table output to the next page"""
+        self.go_to_page(self.page + 1)
+
+    def previous_page(self):
+        """Return the table output to the previous page"""
+        self.go_to_page(self.page - 1)
 
     def should_refresh(self):
         """Determines if the dynamic elements of the page should continue refreshing"""
@@ -79,47 +112,82 @@ class TaskDetailView(UnicornView):
 
 
 def _detect_csv(results):
-    """Attempt to determine if the provided results are valid CSV"""
+    """Attempt to determine if the provided results are valid CSV
+
+    Only a bounded sample from the start of the results is inspected, trimmed to the
+    last complete line within it.
+    """
+    sample = results[:CSV_SNIFF_SAMPLE_SIZE]
+
+    if len(results) > CSV_SNIFF_SAMPLE_SIZE and "\n" in sample:
+        sample = sample[: sample.rindex("\n")]
+
     try:
-        csv.Sniffer().sniff(results, delimiters=",")
+        csv.Sniffer().sniff(sample, delimiters=",")
     except Exception:
         return False
 
     return True
 
 
-def _format_csv_table(result: str) -> dict:
-    """Convert a string of CSV into a format suitable for table rendering"""
-    csv_data = csv.reader(result.splitlines())
-    formatted_result = {
-        "headers": next(csv_data),
-        "data": [row for row in csv_data],
-    }
+def _get_table_page(task, page: int) -> dict:
+    """Retrieve a page of the table formatted result for a task
+
+    Only the requested page is cached, along with the number of pages, so that a
+    large result is never written to the cache in its entirety. Results do not
+    change once a task has completed, so the cached pages are keyed on the task id
+    alone.
 
-    return formatted_result
+    Args:
+        task: The task whose result to display
+        page: The page number, clamped to the pages available
 
+    Returns:
+        A dict of the page's headers and data rows, along with the page number and
+        the total page_count
+    """
+    page_size = settings.UI_TABLE_PAGE_SIZE
+    cache_prefix = f"ui:task_table:{task.id}:{page_size}"
+    page_count_key = f"{cache_prefix}:page_count"
 
-def _format_json_table(result: list) -> dict:
-    """Convert a JSON list into a format suitable for table rendering"""
-    headers = [key for key in result[0].keys()]
-    res_data = []
+    if (page_count := cache.get(page_count_key)) is not None:
+        page = min(max(page, 1), page_count)
 
-    for row in result:
-        r = []
-        for key in headers:
-            r.append(row[key])
-        res_data.append(r)
+        if table_page := cache.get(f"{cache_prefix}:{page}"):
+            return table_page
+    else:
+        page = max(page, 1)
+
+    start, end = (page - 1) * page_size, page * page_size
+    headers, data, row_count = _table_slice(task.result, start, end)
+    page_count = max(math.ceil(row_count / page_size), 1)
+
+    if page > page_count:
+        # The page is beyond the end of the table, which is only known now
+        cache.set(page_count_key, page_count, settings.UI_TABLE_CACHE_TIMEOUT)
+        return _get_table_page(task, page_count)
+
+    table_page = {
+        "headers": headers,
+        "data": data,
+        "page": page,
+        "page_count": page_count,
+    }
+    cache.set_many(
+        {page_count_key: page_count, f"{cache_prefix}:{page}": table_page},
+        settings.UI_TABLE_CACHE_TIMEOUT,
+    )
 
-    return {"headers": headers, "data": res_data}
+    return table_page
 
 
-def _format_table(result):
-    """Convert a result to a table friendly format
+def _table_slice(result, start: int, end: int) -> tuple[list, list, int]:
+    """Convert the rows of a result between start and end to a table friendly format
 
-    This will take in a "string" or "json" result and return
-    the headers and a list of rows for the data. A result_type of
-    string is assumed to be csv formatted data - a csv reader
-    parses the data into the resulting header and data.
+    This will take in a "string" or "json" result and return the headers, the rows
+    in range, and the total number of rows. A result_type of string is assumed to be
+    csv formatted data, which is read a row at a time so that only the rows in range
+    are kept.
 
     A result type of json should be of the following format:
     [
@@ -129,8 +197,20 @@ def _format_table(result):
     The headers are derived from the keys of the first entry in the list.
     """
     if type(result) is str:
-        return _format_csv_table(result)
+        rows = csv.reader(io.StringIO(result, newline=""))
+        headers = next(rows)
+        data = []
+        row_count = 0
+
+        for row_count, row in enumerate(rows, 1):
+            if start < row_count <= end:
+                data.append(row)
+
+        return headers, data, row_count
     elif type(result) is list and len(result) > 0:
-        return _format_json_table(result)
+        headers = [key for key in result[0].keys()]
+        data = [[row[key] for key in headers] for row in result[start:end]]
+
+        return headers, data, len(result)
     else:
         raise ValueError("Unable to convert result to table")
@@ -1,5 +1,10 @@
+import hashlib
 import json
+from collections import OrderedDict
+from threading import Lock
 
+from django.conf import settings
+from django.core.cache import cache
 from django.forms import (
     BooleanField,
     CharField,
@@ -84,34 +89,149 @@ def _prepare_initial_value(param_type, initial):
 
 
 class TaskParameterForm(Form):
+    """Base class for the forms used to enter a function's parameters.
+
+    Don't instantiate this directly. Use get_task_parameter_form(), which supplies a
+    subclass with the fields for the function already compiled.
+    """
+
     template_name = "forms/task_parameters.html"
 
-    def __init__(self, function, data=None):
-        super().__init__(data)
 
-        for param, value in function.schema["properties"].items():
-            initial = value.get("default", None)
-            req = initial is None
-            param_type = _get_param_type(value)
-            field_class, widget = _field_mapping.get(param_type, (None, None))
+class _FormClassCache:
+    """Least recently used cache of compiled TaskParameterForm classes, keyed on
+    function id and schema hash"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._classes = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            form_class = self._classes.get(key)
+
+            if form_class is not None:
+                self._classes.move_to_end(key)
+
+            return form_class
+
+    def put(self, key, form_class) -> None:
+        with self._lock:
+            self._classes[key] = form_class
+            self._classes.move_to_end(key)
+
+            while len(self._classes) > self.maxsize:
+                self._classes.popitem(last=False)
+
+    def invalidate(self, function_id) -> None:
+        with self._lock:
+            for key in [key for key in self._classes if key[0] == str(function_id)]:
+                del self._classes[key]
+
+
+_form_classes = _FormClassCache(maxsize=settings.UI_FORM_CACHE_SIZE)
+
+
+def _schema_hash(schema: dict) -> str:
+    """Stable hash of a function schema"""
+    return hashlib.sha256(
+        json.dumps(schema, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _build_field(param, value):
+    """Build the form field for a single parameter from its schema definition"""
+    initial = value.get("default", None)
+    req = initial is None
+    param_type = _get_param_type(value)
+    field_class, widget = _field_mapping.get(param_type, (None, None))
+
+    if not field_class:
+        raise ValueError(f"Unknown field type for {param}: {param_type}")
+
+    kwargs = {
+        "label": value["title"],
+        "label_suffix": param_type,
+        "initial": _prepare_initial_value(param_type, initial),
+        "required": req,
+        "help_text": value.get("description", None),
+    }
+
+    if widget:
+        kwargs["widget"] = widget
+
+    field = field_class(**kwargs)
+
+    # Style all inputfields except the checkbox with the "input" class
+    if param_type != "boolean":
+        field.widget.attrs.update({"class": "input"})
 
-            if not field_class:
-                raise ValueError(f"Unknown field type for {param}: {param_type}")
+    return field
+
+
+def _compile_form_class(function, schema_hash: str):
+    """Create a TaskParameterForm subclass with a field for each of the function's
+    parameters"""
+    fields = {
+        param: _build_field(param, value)
+        for param, value in function.schema["properties"].items()
+    }
+
+    return type(f"TaskParameterForm_{schema_hash[:12]}", (TaskParameterForm,), fields)
+
+
+def get_task_parameter_form_class(function):
+    """Retrieve the compiled TaskParameterForm class for a function, compiling it
+    if the function or its current schema has not been seen before.
+
+    Args:
+        function: The Function to retrieve the form class for
+
+    Returns:
+        A TaskParameterForm subclass
+    """
+    key = (str(function.id), _schema_hash(function.schema))
+
+    if (form_class := _form_classes.get(key)) is None:
+        form_class = _compile_form_class(function, key[1])
+        _form_classes.put(key, form_class)
+
+    return form_class
+
+
+def get_task_parameter_form(function, data=None) -> TaskParameterForm:
+    """Create a TaskParameterForm for a function, optionally bound to data
+
+    Args:
+        function: The Function whose parameters the form is for
+        data: Submitted form data to bind to the form
+
+    Returns:
+        A TaskParameterForm instance
+    """
+    return get_task_parameter_form_class(function)(data)
+
+
+def render_task_parameter_form(function) -> str:
+    """Render the unbound TaskParameterForm for a function. The rendered HTML is
+    cached, keyed on the function and its schema.
+
+    Args:
+        function: The Function whose parameters the form is for
+
+    Returns:
+        The rendered form HTML
+    """
+    cache_key = f"ui:task_parameter_form:{function.id}:{_schema_hash(function.schema)}"
 
-            kwargs = {
-                "label": value["title"],
-                "label_suffix": param_type,
-                "initial": _prepare_initial_value(param_type, initial),
-                "required": req,
-                "help_text": value.get("description", None),
-            }
+    if (html := cache.get(cache_key)) is None:
+        html = get_task_parameter_form(function).render()
+        cache.set(cache_key, html, settings.UI_FORM_CACHE_TIMEOUT)
 
-            if widget:
-                kwargs["widget"] = widget
+    return html
 
-            field = field_class(**kwargs)
 
-            # Style all inputfields except the checkbox with the "input" class
-            if param_type != "boolean":
-                field.widget.attrs.update({"class": "input"})
-            self.fields[param] = field
+def invalidate_task_parameter_form(function_id) -> None:
+    """Discard the compiled form classes held by this process for a function"""
+    _form_classes.invalidate(function_id)
@@ -0,0 +1,76 @@
+import pytest
+from django.core.cache import cache
+
+from core.auth import Role
+from core.models import Environment, EnvironmentUserRole, Team, TeamUserRole
+from ui.components.env_to_select import get_grouped_environments
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def team():
+    return Team.objects.create(name="team")
+
+
+@pytest.fixture
+def user(django_user_model, team):
+    user = django_user_model.objects.create(username="user")
+    TeamUserRole.objects.create(user=user, team=team, role=Role.READ_ONLY.value)
+
+    return user
+
+
+def _names(grouped):
+    return {team: [env["name"] for env in envs] for team, envs in grouped.items()}
+
+
+def test_listing_is_cached(user, django_assert_num_queries):
+    """Once cached, the listing is served without querying"""
+    grouped = get_grouped_environments(user)
+
+    with django_assert_num_queries(0):
+        assert get_grouped_environments(user) == grouped
+
+
+def test_role_change_invalidates_listing(user):
+    """Granting a role on another environment shows it in the user's listing"""
+    assert _names(get_grouped_environments(user)) == {"team": ["default"]}
+
+    other = Team.objects.create(name="other")
+    EnvironmentUserRole.objects.create(
+        user=user,
+        environment=other.environments.get(),
+        role=Role.READ_ONLY.value,
+    )
+
+    assert _names(get_grouped_environments(user)) == {
+        "other": ["default"],
+        "team": ["default"],
+    }
+
+
+def test_role_removal_invalidates_listing(user):
+    """Removing the user's role removes its environments from the listing"""
+    assert get_grouped_environments(user)
+
+    TeamUserRole.objects.filter(user=user).delete()
+
+    assert get_grouped_environments(user) == {}
+
+
+def test_environment_change_invalidates_listing(user, team):
+    """Creating or renaming environments updates every user's listing"""
+    assert _names(get_grouped_environments(user)) == {"team": ["default"]}
+
+    Environment.objects.create(team=team, name="staging")
+    environment = team.environments.get(name="default")
+    environment.name = "production"
+    environment.save()
+
+    assert _names(get_grouped_environments(user)) == {
+        "team": ["production", "staging"]
+    }
@@ -0,0 +1,104 @@
+import csv
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+
+from ui.components import task_detail
+from ui.components.task_detail import (
+    CSV_SNIFF_SAMPLE_SIZE,
+    _detect_csv,
+    _get_table_page,
+)
+
+ROWS = 120
+PAGE_SIZE = 50
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    settings.UI_TABLE_PAGE_SIZE = PAGE_SIZE
+    cache.clear()
+
+
+@pytest.fixture
+def csv_task():
+    lines = ["name,value", *(f"row{number},{number}" for number in range(ROWS))]
+
+    return SimpleNamespace(id=uuid.uuid4(), result="\n".join(lines))
+
+
+@pytest.fixture
+def json_task():
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        result=[{"name": f"row{number}", "value": number} for number in range(ROWS)],
+    )
+
+
+@pytest.mark.parametrize("task_fixture", ["csv_task", "json_task"])
+def test_table_pages(task_fixture, request):
+    """Results are served a page at a time"""
+    task = request.getfixturevalue(task_fixture)
+
+    first = _get_table_page(task, 1)
+    last = _get_table_page(task, 3)
+
+    assert first["headers"] == ["name", "value"]
+    assert first["page_count"] == 3
+    assert len(first["data"]) == PAGE_SIZE
+    assert first["data"][0][0] == "row0"
+    assert last["page"] == 3
+    assert len(last["data"]) == ROWS - 2 * PAGE_SIZE
+    assert last["data"][-1][0] == f"row{ROWS - 1}"
+
+
+def test_only_requested_page_is_cached(csv_task, mocker):
+    """Reading a page caches that page alone, and serves it from the cache after"""
+    table_slice = mocker.spy(task_detail, "_table_slice")
+
+    page = _get_table_page(csv_task, 2)
+
+    assert _get_table_page(csv_task, 2) == page
+    assert table_slice.call_count == 1
+    assert cache.get(f"ui:task_table:{csv_task.id}:{PAGE_SIZE}:1") is None
+    assert cache.get(f"ui:task_table:{csv_task.id}:{PAGE_SIZE}:3") is None
+
+
+def test_page_is_clamped(csv_task, mocker):
+    """Out of range pages are clamped, without rereading the result once the number
+    of pages is known"""
+    assert _get_table_page(csv_task, 0)["page"] == 1
+
+    table_slice = mocker.spy(task_detail, "_table_slice")
+
+    assert _get_table_page(csv_task, 10)["page"] == 3
+    assert _get_table_page(csv_task, 10)["page"] == 3
+    assert table_slice.call_count == 1
+
+
+def test_page_beyond_unknown_end_is_clamped(json_task):
+    """A page past the end is clamped on the first request for the result"""
+    page = _get_table_page(json_task, 10)
+
+    assert page["page"] == 3
+    assert page["data"][-1][0] == f"row{ROWS - 1}"
+
+
+def test_unsuitable_result_raises():
+    """Results that can't be displayed as a table raise an error"""
+    with pytest.raises(ValueError):
+        _get_table_page(SimpleNamespace(id=uuid.uuid4(), result={"a": 1}), 1)
+
+
+def test_csv_sniff_sample_is_bounded(mocker):
+    """Only a bounded sample of complete lines is sniffed to detect CSV"""
+    sniff = mocker.spy(csv.Sniffer, "sniff")
+    result = "\n".join(f"row{number},{number}" for number in range(100000))
+
+    assert _detect_csv(result)
+
+    sample = sniff.call_args.args[1]
+    assert len(sample) <= CSV_SNIFF_SAMPLE_SIZE
+    assert result.startswith(sample + "\n")
@@ -7,7 +7,7 @@ from django.views.decorators.http import require_POST
 from core.auth import Permission
 from core.models import Environment, Function, Task
 
-from ..forms.forms import TaskParameterForm
+from ..forms.forms import get_task_parameter_form, render_task_parameter_form
 from .view_base import (
     PermissionedEnvironmentDetailView,
     PermissionedEnvironmentListView,
@@ -33,9 +33,7 @@ class FunctionDetailView(PermissionedEnvironmentDetailView):
         function = self.get_object()
         env = function.package.environment
         if self.request.user.has_perm(Permission.TASK_CREATE, env):
-            form = TaskParameterForm(function)
-
-            context["form"] = form.render("forms/task_parameters.html")
+            context["form"] = render_task_parameter_form(function)
         return context
 
 
@@ -48,7 +46,7 @@ def execute(request) -> HttpResponse:
     env = Environment.objects.get(id=request.session.get("environment_id"))
     if request.user.has_perm(Permission.TASK_CREATE, env):
         func = Function.objects.get(id=request.POST["function_id"])
-        form = TaskParameterForm(func, request.POST)
+        form = get_task_parameter_form(func, request.POST)
 
         if form.is_valid():
             # Create the new Task, the validated parameters are in form.cleaned_data
@@ -58,6 +56,8 @@ def execute(request) -> HttpResponse:
                 function=func,
                 parameters=form.cleaned_data,
                 return_type=func.return_type,
+                # Interactive tasks should not wait behind queued batch work
+                priority=Task.PRIORITY_HIGH,
             )
 
             # redirect to a new URL:
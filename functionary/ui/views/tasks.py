@@ -20,6 +20,11 @@ class TaskDetailView(PermissionedEnvironmentDetailView):
             super()
             .get_queryset()
             .select_related(
-                "environment", "creator", "function", "taskresult", "environment__team"
+                "environment",
+                "creator",
+                "function",
+                "taskresult",
+                "tasktiming",
+                "environment__team",
             )
         )
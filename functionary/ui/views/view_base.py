@@ -4,9 +4,10 @@ from django.views.generic.list import ListView
 
 from core.auth import Permission
 from core.models import Environment
+from core.utils.database import ReplicaReadMixin
 
 
-class PermissionedEnvironmentListView(LoginRequiredMixin, ListView):
+class PermissionedEnvironmentListView(ReplicaReadMixin, LoginRequiredMixin, ListView):
     model_field = "environment"
     environment_through_field = None
     order_by_fields = ["name"]
@@ -36,7 +37,7 @@ class PermissionedEnvironmentListView(LoginRequiredMixin, ListView):
 
 
 class PermissionedEnvironmentDetailView(
-    LoginRequiredMixin, UserPassesTestMixin, DetailView
+    ReplicaReadMixin, LoginRequiredMixin, UserPassesTestMixin, DetailView
 ):
     environment_through_field = None
 
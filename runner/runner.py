@@ -1,7 +1,25 @@
+import glob
 import logging
 import os
 
-from runner import Listener, Worker
+# Metrics from the listener and worker processes are shared through this directory,
+# so it must be set before prometheus_client is imported. The default directory is
+# cleared of metrics left by a previous run. A directory supplied through
+# PROMETHEUS_MULTIPROC_DIR is left as is, as it may be shared with other processes.
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    METRICS_DIR = os.path.join(os.getenv("BROKER_WORKDIR", "/tmp"), "metrics")
+    os.makedirs(METRICS_DIR, exist_ok=True)
+
+    for metrics_file in glob.glob(os.path.join(METRICS_DIR, "*.db")):
+        os.remove(metrics_file)
+
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = METRICS_DIR
+
+from runner import Listener, Worker  # noqa: E402
+from runner.metrics import start_metrics_server  # noqa: E402
+
+# Port to serve metrics on. Metrics are not served if unset.
+METRICS_PORT = os.getenv("RUNNER_METRICS_PORT")
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 logging.basicConfig(level=LOG_LEVEL)
@@ -36,6 +54,10 @@ def spawn_worker() -> Worker:
 
 if __name__ == "__main__":
     setup_broker_dir()
+
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
+
     listener = spawn_listener()
     worker = spawn_worker()
 
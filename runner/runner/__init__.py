@@ -2,6 +2,7 @@ from multiprocessing import Process
 
 from setproctitle import setproctitle
 
+from runner import capacity
 from runner.celery import app
 from runner.listener import start_listening
 from runner.messaging import wait_for_connection
@@ -47,7 +48,9 @@ class Worker(Process):
         setproctitle(self.name)
 
         wait_for_connection()
-        worker = self.app.Worker()
+        # One pool process per container slot, so that every task admitted by the
+        # listener can run immediately
+        worker = self.app.Worker(concurrency=capacity.MAX_CONTAINERS)
         worker.start()
 
 
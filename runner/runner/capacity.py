@@ -0,0 +1,91 @@
+"""Runner capacity model
+
+Tracks how many function containers this runner is executing so that the listener
+only accepts tasking while there is capacity free, and so that current load can be
+reported back to the core application.
+
+The counter is shared memory created when this module is first imported by the
+parent runner process, so the listener, the worker, and the worker's pool
+processes forked from it all see the same value.
+"""
+
+import multiprocessing
+import os
+import socket
+
+# Name this runner reports its load under, and the pool of runners it belongs to
+RUNNER_NAME = os.getenv("RUNNER_NAME", socket.gethostname())
+RUNNER_POOL = os.getenv("RUNNER_POOL", "public")
+
+# Maximum number of function containers executed at once
+MAX_CONTAINERS = int(os.getenv("RUNNER_MAX_CONTAINERS", os.cpu_count() or 1))
+
+# Per container resource limits. CPUs may be fractional (e.g. 0.5), and memory
+# accepts docker's size format (e.g. 512m, 2g). Unset means unlimited.
+CONTAINER_CPUS = os.getenv("RUNNER_CONTAINER_CPUS")
+CONTAINER_MEMORY = os.getenv("RUNNER_CONTAINER_MEMORY")
+
+# Seconds between load reports, and between checks for freed capacity while paused
+LOAD_REPORT_INTERVAL = int(os.getenv("RUNNER_LOAD_REPORT_INTERVAL", 10))
+CAPACITY_CHECK_INTERVAL = 1
+
+_active = multiprocessing.Value("i", 0)
+
+
+def acquire() -> bool:
+    """Reserve capacity for a task
+
+    Returns:
+        True if capacity was reserved, False if the runner is full
+    """
+    with _active.get_lock():
+        if _active.value >= MAX_CONTAINERS:
+            return False
+
+        _active.value += 1
+
+    return True
+
+
+def release() -> None:
+    """Release capacity previously reserved with acquire"""
+    with _active.get_lock():
+        _active.value = max(_active.value - 1, 0)
+
+
+def active() -> int:
+    """The number of tasks currently holding capacity"""
+    return _active.value
+
+
+def available() -> int:
+    """The number of additional tasks that can currently be accepted"""
+    return max(MAX_CONTAINERS - _active.value, 0)
+
+
+def container_limits() -> dict:
+    """Resource limit arguments for containers.run, based on the configured limits"""
+    limits = {}
+
+    if CONTAINER_CPUS:
+        limits["nano_cpus"] = int(float(CONTAINER_CPUS) * 1e9)
+
+    if CONTAINER_MEMORY:
+        limits["mem_limit"] = CONTAINER_MEMORY
+
+    return limits
+
+
+def load_report(images: list[str]) -> dict:
+    """Build the RUNNER_LOAD message describing this runner's current load
+
+    Args:
+        images: names of the images cached on this runner
+    """
+    return {
+        "runner": RUNNER_NAME,
+        "pool": RUNNER_POOL,
+        "capacity": MAX_CONTAINERS,
+        "active": active(),
+        "images": images,
+    }
@@ -56,6 +56,9 @@ app.conf.update(
         "task_serializer": "json",
         "result_serializer": "json",
         "accept_content": ["json"],
+        # Admission is controlled by the listener, so don't let a pool process
+        # reserve tasks that another idle process could be running
+        "worker_prefetch_multiplier": 1,
     }
 )
 
@@ -0,0 +1,53 @@
+"""Task status events
+
+Status events are emitted by the listener as it accepts tasks and by the worker's
+pool processes as containers start. They are collected on a queue created when
+this module is first imported by the parent runner process, and the listener
+publishes whatever has accumulated as a single TASK_STATUS message every
+EVENT_FLUSH_INTERVAL seconds, so that status reporting never costs a broker
+connection per event.
+
+Events are advisory: any still queued when a process exits are dropped, as the
+task result that follows supersedes them.
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+
+RECEIVED = "RECEIVED"
+STARTED = "STARTED"
+
+# Seconds between publishing accumulated events, and the most events sent in a
+# single message
+EVENT_FLUSH_INTERVAL = float(os.getenv("RUNNER_EVENT_FLUSH_INTERVAL", 0.5))
+MAX_EVENTS_PER_MESSAGE = 1000
+
+_events = multiprocessing.Queue()
+
+
+def emit(task_id: str, status: str) -> None:
+    """Queue a status event for a task
+
+    Args:
+        task_id: ID of the task the event is for
+        status: RECEIVED or STARTED
+    """
+    # Don't hold up process exit waiting for events to be read. This is reset in
+    # every forked process, so it is set on each call.
+    _events.cancel_join_thread()
+    _events.put({"task_id": task_id, "status": status, "time": time.time()})
+
+
+def drain() -> list[dict]:
+    """Remove and return the events queued so far, up to MAX_EVENTS_PER_MESSAGE"""
+    events = []
+
+    while len(events) < MAX_EVENTS_PER_MESSAGE:
+        try:
+            events.append(_events.get_nowait())
+        except queue.Empty:
+            break
+
+    return events
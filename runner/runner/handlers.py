@@ -1,12 +1,41 @@
+import io
 import itertools
 import json
 import logging
+import struct
+import tarfile
+import time
 
 import docker
 
+from . import capacity, events
 from .celery import app
-from .messaging import send_message
+from .messaging import JSON_CONTENT_TYPE, send_message
+from .metrics import (
+    CONTAINER_REMOVE_SECONDS,
+    CONTAINER_RUN_SECONDS,
+    CONTAINER_START_SECONDS,
+    IMAGE_PULL_SECONDS,
+    RESULTS_PUBLISHED,
+)
+
+# Location inside the container that the function template writes its result to.
+# The result is framed as RESULT_MAGIC, an unsigned 64-bit big-endian payload
+# length, then the payload itself.
+RESULT_FILE = "/tmp/functionary-result"
+RESULT_MAGIC = b"FUNCTIONARY-RESULT"
+RESULT_HEADER = struct.Struct(f">{len(RESULT_MAGIC)}sQ")
+
+# Location inside the container that the function parameters are copied to for
+# images whose template supports reading them from a file
+PARAMETERS_FILE = "/tmp/functionary-parameters.json"
+
+# Label set by function templates to advertise the protocol they support. Templates
+# from protocol 2 onward accept --parameters-file.
+PROTOCOL_LABEL = "io.functionary.template.protocol"
+PARAMETERS_FILE_PROTOCOL = 2
 
+# Images built from older templates print the result after this separator instead
 OUTPUT_SEPARATOR = b"==== Output From Command ====\n"
 
 logger = logging.getLogger(__name__)
@@ -19,45 +48,161 @@ logger = logging.getLogger(__name__)
     },
     autoretry_for=(docker.errors.DockerException,),
 )
-def pull_image(task) -> None:
+def pull_image(task) -> float:
+    """Pull the image for a task
+
+    Returns:
+        The time the pull completed, which is passed on to run_task when chained
+    """
     package = task.get("package")
 
     docker_client = docker.from_env()
-    docker_client.images.pull(package)
+
+    with IMAGE_PULL_SECONDS.time():
+        docker_client.images.pull(package)
 
     logger.debug(f"Pulled {package}")
 
+    return time.time()
+
 
 @app.task()
-def run_task(_=None, task=None):
-    exit_status, output, result = _run_task(task)
+def release_capacity():
+    """Release the capacity held by a task that failed before it could run"""
+    capacity.release()
+
+
+@app.task()
+def run_task(pulled_at=None, task=None):
+    # Timestamps of the task's progress, which are returned with the result
+    timing = {**task.get("timing", {}), "pulled": pulled_at}
+
+    try:
+        exit_status, output, result = _run_task(task, timing)
+    finally:
+        capacity.release()
 
     return {
         "task_id": task["id"],
         "status": exit_status,
         "output": output.decode(),
         "result": result.decode(),
+        "timing": timing,
     }
 
 
-def _run_task(task):
+def _run_task(task, timing):
     package = task.get("package")
     function = task.get("function")
-    parameters = json.dumps(task["function_parameters"])
-    run_command = ["--function", function, "--parameters", parameters]
+    parameters = json.dumps(task["function_parameters"]).encode()
 
     logging.info("Running %s from package %s", function, package)
     docker_client = docker.from_env()
-    container = docker_client.containers.run(
-        package, auto_remove=False, detach=True, command=run_command
-    )
+    start = time.monotonic()
+
+    if _supports_parameters_file(docker_client.images.get(package)):
+        # Parameters are copied into the container before it starts rather than
+        # passed as an argument, which would be subject to ARG_MAX and be visible
+        # in the process list and container metadata.
+        run_command = ["--function", function, "--parameters-file", PARAMETERS_FILE]
+        container = docker_client.containers.create(
+            package,
+            command=run_command,
+            environment={"FUNCTIONARY_RESULT_FILE": RESULT_FILE},
+            **capacity.container_limits(),
+        )
+        container.put_archive("/", _build_parameters_archive(parameters))
+        container.start()
+    else:
+        run_command = ["--function", function, "--parameters", parameters.decode()]
+        container = docker_client.containers.run(
+            package,
+            auto_remove=False,
+            detach=True,
+            command=run_command,
+            environment={"FUNCTIONARY_RESULT_FILE": RESULT_FILE},
+            **capacity.container_limits(),
+        )
+
+    CONTAINER_START_SECONDS.observe(time.monotonic() - start)
+    timing["started"] = time.time()
+    events.emit(task["id"], events.STARTED)
+
+    with CONTAINER_RUN_SECONDS.time():
+        exit_status = container.wait()["StatusCode"]
+
+    timing["exited"] = time.time()
+
+    result = _read_result(container)
+
+    if result is None:
+        output, result = _parse_container_logs(container.logs(stream=True))
+    else:
+        output = container.logs().rstrip()
+
+    with CONTAINER_REMOVE_SECONDS.time():
+        container.remove()
 
-    exit_status = container.wait()["StatusCode"]
-    output, result = _parse_container_logs(container.logs(stream=True))
+    return (exit_status, output, result)
 
-    container.remove()
 
-    return (exit_status, output, result)
+def _supports_parameters_file(image):
+    try:
+        protocol = int(image.labels.get(PROTOCOL_LABEL, 1))
+    except ValueError:
+        return False
+
+    return protocol >= PARAMETERS_FILE_PROTOCOL
+
+
+def _build_parameters_archive(parameters):
+    """Build a tar archive containing the parameters file, for use with
+    put_archive at the container root"""
+    archive = io.BytesIO()
+    member = tarfile.TarInfo(PARAMETERS_FILE.lstrip("/"))
+    member.size = len(parameters)
+    member.mode = 0o444
+
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        tar.addfile(member, io.BytesIO(parameters))
+
+    return archive.getvalue()
+
+
+def _read_result(container):
+    """Read the framed result written by the function template
+
+    Returns:
+        The result payload, or None if the container did not write a result file,
+        either because the function failed or the image predates the result file.
+    """
+    try:
+        chunks, _ = container.get_archive(RESULT_FILE)
+    except docker.errors.NotFound:
+        return None
+
+    with tarfile.open(fileobj=io.BytesIO(b"".join(chunks))) as archive:
+        member = archive.next()
+        result_file = archive.extractfile(member) if member else None
+
+        if result_file is None:
+            return None
+
+        header = result_file.read(RESULT_HEADER.size)
+
+        if len(header) != RESULT_HEADER.size or not header.startswith(RESULT_MAGIC):
+            logger.warning("Ignoring result file with an unrecognized header")
+            return b""
+
+        _, length = RESULT_HEADER.unpack(header)
+        result = result_file.read(length)
+
+    if len(result) != length:
+        logger.warning(
+            "Result truncated: expected %d bytes, got %d", length, len(result)
+        )
+
+    return result
 
 
 def _parse_container_logs(logs):
@@ -76,7 +221,9 @@ def _parse_container_logs(logs):
     },
     autoretry_for=(Exception,),
 )
-def publish_result(result):
+def publish_result(result, content_type=JSON_CONTENT_TYPE):
     # TODO: The routing key should come from the configuration information received
     #       during runner registration.
-    send_message("tasking.results", "TASK_RESULT", result)
+    result["timing"]["result_published"] = time.time()
+    send_message("tasking.results", "TASK_RESULT", result, content_type)
+    RESULTS_PUBLISHED.inc()
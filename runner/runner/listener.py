@@ -1,49 +1,297 @@
-import json
 import logging
+import os
+import time
 
+import pika
 from celery import chain
 
-from .handlers import publish_result, pull_image, run_task
-from .messaging import build_connection
+import docker
+
+from . import capacity, events
+from .handlers import publish_result, pull_image, release_capacity, run_task
+from .messaging import (
+    JSON_CONTENT_TYPE,
+    SUPPORTED_CONTENT_TYPES,
+    build_connection,
+    decode_message,
+    encode_message,
+    get_content_type,
+)
+from .metrics import TASKS_RECEIVED
 
 logger = logging.getLogger(__name__)
 
+RUNNER_EXCHANGE = "runners.public"
+# Queue consumed by core for results, load reports and status events
+RESULTS_QUEUE = "tasking.results"
+
+# The queue shared by all runners in this runner's pool, and the queue that only
+# this runner consumes. Tasks are sent to the runner queue when core knows this
+# runner has the image cached and capacity free.
+POOL_QUEUE = capacity.RUNNER_POOL
+RUNNER_QUEUE = f"runner.{capacity.RUNNER_NAME}"
+
+# Seconds a task may wait in the runner queue before it is handed back to the
+# pool, e.g. because this runner went away or filled up after it last reported.
+RUNNER_QUEUE_TTL = int(os.getenv("RUNNER_QUEUE_TTL", 30))
+
+# Seconds the runner queue is kept once this runner stops consuming from it. The
+# queue is redeclared while consumption is paused, so it only expires once the
+# runner is gone, by which time its messages have moved to the pool queue.
+RUNNER_QUEUE_EXPIRES = int(os.getenv("RUNNER_QUEUE_EXPIRES", 600))
+
+# Seconds to wait before reopening a closed channel or connection
+RECONNECT_DELAY = 5
+
+# Highest task priority. Queued tasks are delivered highest priority first, and
+# admitted tasks start immediately, so priority holds all the way to execution.
+MAX_PRIORITY = 9
+
+# When the runner queue was last declared, as time.monotonic()
+_runner_queue_declared_at = 0.0
+
+# Encoding of the status events sent to core, which switches to msgpack once a
+# message from core has advertised support for it
+_events_content_type = JSON_CONTENT_TYPE
+
+# Tags of the active tasking consumers. Empty while consumption is paused because
+# the runner is at capacity.
+_consumer_tags = []
+
 
 def start_listening():
-    logger.info("Starting listener")
-    connection = build_connection(open_callback=_on_connection_open)
+    while True:
+        logger.info("Starting listener")
+        connection = build_connection(open_callback=_on_connection_open)
+        connection.add_on_open_error_callback(_on_connection_closed)
+        connection.add_on_close_callback(_on_connection_closed)
 
-    try:
-        connection.ioloop.start()
-    except KeyboardInterrupt:
-        connection.close()
+        try:
+            connection.ioloop.start()
+        except KeyboardInterrupt:
+            connection.close()
 
-        # Loop until we're fully closed, will stop on its own
-        connection.ioloop.start()
+            # Loop until we're fully closed, will stop on its own
+            connection.ioloop.start()
+            return
+
+        _consumer_tags.clear()
+        logger.info("Reconnecting in %ss", RECONNECT_DELAY)
+        time.sleep(RECONNECT_DELAY)
 
 
 def _on_connection_open(connection):
     """Called when we are fully connected to RabbitMQ"""
     logger.info("Connected")
-    connection.channel(on_open_callback=_on_channel_open)
+    _open_channel(connection)
+
+
+def _on_connection_closed(connection, reason):
+    """Called when the connection fails to open or is closed. Stops the ioloop so
+    that start_listening can reconnect, or return if we're shutting down."""
+    logger.warning("Connection closed: %s", reason)
+    connection.ioloop.stop()
+
+
+def _open_channel(connection):
+    if connection.is_open:
+        connection.channel(on_open_callback=_on_channel_open)
 
 
 def _on_channel_open(new_channel):
     """Called when our channel has opened"""
     logger.debug("Channel opened")
+    new_channel.add_on_close_callback(_on_channel_closed)
+
+    # Only hold one unacknowledged message at a time, leaving the rest of the queue
+    # available to other runners
+    new_channel.basic_qos(prefetch_count=1)
+
+    _declare_runner_queue(new_channel, lambda: _on_queues_ready(new_channel))
+
+
+def _on_channel_closed(channel, reason):
+    """Called when our channel closes, such as after a channel level error. The
+    periodic publishers stop on their own, and a new channel picks up from here."""
+    logger.warning("Channel closed: %s", reason)
+    _consumer_tags.clear()
+
+    connection = channel.connection
+
+    if connection.is_open:
+        connection.ioloop.call_later(RECONNECT_DELAY, _open_channel, connection)
+
+
+def _declare_runner_queue(channel, callback=None):
+    """Declare and bind this runner's queue, calling callback once done
+
+    Declaring the queue also resets its expiry, and recreates it if it has expired.
+    """
+    global _runner_queue_declared_at
+
+    logger.debug("Configuring rabbitmq queue: %s", RUNNER_QUEUE)
+    _runner_queue_declared_at = time.monotonic()
+
+    def on_bound(_):
+        if callback is not None:
+            callback()
+
+    channel.queue_declare(
+        RUNNER_QUEUE,
+        durable=True,
+        auto_delete=False,
+        arguments={
+            "x-message-ttl": RUNNER_QUEUE_TTL * 1000,
+            "x-expires": RUNNER_QUEUE_EXPIRES * 1000,
+            "x-dead-letter-exchange": RUNNER_EXCHANGE,
+            "x-dead-letter-routing-key": POOL_QUEUE,
+            "x-max-priority": MAX_PRIORITY,
+        },
+        callback=lambda _: channel.queue_bind(
+            RUNNER_QUEUE, RUNNER_EXCHANGE, callback=on_bound
+        ),
+    )
+
+
+def _on_queues_ready(channel):
+    # A full runner, e.g. one that reconnected while busy, waits for capacity
+    # rather than taking tasking that it would only hand back
+    if capacity.available():
+        _start_consuming(channel)
+    else:
+        _schedule_resume(channel)
+
+    _report_load(channel)
+    _publish_events(channel)
+
+
+def _start_consuming(channel):
+    for queue in [RUNNER_QUEUE, POOL_QUEUE]:
+        logger.debug("Consuming from %s", queue)
+        _consumer_tags.append(channel.basic_consume(queue, _handle_delivery))
+
 
-    # TODO: The queue to listen on here should come from config generated during
-    #       runner registration
-    new_channel.basic_consume("public", _handle_delivery)
+def _pause_consuming(channel):
+    """Stop accepting tasking until capacity frees up"""
+    logger.info("At capacity, pausing tasking")
+
+    while _consumer_tags:
+        channel.basic_cancel(_consumer_tags.pop())
+
+    _schedule_resume(channel)
+
+
+def _schedule_resume(channel):
+    channel.connection.ioloop.call_later(
+        capacity.CAPACITY_CHECK_INTERVAL, _resume_when_available, channel
+    )
+
+
+def _resume_when_available(channel):
+    if not channel.is_open:
+        return
+
+    if capacity.available():
+        logger.info("Capacity available, resuming tasking")
+        # The queue may have expired if the broker considered it unused for long
+        _declare_runner_queue(channel, lambda: _start_consuming(channel))
+    else:
+        # Keep the unconsumed queue, and the tasks in it, from expiring
+        if time.monotonic() - _runner_queue_declared_at > RUNNER_QUEUE_EXPIRES / 2:
+            _declare_runner_queue(channel)
+
+        _schedule_resume(channel)
+
+
+def _cached_images():
+    """The names of the images available locally, as they would be referred to in
+    tasking messages"""
+    images = set()
+
+    for image in docker.from_env().images.list():
+        for tag in image.tags:
+            images.add(tag)
+            images.add(tag.removesuffix(":latest"))
+
+    return sorted(images)
+
+
+def _report_load(channel):
+    """Periodically publish this runner's load so that dispatch can favor idle
+    runners"""
+    if not channel.is_open:
+        return
+
+    try:
+        images = _cached_images()
+    except docker.errors.DockerException as exc:
+        logger.warning("Unable to list cached images: %s", exc)
+        images = []
+
+    # Always JSON, as this message is how core learns which encodings are supported
+    body, content_encoding = encode_message(
+        {**capacity.load_report(images), "content_types": SUPPORTED_CONTENT_TYPES}
+    )
+
+    channel.basic_publish(
+        exchange="",
+        routing_key=RESULTS_QUEUE,
+        body=body,
+        properties=pika.BasicProperties(
+            content_type=JSON_CONTENT_TYPE,
+            content_encoding=content_encoding,
+            headers={"x-msg-type": "RUNNER_LOAD"},
+            delivery_mode=1,
+        ),
+    )
+
+    channel.connection.ioloop.call_later(
+        capacity.LOAD_REPORT_INTERVAL, _report_load, channel
+    )
+
+
+def _publish_events(channel):
+    """Periodically publish the task status events accumulated since the last
+    call as a single message"""
+    if not channel.is_open:
+        return
+
+    if task_events := events.drain():
+        body, content_encoding = encode_message(
+            {"events": task_events}, _events_content_type
+        )
+
+        channel.basic_publish(
+            exchange="",
+            routing_key=RESULTS_QUEUE,
+            body=body,
+            properties=pika.BasicProperties(
+                content_type=_events_content_type,
+                content_encoding=content_encoding,
+                headers={"x-msg-type": "TASK_STATUS"},
+                delivery_mode=1,
+            ),
+        )
+
+    channel.connection.ioloop.call_later(
+        events.EVENT_FLUSH_INTERVAL, _publish_events, channel
+    )
 
 
 def _handle_delivery(channel, deliver, properties, body):
     """Called when we receive a message from RabbitMQ"""
+    global _events_content_type
+
+    # Whether this delivery holds a slot of capacity that nothing else will release
+    holds_capacity = False
+    acknowledged = False
 
     # TODO: Implement handling of specific exceptions
     try:
         msg_type = properties.headers.get("x-msg-type", "__NONE__")
-        msg_body = json.loads(body.decode())
+        msg_body = decode_message(body, properties)
+        reply_content_type = get_content_type(properties)
+        _events_content_type = reply_content_type
 
         logger.info("Received message %s", msg_type)
 
@@ -51,14 +299,47 @@ def _handle_delivery(channel, deliver, properties, body):
             case "PULL_IMAGE":
                 pull_image.delay(**msg_body)
             case "TASK_PACKAGE":
-                pull_image_s = pull_image.s(msg_body)
+                accepted = capacity.acquire()
+                TASKS_RECEIVED.labels(accepted=accepted).inc()
+
+                if not accepted:
+                    # Raced with the consumer being paused. Return the message so
+                    # that it can go to a runner with capacity, and stop taking
+                    # more until there is some here.
+                    channel.basic_reject(deliver.delivery_tag, requeue=True)
+
+                    if _consumer_tags:
+                        _pause_consuming(channel)
+
+                    return
+
+                holds_capacity = True
+                msg_body.setdefault("timing", {})["received"] = time.time()
+                events.emit(msg_body["id"], events.RECEIVED)
+
+                pull_image_s = pull_image.s(msg_body).on_error(release_capacity.si())
                 run_task_s = run_task.s(task=msg_body)
-                publish_task_s = publish_result.s()
+                publish_task_s = publish_result.s(content_type=reply_content_type)
 
                 chain(pull_image_s, run_task_s, publish_task_s).delay()
+
+                # The task chain releases the capacity from here on
+                holds_capacity = False
             case _:
                 logger.error("Unrecognized message type: %s", msg_type)
 
         channel.basic_ack(deliver.delivery_tag)
+        acknowledged = True
+
+        if _consumer_tags and not capacity.available():
+            _pause_consuming(channel)
     except Exception as exc:
         logger.error("Error handling received message: %s", exc)
+
+        if holds_capacity:
+            capacity.release()
+
+        # Discard the message rather than leave it unacknowledged, which with a
+        # prefetch of one would stop this consumer receiving anything else
+        if not acknowledged and channel.is_open:
+            channel.basic_nack(deliver.delivery_tag, requeue=False)
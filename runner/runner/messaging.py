@@ -2,13 +2,32 @@ import json
 import logging
 import os
 import ssl
+import zlib
 from time import sleep
 
+import msgpack
 import pika
 from pika.exceptions import AMQPConnectionError, UnroutableError
 
 logger = logging.getLogger(__name__)
 
+# Supported message body encodings, identified by the content_type property. These
+# are advertised in load reports so that core knows it can send msgpack.
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+SUPPORTED_CONTENT_TYPES = [JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE]
+
+# content_encoding of msgpack bodies that have been compressed
+ZLIB_CONTENT_ENCODING = "zlib"
+
+# Header in which core lists the encodings it can decode. Messages to core are only
+# sent as msgpack once core has advertised support for it, so that a runner paired
+# with an older core keeps sending JSON.
+ACCEPT_HEADER = "x-accept-content-types"
+
+# msgpack message bodies at or above this size (in bytes) are compressed
+MESSAGE_COMPRESSION_MIN_SIZE = int(os.getenv("MESSAGE_COMPRESSION_MIN_SIZE", 1024))
+
 
 def build_connection(ca=None, cert=None, key=None, open_callback=None):
     """Creates a connection to RabbitMQ.
@@ -53,26 +72,92 @@ def build_connection(ca=None, cert=None, key=None, open_callback=None):
         return pika.BlockingConnection(parameters)
 
 
-def send_message(routing_key, msg_type, message):
-    """Sends a JSON message to the specified queue.
+def get_content_type(properties):
+    """The content type to reply to a message from core with
+
+    Args:
+      properties: The properties of a message received from core
+
+    Returns:
+      msgpack if core advertised support for it in the message, otherwise JSON
+    """
+    accepted = (properties.headers or {}).get(ACCEPT_HEADER) or []
+
+    if MSGPACK_CONTENT_TYPE in accepted:
+        return MSGPACK_CONTENT_TYPE
+
+    return JSON_CONTENT_TYPE
+
 
-    Sends the given message to the queue. If msg_type is populated, it
-    sets the x-msg-type header to that value.
+def encode_message(message, content_type=JSON_CONTENT_TYPE):
+    """Encode a message body
+
+    msgpack bodies at least MESSAGE_COMPRESSION_MIN_SIZE bytes long are also
+    compressed. JSON bodies never are, for compatibility with older consumers.
+
+    Args:
+      message: The message to encode
+      content_type: The encoding to use
+
+    Returns:
+      A tuple of the encoded body and its content_encoding
+    """
+    if content_type != MSGPACK_CONTENT_TYPE:
+        return json.dumps(message).encode(), "utf-8"
+
+    body = msgpack.packb(message)
+
+    if len(body) >= MESSAGE_COMPRESSION_MIN_SIZE:
+        return zlib.compress(body), ZLIB_CONTENT_ENCODING
+
+    return body, None
+
+
+def decode_message(body, properties):
+    """Decode a message body according to its content_type and content_encoding
+
+    Messages without a content_type are treated as JSON.
+
+    Args:
+      body: The body of the received message
+      properties: The properties of the received message
+
+    Returns:
+      The decoded message
+    """
+    if properties.content_encoding == ZLIB_CONTENT_ENCODING:
+        body = zlib.decompress(body)
+
+    if properties.content_type == MSGPACK_CONTENT_TYPE:
+        return msgpack.unpackb(body)
+
+    return json.loads(body.decode())
+
+
+def send_message(routing_key, msg_type, message, content_type=JSON_CONTENT_TYPE):
+    """Sends a message to the specified queue.
+
+    Sends the given message to the queue. If msg_type is populated, it sets the
+    x-msg-type header to that value.
 
     Args:
       queue: The name of the queue to send to
       msg_type: The value of x-msg-type to set in the header, or None
-      message: The message to send, must be valid JSON.
+      message: The message to send, must be serializable as JSON.
+      content_type: The encoding to send the message with. Defaults to JSON, which
+        every version of core understands.
 
     Raises:
       pika.exceptions.UnroutableError: if unable to publish the message
     """
 
     headers = {"x-msg-type": msg_type} if msg_type else {}
+    body, content_encoding = encode_message(message, content_type)
+
     # TODO Update this to use a persistent connection to the queue
     publish_props = pika.BasicProperties(
-        content_type="application/json",
-        content_encoding="utf-8",
+        content_type=content_type,
+        content_encoding=content_encoding,
         headers=headers,
         delivery_mode=1,
     )
@@ -85,7 +170,7 @@ def send_message(routing_key, msg_type, message):
         channel.basic_publish(
             exchange="",
             routing_key=routing_key,
-            body=json.dumps(message),
+            body=body,
             properties=publish_props,
             mandatory=True,
         )
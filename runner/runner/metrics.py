@@ -0,0 +1,68 @@
+"""Prometheus metrics for the runner
+
+Metrics are recorded by the listener and by the worker's pool processes, so they
+are kept in PROMETHEUS_MULTIPROC_DIR and aggregated by the metrics server in the
+parent runner process.
+"""
+from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess
+from prometheus_client import start_http_server as _start_http_server
+from prometheus_client.core import GaugeMetricFamily
+
+from . import capacity
+
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+IMAGE_PULL_SECONDS = Histogram(
+    "runner_image_pull_seconds",
+    "Time to pull a package image",
+    buckets=SECONDS_BUCKETS,
+)
+CONTAINER_START_SECONDS = Histogram(
+    "runner_container_start_seconds",
+    "Time to create and start a function container",
+    buckets=SECONDS_BUCKETS,
+)
+CONTAINER_RUN_SECONDS = Histogram(
+    "runner_container_run_seconds",
+    "Time from a function container starting to exiting",
+    buckets=SECONDS_BUCKETS,
+)
+CONTAINER_REMOVE_SECONDS = Histogram(
+    "runner_container_remove_seconds",
+    "Time to collect the output of and remove a function container",
+    buckets=SECONDS_BUCKETS,
+)
+TASKS_RECEIVED = Counter(
+    "runner_tasks_received",
+    "Tasking messages received, by whether there was capacity to accept them",
+    ["accepted"],
+)
+RESULTS_PUBLISHED = Counter(
+    "runner_results_published",
+    "Task results published to the message broker",
+)
+
+
+class CapacityCollector:
+    """Reports the runner's capacity and load straight from the shared counter"""
+
+    def collect(self):
+        yield GaugeMetricFamily(
+            "runner_capacity", "Maximum concurrent containers", capacity.MAX_CONTAINERS
+        )
+        yield GaugeMetricFamily(
+            "runner_active_containers", "Tasks currently running", capacity.active()
+        )
+
+
+def start_metrics_server(port):
+    """Serve the metrics of the whole runner process tree over http
+
+    Args:
+        port: The port to listen on
+    """
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(CapacityCollector())
+
+    _start_http_server(port, registry=registry)
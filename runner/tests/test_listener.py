@@ -0,0 +1,202 @@
+import json
+from unittest.mock import MagicMock
+
+import pika
+import pytest
+
+from runner import capacity, listener
+from runner.messaging import (
+    ACCEPT_HEADER,
+    JSON_CONTENT_TYPE,
+    MSGPACK_CONTENT_TYPE,
+    SUPPORTED_CONTENT_TYPES,
+)
+
+DELIVERY_TAG = 7
+
+
+@pytest.fixture(autouse=True)
+def consumer_tags():
+    """Start each test with no active consumers"""
+    listener._consumer_tags.clear()
+    yield listener._consumer_tags
+    listener._consumer_tags.clear()
+    listener._events_content_type = JSON_CONTENT_TYPE
+
+
+@pytest.fixture
+def channel():
+    channel = MagicMock()
+    channel.is_open = True
+    channel.basic_consume.side_effect = lambda queue, _: f"consumer-{queue}"
+
+    return channel
+
+
+@pytest.fixture
+def consuming(channel, consumer_tags):
+    consumer_tags.extend(["consumer-runner", "consumer-pool"])
+
+
+@pytest.fixture
+def task_chain(mocker):
+    """Stand in for the celery chain that pulls the image and runs the task"""
+    mocker.patch.object(listener, "pull_image")
+    mocker.patch.object(listener, "run_task")
+    mocker.patch.object(listener, "publish_result")
+    mocker.patch.object(listener.events, "emit")
+
+    return mocker.patch.object(listener, "chain")
+
+
+@pytest.fixture
+def active(mocker):
+    """Set the number of tasks currently holding capacity"""
+    mocker.patch.object(capacity, "MAX_CONTAINERS", 2)
+
+    def _set_active(count):
+        capacity._active.value = count
+
+    yield _set_active
+
+    capacity._active.value = 0
+
+
+def _deliver(channel, message=None, msg_type="TASK_PACKAGE", headers=None):
+    body = json.dumps(message or {"id": "task", "image": "package:1.0"}).encode()
+    properties = pika.BasicProperties(
+        content_type=JSON_CONTENT_TYPE,
+        headers={"x-msg-type": msg_type, **(headers or {})},
+    )
+
+    listener._handle_delivery(
+        channel, MagicMock(delivery_tag=DELIVERY_TAG), properties, body
+    )
+
+
+def _resume_scheduled(channel) -> bool:
+    return any(
+        call.args[1] is listener._resume_when_available
+        for call in channel.connection.ioloop.call_later.call_args_list
+    )
+
+
+@pytest.mark.usefixtures("consuming")
+def test_task_accepted_with_capacity(channel, task_chain, active):
+    """A task is started and acknowledged, and consumption continues while there is
+    capacity left"""
+    active(0)
+
+    _deliver(channel)
+
+    task_chain.return_value.delay.assert_called_once()
+    channel.basic_ack.assert_called_once_with(DELIVERY_TAG)
+    channel.basic_cancel.assert_not_called()
+    assert capacity.active() == 1
+
+
+@pytest.mark.usefixtures("consuming")
+def test_consumption_paused_once_full(channel, consumer_tags, task_chain, active):
+    """Taking the last slot of capacity pauses consumption until capacity frees up"""
+    active(1)
+
+    _deliver(channel)
+
+    channel.basic_ack.assert_called_once_with(DELIVERY_TAG)
+    assert channel.basic_cancel.call_count == 2
+    assert consumer_tags == []
+    assert _resume_scheduled(channel)
+
+
+@pytest.mark.usefixtures("consuming")
+def test_task_rejected_when_full(channel, consumer_tags, task_chain, active):
+    """A task delivered to a full runner is returned to the queue, and consumption
+    is paused rather than repeatedly rejecting redelivered tasks"""
+    active(2)
+
+    _deliver(channel)
+
+    task_chain.assert_not_called()
+    channel.basic_reject.assert_called_once_with(DELIVERY_TAG, requeue=True)
+    channel.basic_ack.assert_not_called()
+    assert channel.basic_cancel.call_count == 2
+    assert consumer_tags == []
+    assert _resume_scheduled(channel)
+    assert capacity.active() == 2
+
+
+@pytest.mark.usefixtures("consuming")
+def test_undecodable_message_discarded(channel, task_chain, active):
+    """A message that can't be handled is nacked without being requeued, and any
+    capacity taken for it is released"""
+    active(0)
+    task_chain.side_effect = ValueError("bad message")
+
+    _deliver(channel)
+
+    channel.basic_nack.assert_called_once_with(DELIVERY_TAG, requeue=False)
+    assert capacity.active() == 0
+
+
+def test_queues_ready_consumes_with_capacity(channel, consumer_tags, mocker, active):
+    """Consumption starts on the runner and pool queues when there is capacity"""
+    mocker.patch.object(listener, "_report_load")
+    mocker.patch.object(listener, "_publish_events")
+    active(0)
+
+    listener._on_queues_ready(channel)
+
+    assert consumer_tags == [
+        f"consumer-{listener.RUNNER_QUEUE}",
+        f"consumer-{listener.POOL_QUEUE}",
+    ]
+    assert not _resume_scheduled(channel)
+
+
+def test_queues_ready_waits_when_full(channel, consumer_tags, mocker, active):
+    """A full runner, such as one that reconnected while busy, does not consume until
+    capacity frees up"""
+    mocker.patch.object(listener, "_report_load")
+    mocker.patch.object(listener, "_publish_events")
+    active(2)
+
+    listener._on_queues_ready(channel)
+
+    channel.basic_consume.assert_not_called()
+    assert consumer_tags == []
+    assert _resume_scheduled(channel)
+
+
+def test_resume_when_available(channel, consumer_tags, mocker, active):
+    """Consumption resumes, after redeclaring the runner queue, once capacity frees
+    up"""
+    declare = mocker.patch.object(
+        listener, "_declare_runner_queue", side_effect=lambda _, cb=None: cb()
+    )
+    active(1)
+
+    listener._resume_when_available(channel)
+
+    declare.assert_called_once()
+    assert len(consumer_tags) == 2
+    assert not _resume_scheduled(channel)
+
+
+@pytest.mark.usefixtures("consuming", "active")
+def test_replies_as_json_to_older_core(channel, task_chain):
+    """Results and events are sent as JSON unless core advertises msgpack support"""
+    _deliver(channel)
+
+    listener.publish_result.s.assert_called_once_with(content_type=JSON_CONTENT_TYPE)
+    assert listener._events_content_type == JSON_CONTENT_TYPE
+
+
+@pytest.mark.usefixtures("consuming", "active")
+def test_replies_as_msgpack_when_advertised(channel, task_chain):
+    """Results and events are sent as msgpack once core advertises support for it"""
+    _deliver(channel, headers={ACCEPT_HEADER: SUPPORTED_CONTENT_TYPES})
+
+    listener.publish_result.s.assert_called_once_with(
+        content_type=MSGPACK_CONTENT_TYPE
+    )
+    assert listener._events_content_type == MSGPACK_CONTENT_TYPE
@@ -1,24 +1,67 @@
 import argparse
 import json
 import logging
+import os
+import struct
 import sys
 
 import functions
 
 logging.basicConfig(level=logging.INFO, stream=sys.stdout)
 
+# The result is written to this file as a single frame: RESULT_MAGIC, followed by
+# the payload length as an unsigned 64-bit big-endian integer, followed by the JSON
+# encoded payload. Keeping the result out of the logs means nothing a function
+# prints can be mistaken for its result.
+RESULT_FILE_VARIABLE = "FUNCTIONARY_RESULT_FILE"
+RESULT_MAGIC = b"FUNCTIONARY-RESULT"
+
+# Used when the runner does not request a result file
+OUTPUT_SEPARATOR = "==== Output From Command ===="
+
+
+def read_parameters(args):
+    if args.parameters_file == "-":
+        return json.load(sys.stdin)
+    elif args.parameters_file:
+        with open(args.parameters_file) as parameters_file:
+            return json.load(parameters_file)
+
+    return json.loads(args.parameters)
+
+
+def write_result(path, output):
+    payload = output.encode()
+    temp_path = f"{path}.tmp"
+
+    with open(temp_path, "wb") as result_file:
+        result_file.write(RESULT_MAGIC + struct.pack(">Q", len(payload)))
+        result_file.write(payload)
+
+    # Only expose a complete frame to the runner
+    os.replace(temp_path, path)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-f", "--function", help="the function to call")
-    parser.add_argument(
+    parameters_group = parser.add_mutually_exclusive_group(required=True)
+    parameters_group.add_argument(
         "-p",
         "--parameters",
         help="the parameters to pass to the function in JSON format",
     )
+    parameters_group.add_argument(
+        "--parameters-file",
+        help="a file containing the parameters in JSON format, or - for stdin",
+    )
 
     args = parser.parse_args()
 
-    result = getattr(functions, args.function)(**json.loads(args.parameters))
+    result = getattr(functions, args.function)(**read_parameters(args))
     output = json.dumps(result, default=str)
 
-    print(f"==== Output From Command ====\n{output}")
+    if result_path := os.environ.get(RESULT_FILE_VARIABLE):
+        write_result(result_path, output)
+    else:
+        print(f"{OUTPUT_SEPARATOR}\n{output}")